@@ -0,0 +1,279 @@
+"""
+Benchmark suite.
+
+Times circuit construction, set_controllability, propagate, run_podem and run_all_nodes_podem on
+c17, s27 (full scan) and random circuits from generator.py shaped like ISCAS-85 circuits, and
+records throughput, backtracks, peak memory and fault coverage.  propagate and run_podem with full
+propagation (event_driven=False) are also timed in compiled mode, see Circuit.compiled.  Results
+are written to JSON and can be compared with an earlier run:
+
+    python benchmark.py --output baseline.json
+    ... change something ...
+    python benchmark.py --baseline baseline.json
+
+baseline.json next to this file holds the results of the committed tree and is the default
+--baseline, pass --baseline "" to skip the comparison.  Timings depend on the machine, so
+regenerate it before comparing on a different one.
+
+A metric that got worse than the baseline by more than --tolerance is reported as a regression
+and the exit status is 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from circuit import Circuit
+from classic_podem import DETECTED, PodemLimits, run_podem, run_all_nodes_podem, target_faults
+from fault_sim import RandomPatternPhase
+from generator import random_netlist
+from netlist import read_bench
+from stats import Stats
+
+C17 = """
+INPUT(1)
+INPUT(2)
+INPUT(3)
+INPUT(6)
+INPUT(7)
+OUTPUT(22)
+OUTPUT(23)
+10 = NAND(1, 3)
+11 = NAND(3, 6)
+16 = NAND(2, 11)
+19 = NAND(11, 7)
+22 = NAND(10, 16)
+23 = NAND(16, 19)
+"""
+
+S27 = """
+INPUT(G0)
+INPUT(G1)
+INPUT(G2)
+INPUT(G3)
+OUTPUT(G17)
+G5 = DFF(G10)
+G6 = DFF(G11)
+G7 = DFF(G13)
+G14 = NOT(G0)
+G17 = NOT(G11)
+G8 = AND(G14,G6)
+G15 = OR(G12,G8)
+G16 = OR(G3,G8)
+G9 = NAND(G16,G15)
+G10 = NOR(G14,G11)
+G11 = NOR(G5,G9)
+G12 = NOR(G1,G7)
+G13 = NOR(G2,G12)
+"""
+
+# {case name: bench text or random_netlist parameters}.  The random cases roughly follow the gate
+# count, input count, depth, fan-in and xor content of the ISCAS-85 circuit they are named after.
+CASES = {
+    "c17": C17,
+    "s27": S27,
+    "c432-like": dict(num_gates=160, num_inputs=36, depth=17, max_fanin=9, xor_ratio=0.1),
+    "c499-like": dict(num_gates=202, num_inputs=41, depth=11, max_fanin=5, xor_ratio=0.5),
+    "c880-like": dict(num_gates=383, num_inputs=60, depth=24, max_fanin=4, xor_ratio=0.07),
+    "c1908-like": dict(num_gates=880, num_inputs=33, depth=40, max_fanin=8, xor_ratio=0.2),
+    "reconvergent": dict(num_gates=1000, num_inputs=40, depth=30, reconvergence=0.8),
+    "c3540-like": dict(num_gates=1669, num_inputs=50, depth=47, max_fanin=8, xor_ratio=0.05),
+}
+QUICK_CASES = ["c17", "s27", "c432-like", "c499-like", "c880-like"]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# metrics compared against the baseline, {name: True if higher is better}
+COMPARED = {
+    "build_s": False,
+    "controllability_s": False,
+    "propagate_s": False,
+    "propagate_compiled_s": False,
+    "podem_faults_per_s": True,
+    "podem_full_faults_per_s": True,
+    "podem_full_compiled_faults_per_s": True,
+    "podem_backtracks_per_fault": False,
+    "run_all_s": False,
+    "coverage": True,
+    "peak_memory_mb": False,
+}
+
+
+def build(spec) -> Circuit:
+    # Circuit warns on stdout that it has no faulty node, which is expected here
+    with contextlib.redirect_stdout(io.StringIO()):
+        if isinstance(spec, str):
+            return read_bench(spec.splitlines())
+        return random_netlist(seed=0, **spec).build()
+
+
+def best_time(function, repeat: int) -> float:
+    """Smallest wall clock time of repeat calls, in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_case(spec, num_faults: int = 200, num_patterns: int = 20, limits: PodemLimits = None, repeat: int = 3) -> dict:
+    """Return the metrics of one case, see COMPARED."""
+    if limits is None:
+        limits = PodemLimits(max_backtracks=100)
+    result = {"build_s": best_time(lambda: build(spec), repeat)}
+    circuit = build(spec)
+    faults, fault_list = target_faults(circuit, fault_list=True)
+    result["gates"] = len(circuit.gates_list)
+    result["nodes"] = len(circuit.nodes)
+    result["faults"] = len(fault_list.faults)
+    result["targets"] = len(faults)
+    result["controllability_s"] = best_time(circuit.set_controllability, repeat)
+
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in circuit.inputs] for _ in range(num_patterns)]
+
+    def propagate_all():
+        for pattern in patterns:
+            circuit.propagate(pattern, reset=True)
+
+    result["propagate_s"] = best_time(propagate_all, repeat) / num_patterns
+    circuit.compiled = True
+    circuit.propagate()   # compiles the whole circuit
+    result["propagate_compiled_s"] = best_time(propagate_all, repeat) / num_patterns
+    circuit.compiled = False
+
+    sample = faults if len(faults) <= num_faults else random.Random(0).sample(faults, num_faults)
+    circuit.stats = Stats()
+    for fault in sample:
+        run_podem(circuit, fault.node, fault.stuck_at, limits=limits, fault_gate=fault.gate, fault_pin=fault.pin)
+    summary = circuit.stats.summary()
+    circuit.stats = None
+    result["podem_faults"] = len(sample)
+    result["podem_faults_per_s"] = summary.get("faults_per_second", 0.0)
+    result["podem_backtracks_per_fault"] = summary["backtracks"] / max(len(sample), 1)
+    result["podem_statuses"] = summary["statuses"]
+
+    # full propagation of the whole circuit after every decision, where compiled mode pays off
+    for metric, compiled in [("podem_full_faults_per_s", False), ("podem_full_compiled_faults_per_s", True)]:
+        circuit.compiled = compiled
+        start = time.perf_counter()
+        for fault in sample:
+            run_podem(
+                circuit, fault.node, fault.stuck_at, event_driven=False, limits=limits, cone=False,
+                fault_gate=fault.gate, fault_pin=fault.pin,
+            )
+        result[metric] = len(sample) / (time.perf_counter() - start)
+    circuit.compiled = False
+
+    start = time.perf_counter()
+    res = run_all_nodes_podem(
+        circuit, fault_dropping=True, random_phase=RandomPatternPhase(), limits=limits, fault_list=True
+    )
+    result["run_all_s"] = time.perf_counter() - start
+    detected = sum(1 for entry in res.values() if entry["status"] == DETECTED)
+    result["coverage"] = detected / max(len(res), 1)
+
+    # separate pass, tracemalloc slows everything down
+    tracemalloc.start()
+    circuit = build(spec)
+    for fault in sample:
+        # same numbering in the rebuilt circuit
+        gate = None if fault.gate is None else circuit.eval_order[fault.gate.index]
+        run_podem(
+            circuit, circuit.nodes[fault.node.index], fault.stuck_at, limits=limits, fault_gate=gate,
+            fault_pin=fault.pin,
+        )
+    result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result
+
+
+def run_suite(case_names=None, verbose: bool = True, **kwargs) -> dict:
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {},
+    }
+    for name in case_names if case_names else CASES:
+        if name not in CASES:
+            raise ValueError(f"Unknown benchmark case {name}, expected one of {list(CASES)}")
+        if verbose:
+            print(f"Benchmark:\t{name}...", flush=True)
+        results["cases"][name] = run_case(CASES[name], **kwargs)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.1):
+    """
+    Compare the metrics of the cases found in both results.
+    Returns a list of (case, metric, baseline value, new value, relative change, regression).
+    """
+    rows = []
+    for name, case in results["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old = baseline["cases"][name].get(metric)
+            new = case.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            rows.append((name, metric, old, new, change, worse > tolerance))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PODEM ATPG benchmarks")
+    parser.add_argument("--cases", help="comma separated case names, default all")
+    parser.add_argument("--quick", action="store_true", help=f"only run {', '.join(QUICK_CASES)}")
+    parser.add_argument("--faults", type=int, default=200, help="faults sampled for the run_podem timing")
+    parser.add_argument("--max-backtracks", type=int, default=100, help="per-fault PODEM backtrack limit")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--baseline", default=BASELINE, help="compare against results from an earlier run, default baseline.json"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.1, help="relative change reported as a regression")
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.baseline:
+        # read before --output can overwrite it
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    case_names = args.cases.split(",") if args.cases else (QUICK_CASES if args.quick else None)
+    results = run_suite(
+        case_names, num_faults=args.faults, limits=PodemLimits(max_backtracks=args.max_backtracks)
+    )
+    for name, case in results["cases"].items():
+        print(
+            f"{name:14} gates {case['gates']:6}  build {case['build_s'] * 1e3:8.2f} ms  "
+            f"podem {case['podem_faults_per_s']:8.1f} faults/s  "
+            f"full propagation {case['podem_full_faults_per_s']:8.1f} / compiled "
+            f"{case['podem_full_compiled_faults_per_s']:8.1f} faults/s  "
+            f"backtracks/fault {case['podem_backtracks_per_fault']:6.2f}  "
+            f"coverage {case['coverage'] * 100:6.2f}%  peak {case['peak_memory_mb']:7.2f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline is None:
+        return 0
+    regressions = 0
+    for name, metric, old, new, change, regression in compare(results, baseline, args.tolerance):
+        flag = "REGRESSION" if regression else ""
+        print(f"{name:14} {metric:28} {old:12.6g} -> {new:12.6g}  {change * 100:+7.1f}%  {flag}")
+        regressions += regression
+    print(f"{regressions} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
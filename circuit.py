@@ -1,13 +1,49 @@
+import heapq
+from collections import deque
 from typing import Tuple, List
 from gate import Node, Gate, And
+from core import CircuitCore
+from structure import StructuralIndex, UNREACHABLE
+from logic import X, D, D_BAR, GOOD_VALUE
+from compiled import value_function
+
+COMPILED_CACHE_SIZE = 64  # compiled propagate functions kept per circuit, the oldest is dropped first
+# propagations of a fault cone before it is compiled.  Compiling costs about as much as a hundred
+# interpreted propagations and saves about half of every later one, so a cone is compiled once it is
+# likely to be propagated a few hundred times.  The whole circuit is compiled on first use.
+COMPILE_THRESHOLD = 128
 
 
 class Circuit:
     def __init__(self, *primary_inputs):
+        """
+        Nodes and gates with generated names (no name given when they were created) are renamed
+        per circuit, in creation order, so their names do not depend on what else was built in
+        the same process.
+        """
         self.inputs = list(primary_inputs)
         self.outputs, self.gates, self.nodes = self.parse_circuit(self.inputs)
         self.gates_list = self.get_gates_list()
+        # gates sorted by depth, the order used for full circuit evaluation
+        self.eval_order = [gate for depth in sorted(self.gates) for gate in self.gates[depth]]
+        self.core = CircuitCore(self)
+        self.structure = StructuralIndex(self.core)
+        # 1 for the POs that X-path checks try to reach, all of them unless set_fault_cone restricts it
+        self.target_outputs = bytearray(len(self.nodes))
+        for idx in self.core.outputs:
+            self.target_outputs[idx] = 1
+        self._node_map = None  # see node_map
+        self._gate_map = None
         self.set_controllability()
+        self.set_observability()
+        # picks the D-frontier gate to propagate through, see FRONTIER_HEURISTICS
+        self.frontier_heuristic = most_observable_gate
+        # PODEM decides with backtrace_objectives (FAN style) instead of objective and backtrace
+        self.multiple_backtrace = False
+
+        # gates on the D-frontier, kept up to date by propagate, propagate_events, undo and reset.
+        # A dict is used as an insertion ordered set.
+        self.d_frontier = {}  # {Gate: None}
 
         self.fault_node = self.find_fault_node()
 
@@ -17,54 +53,178 @@ class Circuit:
         self.fault_gates = None
         self.fault_internal_nodes = None
 
+        # cone restricted mode, see set_fault_cone.  cone_gates is None when the whole circuit is used.
+        self.cone_gates = None  # [Gate] in evaluation order
+        self.in_cone = bytearray(len(self.eval_order))  # 1 for the gate indices in cone_gates
+        self.cone_node = None  # the fault node cone_gates was built for
+        self.cone_key = None  # tuple of the PO indices cone_gates is the fanin of, faults reaching the same POs share it
+
+        # compiled mode: propagate runs generated straight-line code, see compiled.py.  The functions
+        # are cached per cone, {cone_key or None for the whole circuit: function}.  propagate_events is
+        # not compiled, so PODEM only gains from this with event_driven=False, where every decision
+        # re-propagates the cone.  The default event-driven search propagates once per fault, and a
+        # cone is only compiled after COMPILE_THRESHOLD faults reaching the same POs.
+        self.compiled = False
+        self.compiled_functions = {}
+        self.cone_propagations = {}  # {cone_key: propagations}, for COMPILE_THRESHOLD
+
+        self.stats = None  # assign a stats.Stats to collect counters and timers
+        # assign a learning.StaticLearning to make PODEM use the necessary assignments of each fault
+        self.learning = None
+        # assign a nogood.NogoodCache to share the nogoods PODEM learns between faults
+        self.nogoods = None
+
+    @property
+    def node_map(self) -> dict:
+        """{name: Node}, the first node wins if names are duplicated.  Built on first use."""
+        if self._node_map is None:
+            self._node_map = {}
+            for node in self.nodes:
+                self._node_map.setdefault(node.name, node)
+        return self._node_map
+
+    @property
+    def gate_map(self) -> dict:
+        """{name: Gate}, built on first use."""
+        if self._gate_map is None:
+            self._gate_map = {gate.name: gate for gate in self.gates_list}
+        return self._gate_map
+
     def get_node(self, name: str) -> Node:
         """Gets the node by letter/name."""
-        for node in self.nodes:
-            if node.name == name:
-                return node
-        raise ValueError(f"No node named {name}")
+        if name not in self.node_map:
+            raise ValueError(f"No node named {name}")
+        return self.node_map[name]
+
+    def get_gate(self, name: str) -> Gate:
+        """Gets the gate by name."""
+        if name not in self.gate_map:
+            raise ValueError(f"No gate named {name}")
+        return self.gate_map[name]
 
     def parse_circuit(self, inputs: list[Node]):
         """
         goes through the inputs and finds all the primary outputs and all of the internal nodes and gates
         :param inputs: mapping from str to Node for primary inputs
         """
-        outputs = {}  # {name: Node}
-        gates = {}  # {gate_depth: {name: Gate}}
         nodes = []
+        found_gates = []  # in the order they are found
+        seen = set(inputs)  # nodes and gates found so far
 
-        unexplored_nodes = inputs.copy()
+        unexplored_nodes = deque(inputs)
         while len(unexplored_nodes) > 0:
-            node = unexplored_nodes.pop(0)
+            node = unexplored_nodes.popleft()
             nodes.append(node)
-            if node.is_po():
-                outputs[node.name] = node
             for gate in node.gates:
-                if gate.output not in nodes and gate.output not in unexplored_nodes:
+                if gate not in seen:
+                    seen.add(gate)
+                    found_gates.append(gate)
+                if gate.output not in seen:
+                    seen.add(gate.output)
                     unexplored_nodes.append(gate.output)
-                depth = gate.depth
-                if depth in gates:
-                    gates[depth][gate.name] = gate
-                else:
-                    gates[depth] = {gate.name: gate}
+
+        self.assign_names(nodes, found_gates)
+        depths = self.levelize(found_gates)
+        outputs = {}  # {name: Node}
+        for node in nodes:
+            if node.is_po():
+                outputs[node.name] = node
+        gates = {}  # {gate_depth: [Gate]}, gates are kept as objects since names may repeat
+        for gate in found_gates:
+            gates.setdefault(depths[gate], []).append(gate)
 
         return outputs, gates, nodes
 
+    def assign_names(self, nodes: List[Node], gates: List[Gate]):
+        """
+        Rename the nodes and gates that still have their generated names, numbering them from 1 in
+        creation order.  Generated names follow auto_name, so renumbering is enough.
+        """
+        auto_nodes = [node for node in nodes if node.auto_name is not None and node._name is None]
+        auto_nodes.sort(key=lambda n: n.auto_name)
+        for count, node in enumerate(auto_nodes, start=1):
+            node.auto_name = count
+        auto_gates = [gate for gate in gates if gate.auto_name is not None and gate._name is None]
+        auto_gates.sort(key=lambda g: g.auto_name)
+        counts = {}  # {gate type: count}
+        for gate in auto_gates:
+            counts[gate.type] = counts.get(gate.type, 0) + 1
+            gate.auto_name = counts[gate.type]
+
+    def levelize(self, gates: List[Gate]) -> dict:
+        """
+        Find the depth of every gate by visiting them in topological order (Kahn's algorithm), in
+        time linear in the number of gates and connections.  Gate.depth is only available once the
+        CircuitCore is built, see CircuitCore.level.
+
+        :return: {Gate: depth}
+        """
+        waiting_on = {}  # {gate: number of inputs driven by gates that do not have a depth yet}
+        ready = deque()
+        for gate in gates:
+            waiting_on[gate] = 0
+            for node in gate.inputs:
+                if not node.is_pi():
+                    waiting_on[gate] += 1
+            if waiting_on[gate] == 0:
+                ready.append(gate)
+        depths = {}
+        while len(ready) > 0:
+            gate = ready.popleft()
+            depth = 0
+            for node in gate.inputs:
+                if not node.is_pi() and depths[node.gate_output] > depth:
+                    depth = depths[node.gate_output]
+            depths[gate] = depth + 1
+            for fanout_gate in gate.output.gates:
+                if fanout_gate in waiting_on:
+                    waiting_on[fanout_gate] -= 1
+                    if waiting_on[fanout_gate] == 0:
+                        ready.append(fanout_gate)
+        if len(depths) != len(gates):
+            raise ValueError("Circuit has a combinational loop or gates driven by nodes outside the circuit.")
+        return depths
+
     def get_gates_list(self) -> List[Gate]:
         gates = []
         for depth in self.gates:
-            gates.extend(list(self.gates[depth].values()))
+            gates.extend(self.gates[depth])
         return gates
 
     def set_controllability(self):
-        depths = sorted(self.gates.keys())
-        for depth in depths:
-            for gate_name in self.gates[depth]:
-                for input in self.gates[depth][gate_name].inputs:
-                    input.set_controllability()
-        last = len(depths) - 1
-        for gate_name in self.gates[last]:
-            self.gates[last][gate_name].output.set_controllability()
+        for node in self.inputs:
+            node.set_controllability()
+        for gate in self.eval_order:
+            gate.output.set_controllability()
+
+    def set_observability(self):
+        """
+        SCOAP combinational observability in one reverse levelized pass.  POs have CO 0, a gate input
+        has CO(output) + the cost of setting the other inputs to non-controlling values + 1, and a
+        node with fanout takes the minimum over its branches.  Needs set_controllability() first.
+        """
+        for node in self.nodes:
+            node.co = 0 if node.is_po() else UNREACHABLE
+        for gate in reversed(self.eval_order):
+            output_co = gate.output.co
+            if output_co == UNREACHABLE:
+                continue
+            if gate.type in ["and", "nand"]:
+                total = sum([inp.cc1 for inp in gate.inputs])
+                side_costs = [total - inp.cc1 for inp in gate.inputs]
+            elif gate.type in ["or", "nor"]:
+                total = sum([inp.cc0 for inp in gate.inputs])
+                side_costs = [total - inp.cc0 for inp in gate.inputs]
+            elif gate.type in ["xor", "xnor"]:
+                costs = [min(inp.cc0, inp.cc1) for inp in gate.inputs]
+                total = sum(costs)
+                side_costs = [total - cost for cost in costs]
+            else:   # buf, not
+                side_costs = [0]
+            for inp, side_cost in zip(gate.inputs, side_costs):
+                co = output_co + side_cost + 1
+                if co < inp.co:
+                    inp.co = co
 
     def find_fault_node(self):
         faulty_nodes = []
@@ -83,9 +243,10 @@ class Circuit:
         """
         Given a node with a fault, return a tuple of
 
-        (1) dict of PI's that affect this node or this node's observability from PO's {name, Node}
-        (2) dict of PO's from the fanout of this node. {name: Node}
-        (3) dict of gates that affect this node or this node's observability from PO's {gate_depth: {name: Gate}}
+        (1) dict of PO's from the fanout of this node. {name: Node}
+        (2) dict of PI's that affect this node or this node's observability from PO's {name, Node}
+        (3) dict of gates that affect this node or this node's observability from PO's {name: Gate}, in
+            evaluation order
         (4) list of internal nodes that affect this node or this node's observability from PO's
 
         When running ATPG based on a fault on this node, we only need to consider the PI's returned from this
@@ -96,6 +257,7 @@ class Circuit:
         start at fault, propagate until you reach all PO's from this gate's fanout, create PO's dict
         for each PO:
             go backward until you reach all PI's reachable from this PO, add them to the dict of PI's and gates
+        Both steps use the structural index and the CircuitCore arrays rather than lists of seen nodes.
         """
         if not fault_node:
             fault_node = self.fault_node
@@ -103,62 +265,91 @@ class Circuit:
                 raise ValueError("No faulty nodes in circuit.")
         primary_outputs = self.find_pos_from_node(fault_node)
         outputs_list = list(primary_outputs.values())
-        seen_nodes = []
+        output_set = set(outputs_list)
+        seen_pis = set()
         primary_inputs = {}
         gates = {}
-        nodes_to_explore = outputs_list.copy()
-        while len(nodes_to_explore) > 0:
-            node = nodes_to_explore.pop(-1)
-            seen_nodes.append(node)
+        internal_nodes = []
+        for node in outputs_list:
             if node.is_pi():
+                seen_pis.add(node)
                 primary_inputs[node.name] = node
-            else:
-                gate = node.gate_output
-                if gate not in gates:
-                    gates[gate.name] = gate
-                for input in gate.inputs:
-                    if input not in seen_nodes:
-                        nodes_to_explore.append(input)
-
-        # construct internal node list
-        for output in outputs_list:
-            seen_nodes.remove(output)
-        for pi in list(primary_inputs.values()):
-            seen_nodes.remove(pi)
+        for gate_idx in self.core.fanin_cone([node.index for node in outputs_list]):
+            gate = self.eval_order[gate_idx]
+            gates[gate.name] = gate
+            if gate.output not in output_set:
+                internal_nodes.append(gate.output)
+            for input in gate.inputs:
+                if input.is_pi() and input not in seen_pis:
+                    seen_pis.add(input)
+                    primary_inputs[input.name] = input
 
         # set instance variables
         self.fault_node = fault_node
         self.fault_gates = gates
         self.fault_pis = primary_inputs
         self.fault_pos = primary_outputs
-        self.fault_internal_nodes = seen_nodes
-        return primary_outputs, primary_inputs, gates, seen_nodes
+        self.fault_internal_nodes = internal_nodes
+        return primary_outputs, primary_inputs, gates, internal_nodes
+
+    def set_fault_cone(self, fault_node: Node = None):
+        """
+        Restrict simulation to the cone of a fault: the gates in the transitive fanin of the POs the
+        fault node can reach (see find_nodes_gates_from_fault).  Until the restriction is lifted,
+        reset, propagate, propagate_events, the D-frontier, X-path checks and fault_propagated only
+        look at these gates and POs.  Values of nodes outside the cone are left as they are.
+
+        :param fault_node: None lifts the restriction and goes back to using the whole circuit
+        """
+        if self.cone_gates is not None:
+            for gate in self.cone_gates:
+                self.in_cone[gate.index] = 0
+        self.cone_node = fault_node
+        if fault_node is None:
+            self.cone_gates = None
+            self.cone_key = None
+            for idx in self.core.outputs:
+                self.target_outputs[idx] = 1
+            return
+        primary_outputs, _, gates, _ = self.find_nodes_gates_from_fault(fault_node)
+        self.cone_gates = sorted(gates.values(), key=lambda gate: gate.index)
+        self.cone_key = tuple(node.index for node in primary_outputs.values())
+        for gate in self.cone_gates:
+            self.in_cone[gate.index] = 1
+        for idx in self.core.outputs:
+            self.target_outputs[idx] = 0
+        for node in primary_outputs.values():
+            self.target_outputs[node.index] = 1
+
+    def is_simulated(self, node: Node) -> bool:
+        """True if propagate keeps the value of the node up to date, see set_fault_cone."""
+        if self.cone_gates is None:
+            return True
+        if node.is_pi():
+            return any(self.in_cone[gate_idx] for gate_idx in self.core.node_fanout(node.index))
+        return bool(self.in_cone[node.gate_output.index])
 
     def find_pos_from_node(self, node: Node):
         """
-        Find all primary outputs reachable through the fanout of a node in the circuit using a DFS.
+        Find all primary outputs reachable through the fanout of a node in the circuit, using the
+        structural index.
         Return as a dict {name, Node}
         """
         primary_outputs = {}
-        seen_node_names = []
-        nodes_to_explore = [node]
-
-        while len(nodes_to_explore) > 0:
-            current_node = nodes_to_explore.pop(-1)  # depth first
-            seen_node_names.append(current_node.name)
-            if current_node.is_po():
-                primary_outputs[current_node.name] = current_node
-            for gate in current_node.gates:
-                output_node = gate.output
-                if output_node.name not in seen_node_names:
-                    nodes_to_explore.append(output_node)
-
+        for idx in self.structure.reachable_outputs(node.index):
+            primary_outputs[self.nodes[idx].name] = self.nodes[idx]
         return primary_outputs
 
     def reset(self):
-        for depth in self.gates:
-            for gate_name in self.gates[depth]:
-                self.gates[depth][gate_name].reset()
+        values = self.core.values
+        if self.cone_gates is None:
+            values[:] = self.core.all_x
+        else:
+            for node in self.fault_pis.values():
+                values[node.index] = X
+            for gate in self.cone_gates:
+                values[gate.output.index] = X
+        self.d_frontier.clear()
 
     def set_inputs(self, inputs):
         assert len(inputs) == len(self.inputs)
@@ -176,17 +367,155 @@ class Circuit:
             self.reset()
         if inputs:
             self.set_inputs(inputs)
-        depths = sorted(self.gates.keys())
-        for depth in depths:
-            for gate_name in self.gates[depth]:
-                self.gates[depth][gate_name].propagate(verbose=verbose)
+        gates = self.eval_order if self.cone_gates is None else self.cone_gates
+        function = self.get_compiled_propagate() if self.compiled and not verbose else None
+        if function is not None:
+            function()
+        else:
+            for gate in gates:
+                if verbose:
+                    gate.propagate(verbose=verbose)
+                else:
+                    gate.output.set_value(gate.evaluate())
+        self.d_frontier = {gate: None for gate in gates if gate.is_on_d_frontier()}
+        if self.stats is not None:
+            self.stats.propagations += 1
+            self.stats.gate_evaluations += len(gates)
         if verbose:
             print("\n\n")
         return self.get_outputs()
 
+    def get_compiled_propagate(self):
+        """
+        Return the compiled function evaluating the gates propagate evaluates (the whole circuit or
+        the current fault cone), or None while the cone is not worth compiling yet.
+        """
+        key = self.cone_key
+        function = self.compiled_functions.get(key)
+        if function is None:
+            if key is not None:
+                count = self.cone_propagations.get(key, 0) + 1
+                self.cone_propagations[key] = count
+                if count < COMPILE_THRESHOLD:
+                    return None
+                del self.cone_propagations[key]
+            gates = self.eval_order if self.cone_gates is None else self.cone_gates
+            if len(self.compiled_functions) >= COMPILED_CACHE_SIZE:
+                del self.compiled_functions[next(iter(self.compiled_functions))]
+            function = value_function(gates, self.nodes)
+            self.compiled_functions[key] = function
+        return function
+
+    def propagate_events(self, changed_nodes: List[Node], verbose=False):
+        """
+        Event-driven (selective trace) simulation.  Only the gates in the fanout of nodes whose state
+        changed are evaluated, level by level, and the trace stops wherever an output keeps its value.
+
+        :param changed_nodes: nodes whose state was just changed (usually a single PI)
+        :return: list of (node, previous encoded value) for every gate output that changed, in the order
+            the changes happened.  Pass it to self.undo() to restore the previous circuit state.
+        """
+        core = self.core
+        values = core.values
+        gates = core.gates
+        gate_level = core.level
+        fanout = core.fanout
+        fanout_start = core.fanout_start
+        trail = []
+        events = {}  # {gate_depth: [gate index]}
+        depths = []  # heap of depths that have scheduled gates
+        scheduled = set()  # gate indices
+        cone_only = self.cone_gates is not None
+        in_cone = self.in_cone
+
+        def schedule(node_idx):
+            for pos in range(fanout_start[node_idx], fanout_start[node_idx + 1]):
+                gate_idx = fanout[pos]
+                if gate_idx in scheduled or (cone_only and not in_cone[gate_idx]):
+                    continue
+                scheduled.add(gate_idx)
+                depth = gate_level[gate_idx]
+                if depth in events:
+                    events[depth].append(gate_idx)
+                else:
+                    events[depth] = [gate_idx]
+                    heapq.heappush(depths, depth)
+
+        for node in changed_nodes:
+            schedule(node.index)
+        evaluated = 0
+        while len(depths) > 0:
+            level = events.pop(heapq.heappop(depths))
+            evaluated += len(level)
+            for gate_idx in level:
+                gate = gates[gate_idx]
+                output = gate.output
+                idx = output.index
+                previous = values[idx]
+                output.set_value(gate.evaluate())
+                if verbose:
+                    print(gate)
+                if values[idx] != previous:
+                    trail.append((output, previous))
+                    schedule(idx)
+        for node in changed_nodes:
+            self.update_d_frontier(node)
+        for node, previous in trail:
+            self.update_d_frontier(node, previous)
+        if self.stats is not None:
+            self.stats.propagations += 1
+            self.stats.gate_evaluations += evaluated
+        if verbose:
+            print("\n\n")
+        return trail
+
+    def undo(self, trail):
+        """Restore the node values recorded by self.propagate_events(), most recent change first."""
+        values = self.core.values
+        undone = []
+        for node, previous in reversed(trail):
+            undone.append((node, values[node.index]))
+            values[node.index] = previous
+        for node, previous in undone:
+            self.update_d_frontier(node, previous)
+
+    def update_d_frontier(self, node: Node, previous: int = None):
+        """
+        Update the D-frontier membership of the gates next to a node whose value changed.
+
+        :param previous: the value of the node before the change, if known.  The gate driving the
+            node can then only change membership if the node was or is X, and the gates it feeds
+            only if it was or is D or ~D, or if they see it through a faulty input pin.
+        """
+        d_frontier = self.d_frontier
+        cone_only = self.cone_gates is not None
+        core = self.core
+        value = core.values[node.index]
+        if node.gate_output is not None and (previous is None or previous == X or value == X):
+            if node.gate_output.is_on_d_frontier():
+                d_frontier[node.gate_output] = None
+            else:
+                d_frontier.pop(node.gate_output, None)
+        if previous is not None and previous < D and value < D and not core.faulty_pins[node.index]:
+            return
+        for pos in range(core.fanout_start[node.index], core.fanout_start[node.index + 1]):
+            gate_idx = core.fanout[pos]
+            if cone_only and not self.in_cone[gate_idx]:
+                continue
+            gate = core.gates[gate_idx]
+            if gate.is_on_d_frontier():
+                d_frontier[gate] = None
+            else:
+                d_frontier.pop(gate, None)
+
     def fault_propagated(self, verbose: bool = False):
-        outputs = self.get_outputs()
-        res = "D" in outputs or "~D" in outputs
+        res = False
+        outputs = self.outputs if self.cone_gates is None else self.fault_pos
+        values = self.core.values
+        for node in outputs.values():
+            if values[node.index] == D or values[node.index] == D_BAR:
+                res = True
+                break
         if verbose:
             print(
                 f"Fault propagated: {'PROPAGATED TO PO!' if res else 'not propagated to PO.'}"
@@ -194,28 +523,76 @@ class Circuit:
         return res
 
     def get_d_frontier(self) -> List[Gate]:
-        """Return list of gates on d-frontier"""
-        d_frontier = []  # list of Gate objects
-        for gate in self.gates_list:
-            if gate.is_on_d_frontier():
-                d_frontier.append(gate)
-        return d_frontier
+        """Return list of gates on d-frontier, in evaluation order"""
+        return sorted(self.d_frontier, key=lambda gate: gate.index)
+
+    def has_x_path(self, node: Node, epoch: int = None) -> bool:
+        """
+        Returns true if there is a path with only X's from this node to one of the target POs.
+
+        Like Node.has_x_path, but nodes that cannot reach a target PO are pruned and visited nodes
+        are stamped with an epoch instead of kept in a list.  The gates that lead to a target PO are
+        the fault cone (in_cone) when one is set, else the gates that reach any PO (see
+        StructuralIndex.reaches_output).
+
+        :param epoch: visited stamp to share between searches, see x_path_check.  A node already
+            stamped with this epoch is known not to have an X path and is skipped.
+        """
+        structure = self.structure
+        core = self.core
+        values = core.values
+        fanout = core.fanout
+        fanout_start = core.fanout_start
+        gate_output = core.gate_output
+        stamps = structure.stamps
+        leads_to_target = structure.reaches_output if self.cone_gates is None else self.in_cone
+        targets = self.target_outputs
+        if epoch is None:
+            epoch = structure.new_epoch()
+        if targets[node.index]:
+            return values[node.index] == X
+        stamps[node.index] = epoch
+        to_explore = [node.index]
+        while len(to_explore) > 0:
+            current = to_explore.pop(-1)   # dfs
+            for pos in range(fanout_start[current], fanout_start[current + 1]):
+                gate_idx = fanout[pos]
+                idx = gate_output[gate_idx]
+                if values[idx] != X or stamps[idx] == epoch or not leads_to_target[gate_idx]:
+                    continue
+                if targets[idx]:
+                    return True
+                stamps[idx] = epoch
+                to_explore.append(idx)
+        return False
+
+    def x_path_check(self, fault_node: Node, dfrontier=None, verbose: bool = False, fault_gate: Gate = None):
+        """
+        Returns true if there is an X path from any 1 of the D-frontier gates to a PO.
+        All searches share one epoch, so each node is explored at most once per check.
 
-    def x_path_check(self, fault_node: Node, dfrontier=None, verbose: bool = False):
-        """Returns true if there is an X path from any 1 of the D-frontier gates to a PO."""
+        :param fault_gate: for a fanout branch fault, the gate whose input pin is faulty
+        """
         if not dfrontier:
             dfrontier = self.get_d_frontier()
+        if self.stats is not None:
+            self.stats.x_path_checks += 1
 
         res = False
+        epoch = self.structure.new_epoch()
 
-        # no nodes on d frontier, could be because this is the initialization, check fault node
+        # no nodes on d frontier, could be because this is the initialization, check fault node.
+        # If the fault node already has a value, the fault is either blocked or cannot be activated.
         if len(dfrontier) == 0:
-            res = fault_node.has_x_path()
+            # a branch fault can only be seen through the output of its gate
+            start = fault_node if fault_gate is None else fault_gate.output
+            res = fault_node.value == X and start.value == X and self.has_x_path(start, epoch)
         else:
             # check nodes on D-frontier
             for gate in dfrontier:
-                if gate.output.has_x_path():
+                if self.has_x_path(gate.output, epoch):
                     res = True
+                    break
 
         if verbose:
             print(f"X Path: path {'' if res else 'not'} found to PO.")
@@ -236,7 +613,7 @@ class Circuit:
         assert stuck_at in opposite
 
         # if gate unassigned, return opposite
-        if node_with_fault.state == "X":
+        if node_with_fault.value == X:
             if verbose:
                 print(f"Objective:\tSet {node_with_fault} to {opposite[stuck_at]}")
             return node_with_fault, opposite[stuck_at]
@@ -245,17 +622,15 @@ class Circuit:
         if not d_frontier:
             d_frontier = self.get_d_frontier()
         assert len(d_frontier) > 0
-        # todo method of selecting gate here?  maybe depth?
-        gate = d_frontier[0]
-        # select an unassigned input to this gate
-        for inp in gate.inputs:
-            if inp.state == "X":
-                break
-        c = 0
+        gate = self.frontier_heuristic(self, d_frontier)
+        # select an unassigned input to this gate.  Every input must end up non-controlling, so
+        # start with the hardest one; for xor/xnor any value propagates, so take the easiest.
         if gate.control_value != -1:
             c = gate.control_value
-        if gate.type in ["xor", "xnor"] and inp.cc0 < inp.cc1:
-            c = 1
+            inp = gate.get_hardest_controllable_input(opposite[c])
+        else:
+            inp = min(gate.get_unassigned_inputs(), key=lambda node: min(node.cc0, node.cc1))
+            c = 1 if inp.cc0 < inp.cc1 else 0
         if verbose:
             print(f"Objective:\tSet {inp} to {opposite[c]}")
         return inp, opposite[c]
@@ -269,7 +644,9 @@ class Circuit:
         :return: a tuple of primary input node, value to set on that node
         """
         opposite = [1, 0]
+        steps = 0
         while not node.is_pi():
+            steps += 1
             if verbose:
                 print(f"Backtrace:\tSet {node} -> {node_value}")
 
@@ -280,6 +657,8 @@ class Circuit:
                     return prev_node.gate_output.get_hardest_controllable_input(val)
                 return node.gate_output.get_easiest_controllable_input(node_value)
 
+            if gate_type == "buf":
+                node = node.gate_output.inputs[0]
             if gate_type == "not":
                 node_value = opposite[node_value]
                 node = node.gate_output.inputs[0]
@@ -305,44 +684,183 @@ class Circuit:
                     node = controllable_node(node, 0, hardest=False)
                 else:
                     node = controllable_node(node, 1, hardest=True)
-            if gate_type == "xor":
-                # todo only supports 2-input gates right now
+            if gate_type in ["xor", "xnor"]:
                 unassigned_inputs = node.gate_output.get_unassigned_inputs()
                 assigned_inputs = node.gate_output.get_assigned_inputs()
-                if len(unassigned_inputs) == 2:  # both X's
-                    node_value = 0
-                    node = controllable_node(node, 0, hardest=True)
-                else:  # assume 1 unassigned input
-                    assert len(unassigned_inputs) == 1
-                    assert len(assigned_inputs) == 1
-                    node = unassigned_inputs[0]
-                    node_value = opposite[assigned_inputs[0].state]
-            if gate_type == "xnor":
-                # todo only supports 2-input gates right now
-                unassigned_inputs = node.gate_output.get_unassigned_inputs()
-                assigned_inputs = node.gate_output.get_assigned_inputs()
-                if len(unassigned_inputs) == 2:  # both X's
-                    # todo is this a bug?  Will never set to 1 if both inputs unassigned!
-                    node_value = 0
-                    node = controllable_node(node, 0, hardest=True)
-                    # node_value = 1
-                    # node = controllable_node(node, 1, hardest=True)
-                else:  # assume 1 unassigned input
+                # parity the inputs must have, xnor is an inverted xor
+                parity = node_value if gate_type == "xor" else opposite[node_value]
+                if len(unassigned_inputs) > 1:
+                    # the other X inputs can still fix the parity, so take the easiest assignment
+                    node = min(unassigned_inputs, key=lambda x: min(x.cc0, x.cc1))
+                    node_value = 0 if node.cc0 <= node.cc1 else 1
+                else:
+                    # the last X input sets the parity, D and ~D count with their good machine value
                     assert len(unassigned_inputs) == 1
-                    assert len(assigned_inputs) == 1
+                    for inp in assigned_inputs:
+                        parity ^= GOOD_VALUE[inp.value]
                     node = unassigned_inputs[0]
-                    if node_value == 1:
-                        node_value = assigned_inputs[0].state
-                    else:
-                        node_value = opposite[assigned_inputs[0].state]
+                    node_value = parity
         if verbose:
             print(f"Backtrace:\tSet {node} -> {node_value}")
+        if self.stats is not None:
+            self.stats.backtrace_steps += steps
 
         return node, node_value
 
+    def get_objectives(
+        self, node_with_fault: Node, stuck_at: int, d_frontier=None, verbose: bool = False
+    ) -> List[Tuple[Node, int]]:
+        """
+        All current objectives, for backtrace_objectives: fault activation, or else a non-controlling
+        value on every X input of the D-frontier gate frontier_heuristic picks.  For xor/xnor any
+        value propagates, so only the easiest input is given, as in objective.
+        """
+        if node_with_fault.value == X:
+            objectives = [(node_with_fault, 1 - stuck_at)]
+        else:
+            if not d_frontier:
+                d_frontier = self.get_d_frontier()
+            assert len(d_frontier) > 0
+            gate = self.frontier_heuristic(self, d_frontier)
+            if gate.control_value != -1:
+                objectives = [(inp, 1 - gate.control_value) for inp in gate.get_unassigned_inputs()]
+            else:
+                inp = min(gate.get_unassigned_inputs(), key=lambda node: min(node.cc0, node.cc1))
+                objectives = [(inp, 0 if inp.cc0 <= inp.cc1 else 1)]
+        if verbose:
+            print(f"Objectives:\t{objectives}")
+        return objectives
+
+    def backtrace_objectives(self, objectives: List[Tuple[Node, int]], verbose: bool = False) -> List[Tuple[Node, int]]:
+        """
+        Final objectives of a multiple backtrace, see backtrace_demands: the conflicting stem if
+        there is one, else the headlines.
+
+        :param objectives: [(Node, value)], see get_objectives
+        :return: [(headline or stem Node, value)] with the largest demand first.  Each one is turned
+            into a PI assignment with backtrace, after the previous ones were assigned.
+        """
+        _, headlines, conflict = self.backtrace_demands(objectives, verbose=verbose)
+        if conflict is not None:
+            return [conflict]
+        return headlines
+
+    def backtrace_demands(self, objectives: List[Tuple[Node, int]], verbose: bool = False):
+        """
+        Multiple backtrace (FAN): demand counts (n0, n1) for every objective are propagated backward
+        at once, deepest node first, so a fanout stem has the counts of all its branches before it is
+        reached.  An AND gate (after removing output inversion) passes n1 to every X input and n0 to
+        its easiest to control X input only, OR gates the other way around, and xor/xnor pass the
+        count of the majority value to one input as in backtrace.  Backtracing stops at fanout free
+        nodes (see StructuralIndex.fanout_free), the headlines, since a single backtrace justifies
+        them without conflicts.
+
+        A stem wanted at both values is a conflict, PIs with fanout included.  As in FAN, the stem at
+        the value with the larger count is then the only final objective, so the conflict is settled
+        first, and the backtrace stops there.
+
+        :param objectives: [(Node, value)], see get_objectives
+        :return: (demands, headlines, conflict): {node index: [n0, n1]} for every node reached,
+            [(headline Node, value)] with the largest demand first, and (stem Node, value) or None
+        """
+        nodes = self.nodes
+        fanout_free = self.structure.fanout_free
+        demands = {}  # {node index: [n0, n1]}
+        # (-driver gate index, node index), the deepest node is popped first.  PIs get 1, after
+        # every gate, so they have the demands of all their branches when they are popped.
+        heap = []
+
+        def add_demand(node, val, count):
+            idx = node.index
+            if idx not in demands:
+                demands[idx] = [0, 0]
+                heapq.heappush(heap, (1 if node.is_pi() else -node.gate_output.index, idx))
+            demands[idx][val] += count
+
+        for node, val in objectives:
+            add_demand(node, val, 1)
+        headlines = []
+        conflict = None
+        steps = 0
+        while heap:
+            _, idx = heapq.heappop(heap)
+            node = nodes[idx]
+            n0, n1 = demands[idx]
+            val = 1 if n1 > n0 or (n1 == n0 and node.cc1 < node.cc0) else 0
+            if n0 and n1 and node.is_fanout():
+                if verbose:
+                    print(f"Multiple backtrace:\tconflict at stem {node}, n0 {n0} n1 {n1}, setting it to {val}")
+                conflict = (node, val)
+                break
+            if fanout_free[idx]:
+                headlines.append((n0 + n1, node, val))
+                continue
+            steps += 1
+            gate = node.gate_output
+            unassigned = gate.get_unassigned_inputs()
+            if len(unassigned) == 0:
+                continue
+            if gate.type in ["xor", "xnor"]:
+                parity = val if gate.type == "xor" else 1 - val
+                if len(unassigned) > 1:
+                    inp = min(unassigned, key=lambda x: min(x.cc0, x.cc1))
+                    add_demand(inp, 0 if inp.cc0 <= inp.cc1 else 1, max(n0, n1))
+                else:
+                    for assigned in gate.get_assigned_inputs():
+                        parity ^= GOOD_VALUE[assigned.value]
+                    add_demand(unassigned[0], parity, max(n0, n1))
+                continue
+            if gate.type in ["not", "nand", "nor"]:
+                n0, n1 = n1, n0
+            if gate.type in ["buf", "not"]:
+                if n0:
+                    add_demand(unassigned[0], 0, n0)
+                if n1:
+                    add_demand(unassigned[0], 1, n1)
+                continue
+            # one input at the controlling value sets the output, setting it the other way needs all
+            control = gate.control_value
+            single, every = (n0, n1) if control == 0 else (n1, n0)
+            if single:
+                add_demand(gate.get_easiest_controllable_input(control), control, single)
+            if every:
+                for inp in unassigned:
+                    add_demand(inp, 1 - control, every)
+        if self.stats is not None:
+            self.stats.backtrace_steps += steps
+        headlines.sort(key=lambda item: -item[0])
+        if verbose and conflict is None:
+            print(f"Multiple backtrace:\theadlines {[(node, val) for _, node, val in headlines]}")
+        return demands, [(node, val) for _, node, val in headlines], conflict
+
     def __repr__(self):
         print("Circuit Object:")
         for gate in self.gates:
             print(self.gates[gate])
         print(f"Inputs: {self.inputs}")
         print(f"Outputs: {self.outputs.values()}")
+
+
+def first_gate(circuit: Circuit, d_frontier: List[Gate]) -> Gate:
+    """The first D-frontier gate in evaluation order."""
+    return d_frontier[0]
+
+
+def most_observable_gate(circuit: Circuit, d_frontier: List[Gate]) -> Gate:
+    """The D-frontier gate whose output is easiest to observe, ties broken by distance to a PO."""
+    po_distance = circuit.structure.po_distance
+    return min(d_frontier, key=lambda gate: (gate.output.co, po_distance[gate.output.index]))
+
+
+def closest_to_po_gate(circuit: Circuit, d_frontier: List[Gate]) -> Gate:
+    """The D-frontier gate with the fewest gates between its output and a PO, ties broken by CO."""
+    po_distance = circuit.structure.po_distance
+    return min(d_frontier, key=lambda gate: (po_distance[gate.output.index], gate.output.co))
+
+
+# {name: function(circuit, d_frontier) -> Gate}, assign one to Circuit.frontier_heuristic
+FRONTIER_HEURISTICS = {
+    "first": first_gate,
+    "observability": most_observable_gate,
+    "distance": closest_to_po_gate,
+}
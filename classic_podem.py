@@ -1,6 +1,19 @@
+import time
 from typing import Tuple
 from circuit import Circuit
-from gate import Node
+from gate import Node, Gate
+from learning import literal
+from logic import X, GOOD_VALUE
+from fault_sim import Fault, FaultSimulator, RandomPatternPhase
+from sat import SAT, UNSAT
+from sat_atpg import run_sat_atpg
+
+RANDOM = "random"  # detected_by value for faults detected in the random pattern phase
+
+# fault status
+DETECTED = "detected"
+UNTESTABLE = "untestable"
+ABORTED = "aborted"     # a PodemLimits limit was reached before the search finished
 
 
 class PIAssignment:
@@ -9,6 +22,10 @@ class PIAssignment:
         assert val in [0, 1]
         self.val = val
         self.alternative_tried = alternative
+        self.trail = None  # node changes caused by this assignment, only kept when event driven
+        # goal literals contradicted in every failed branch below this assignment, None before the
+        # first failure, see nogood.py
+        self.conflict_goals = None
 
     def assign(self, val=None):
         if not val:
@@ -17,26 +34,84 @@ class PIAssignment:
 
 
 class ImplicationStack:
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=False, circuit: Circuit = None):
+        """
+        :param circuit: if given, each assignment is simulated incrementally with
+            circuit.propagate_events() and undone node by node on backtrack, so the caller does not
+            need to call circuit.propagate() after imply() or backtrack().
+        """
         self.stack = []
         self.verbose = verbose
         self.all_combinations_tried = False
+        self.circuit = circuit
+        self.event_driven = circuit is not None
+        self.decisions = 0
+        self.backtracks = 0
+        self.aborted = False  # set by podem() when a search limit is reached
+        self.status = None  # set by run_podem()
+        self.nogoods = None  # a nogood.NogoodCache to learn into and prune with, set by run_podem()
+        self.nogoods_learned = 0
+        self.nogood_prunes = 0
+        self.fixed = 0  # the first assignments are fixed, only one of their values was tried
 
     def imply(self, node: Node, val: int, alternative=False):
         assignment = PIAssignment(node, val, alternative=alternative)
         self.stack.append(assignment)
+        previous = node.value
         assignment.assign()
+        if self.event_driven:
+            assignment.trail = [(node, previous)]
+            assignment.trail.extend(self.circuit.propagate_events([node]))
         if self.verbose:
             print(f"\nImplication Stack:\tAssigned {node} to {val}")
             print(f"Implication Stack:\t{self.get_assignments()}\n")
 
-    def backtrack(self):
+    def decide(self, node: Node, val: int, goals=()):
+        """
+        Assign a PI as a new decision.  A value that completes a nogood of one of the goals is not
+        tried, the other value is assigned as if the first one had already failed.
+
+        :param goals: goal literals of the fault, see nogood.py
+        :return: None, or the goals neither value can set.  Nothing is assigned then and the caller
+            has to backtrack.
+        """
+        self.decisions += 1
+        if self.nogoods is not None and goals:
+            literals = self.get_literals()
+            blocked = self.nogoods.lookup(goals, literals | {literal(node.index, val)})
+            if blocked:
+                self.nogood_prunes += 1
+                other = self.nogoods.lookup(goals, literals | {literal(node.index, 1 - val)})
+                if other:
+                    return blocked & other
+                if self.verbose:
+                    print(f"Implication Stack:\t{node} at {val} completes a nogood, trying {1 - val}")
+                self.imply(node, 1 - val, alternative=True)
+                self.stack[-1].conflict_goals = blocked
+                return None
+        self.imply(node, val)
+        return None
+
+    def backtrack(self, conflict_goals: frozenset = frozenset()):
+        """
+        :param conflict_goals: goal literals the current assignments contradict, the cause of the
+            failure if it is not fault dependent.  Used to learn nogoods, see nogood.py.
+        """
         if self.verbose:
             print("\nImplication Stack:\tbacktracking.")
         if self.all_combinations_tried:
             return False
+        if len(self.stack) == 0:
+            # nothing was assigned, so there is nothing to try
+            self.all_combinations_tried = True
+            return False
+        self.backtracks += 1
+        self.add_conflict(conflict_goals)
         current = self.set_x()
         while current.alternative_tried:
+            if len(self.stack) >= self.fixed:
+                # both values failed, so every extension of the assignments below fails
+                self.learn(current.conflict_goals or frozenset())
             if len(self.stack) == 0:
                 # no combinations left
                 if self.verbose:
@@ -49,12 +124,36 @@ class ImplicationStack:
 
         opposite = [1, 0]
         self.imply(current.node, opposite[current.val], True)
+        self.stack[-1].conflict_goals = current.conflict_goals
         return True
 
+    def add_conflict(self, conflict_goals: frozenset):
+        """Account a failed branch to the last assignment."""
+        if self.nogoods is None or len(self.stack) == 0:
+            return
+        last = self.stack[-1]
+        last.conflict_goals = conflict_goals if last.conflict_goals is None else last.conflict_goals & conflict_goals
+
+    def learn(self, conflict_goals: frozenset):
+        """Store the current assignments as a nogood of each goal and pass the failure down."""
+        if self.nogoods is None:
+            return
+        if conflict_goals:
+            literals = self.get_literals()
+            for goal in conflict_goals:
+                if self.nogoods.add(goal, literals):
+                    self.nogoods_learned += 1
+                    if self.verbose:
+                        print(f"Implication Stack:\tlearned nogood, node {goal >> 1} cannot be {goal & 1}")
+        self.add_conflict(conflict_goals)
+
     def set_x(self):
         """Sets the last implied node to an X and removes from the implication stack."""
         last_implication = self.stack.pop(-1)
-        last_implication.assign("X")
+        if self.event_driven:
+            self.circuit.undo(last_implication.trail)
+        else:
+            last_implication.assign("X")
         if self.verbose:
             print(
                 f"\nImplication Stack:\tUnassigned {last_implication.node} to {last_implication.node.state}"
@@ -62,6 +161,10 @@ class ImplicationStack:
             print(f"Implication Stack:\t{self.get_assignments()}\n")
         return last_implication
 
+    def get_literals(self) -> set:
+        """The assignments as a set of literals, see learning.literal."""
+        return {literal(assignment.node.index, assignment.val) for assignment in self.stack}
+
     def get_assignments(self):
         assigments = {}
         for assigment in self.stack:
@@ -77,73 +180,351 @@ class ImplicationStack:
         return res
 
 
+class PodemLimits:
+    def __init__(self, max_backtracks: int = None, max_decisions: int = None, time_limit: float = None):
+        """
+        Per-fault limits for the PODEM search, None means no limit.  A search that hits a limit is
+        aborted: the fault is neither detected nor proven untestable.
+
+        :param time_limit: wall clock seconds
+        """
+        self.max_backtracks = max_backtracks
+        self.max_decisions = max_decisions
+        self.time_limit = time_limit
+
+    def exceeded(self, implication_stack: "ImplicationStack", start: float) -> bool:
+        if self.max_backtracks is not None and implication_stack.backtracks > self.max_backtracks:
+            return True
+        if self.max_decisions is not None and implication_stack.decisions > self.max_decisions:
+            return True
+        if self.time_limit is not None and time.perf_counter() - start > self.time_limit:
+            return True
+        return False
+
+
 def podem(
     circuit: Circuit,
     faulty_node: Node,
     stuck_at: int,
     implication_stack: ImplicationStack,
     verbose: bool = False,
+    limits: PodemLimits = None,
+    fault_gate: Gate = None,
+    necessary=None,
 ):
+    """
+    Iterative PODEM: the implication stack is the decision stack, so the search depth is not bound
+    by the recursion limit.  Returns True if a test was found.  If a limit was hit the search
+    stops, implication_stack.aborted is set and False is returned.
+
+    :param fault_gate: for a fanout branch fault, the gate whose input pin from faulty_node is
+        stuck at, see run_podem
+    :param necessary: [(Node, value)] good machine values every test must set, see
+        learning.StaticLearning.  The search backtracks as soon as one of them is contradicted.
+
+    If implication_stack.nogoods is set, decisions are checked against it and nogoods are learned
+    from the failed branches, see nogood.py.
+
+    If circuit.multiple_backtrace is set, all objectives are backtraced at once and the headlines
+    reached are assigned one PI per iteration until they run out or the search backtracks.  If no
+    X headline is reached, the iteration falls back to objective and backtrace.  Each assignment is
+    still a separate decision, so the search stays complete.
+    """
+    start = time.perf_counter()
+    # phase times are only taken when circuit.stats is set
+    times = circuit.stats.times if circuit.stats is not None else None
+    # [(Node, value, literal)] good machine values every test must set, see nogood.py
+    goals = [(node, val, literal(node.index, val)) for node, val in necessary or []]
+    if implication_stack.nogoods is not None and not goals:
+        goals.append((faulty_node, 1 - stuck_at, literal(faulty_node.index, 1 - stuck_at)))
+    goal_literals = [lit for _, _, lit in goals]
+    headlines = []  # [(Node, value)] left from the last multiple backtrace, see Circuit.backtrace_objectives
     while not circuit.fault_propagated(verbose=verbose):
-        if (
-            circuit.x_path_check(fault_node=faulty_node, verbose=verbose)
-            and implication_stack.more_tests_possible()
-        ):
-            node, val = circuit.objective(faulty_node, stuck_at, verbose=verbose)
-            pi, pi_val = circuit.backtrace(node, val, verbose=verbose)
-            implication_stack.imply(pi, pi_val)
-            circuit.propagate(verbose=verbose)
-            if podem(
-                circuit, faulty_node, stuck_at, implication_stack, verbose=verbose
-            ):
-                return True
-            # backtrack
-            backtrack_success = implication_stack.backtrack()
-            circuit.propagate(verbose=verbose)
-            if backtrack_success and podem(
-                circuit, faulty_node, stuck_at, implication_stack, verbose=verbose
-            ):
-                return True
-            if backtrack_success:
-                implication_stack.set_x()
-            return False
-        elif not implication_stack.more_tests_possible():
+        if limits and limits.exceeded(implication_stack, start):
+            implication_stack.aborted = True
+            if verbose:
+                print("PODEM:\tsearch limit reached, fault aborted.")
             return False
+        if times is not None:
+            t0 = time.perf_counter()
+        violated = frozenset(lit for node, val, lit in goals if GOOD_VALUE[node.value] == 1 - val)
+        if violated:
+            x_path = False
+            if verbose:
+                print("PODEM:\ta necessary assignment is contradicted.")
+            if necessary and circuit.stats is not None:
+                circuit.stats.learning_conflicts += 1
+        else:
+            x_path = circuit.x_path_check(fault_node=faulty_node, verbose=verbose, fault_gate=fault_gate)
+        if times is not None:
+            t1 = time.perf_counter()
+            times["x_path"] += t1 - t0
+        if x_path:
+            if circuit.multiple_backtrace:
+                # headlines already justified by earlier assignments of the round are skipped
+                while headlines and headlines[0][0].value != X:
+                    headlines.pop(0)
+                if not headlines:
+                    objectives = circuit.get_objectives(faulty_node, stuck_at, verbose=verbose)
+                    headlines = circuit.backtrace_objectives(objectives, verbose=verbose)
+            if headlines:
+                node, val = headlines.pop(0)
+            else:
+                # no multiple backtrace, or it reached no X headline
+                node, val = circuit.objective(faulty_node, stuck_at, verbose=verbose)
+            if times is not None:
+                t2 = time.perf_counter()
+                times["objective"] += t2 - t1
+            pi, pi_val = circuit.backtrace(node, val, verbose=verbose)
+            if times is not None:
+                t3 = time.perf_counter()
+                times["backtrace"] += t3 - t2
+            conflict_goals = implication_stack.decide(pi, pi_val, goal_literals)
+            if times is not None:
+                t1 = time.perf_counter()
+                times["imply"] += t1 - t3
         else:
-            implication_stack.backtrack()
+            conflict_goals = violated   # empty if the failure depends on the fault
+        if conflict_goals is not None:
+            headlines = []
+            backtracked = implication_stack.backtrack(conflict_goals)
+            if times is not None:
+                times["backtrack"] += time.perf_counter() - t1
+            if not backtracked:
+                return False
+        if not implication_stack.event_driven:
             circuit.propagate(verbose=verbose)
     return True
 
 
 def run_podem(
-    circuit: Circuit, faulty_node: Node, stuck_at: int, verbose=True
+    circuit: Circuit,
+    faulty_node: Node,
+    stuck_at: int,
+    verbose=False,
+    event_driven=True,
+    limits: PodemLimits = None,
+    cone=True,
+    fault_gate: Gate = None,
+    fixed_assignments=None,
+    sat_fallback=False,
+    fault_pin: int = None,
 ) -> Tuple[bool, ImplicationStack]:
+    """
+    :param event_driven: simulate each PI assignment incrementally instead of re-propagating the
+        whole circuit after every imply/backtrack.
+    :param limits: per-fault search limits.  The outcome is stored in implication_stack.status as
+        DETECTED, UNTESTABLE or ABORTED.
+    :param cone: only simulate the fault's cone (see Circuit.set_fault_cone).  The search and the
+        test found are the same, but nodes outside the cone keep whatever values they had before.
+    :param fault_gate: if given, target the fanout branch fault on the input pin of this gate
+        driven by faulty_node, instead of the stem fault on faulty_node
+    :param fault_pin: position of that pin in fault_gate.inputs, for a node driving several pins
+        of the gate.  Defaults to the first pin driven by faulty_node.
+    :param fixed_assignments: {PI_Node: value} assigned before the search starts and never
+        backtracked on, so a test is only found if it extends these assignments.  UNTESTABLE then
+        means untestable under these assignments.
+    :param sat_fallback: if PODEM aborts, retry with the SAT engine (see sat_atpg.py), which
+        detects the fault or proves it untestable unless its own conflict limit is reached.  The
+        stack then holds the SAT test and node values are left as PODEM left them.  Off by
+        default here and in every run_* driver, since a SAT search can take far longer than the
+        PODEM limits allow.
+
+    If circuit.learning is set, the necessary assignments of the fault are checked during the search
+    (see podem) and a fault whose necessary assignments conflict is UNTESTABLE without a search.
+    If circuit.nogoods is set, the search prunes with the nogoods learned so far and adds the ones it
+    learns, see nogood.py.
+
+    If circuit.stats is set, counters and phase times are collected and a per-fault record is added,
+    see stats.py.
+    """
+    stats = circuit.stats
+    if stats is not None:
+        stats.start_fault()
+        setup_start = time.perf_counter()
+    necessary = []
+    if circuit.learning is not None:
+        necessary = circuit.learning.necessary_assignments(faulty_node, stuck_at, fault_gate)
+    if cone:
+        circuit.set_fault_cone(faulty_node if fault_gate is None else fault_gate.output)
+    if necessary:
+        necessary = [(node, val) for node, val in necessary if circuit.is_simulated(node)]
     circuit.reset()
     circuit.propagate(verbose=False)
-    faulty_node.make_faulty(stuck_at=stuck_at, set=False)
+    if fault_gate is None:
+        faulty_node.make_faulty(stuck_at=stuck_at, set=False)
+    else:
+        if fault_pin is None:
+            fault_pin = fault_gate.inputs.index(faulty_node)
+        fault_gate.make_pin_faulty(fault_pin, stuck_at)
     if verbose:
-        print(f"Testing node {faulty_node} stuck at {stuck_at}.")
-    implication_stack = ImplicationStack(verbose=verbose)
-    res = podem(circuit, faulty_node, stuck_at, implication_stack, verbose=verbose)
+        branch = "" if fault_gate is None else f" at the input of {fault_gate.name}"
+        print(f"Testing node {faulty_node}{branch} stuck at {stuck_at}.")
+    implication_stack = ImplicationStack(
+        verbose=verbose, circuit=circuit if event_driven else None
+    )
+    implication_stack.nogoods = circuit.nogoods
+    if fixed_assignments:
+        # pushed as already flipped, so backtracking pops them instead of trying the other value
+        for node, val in fixed_assignments.items():
+            implication_stack.imply(node, val, alternative=True)
+        implication_stack.fixed = len(fixed_assignments)
+        if not event_driven:
+            circuit.propagate(verbose=verbose)
+    if stats is not None:
+        stats.times["setup"] += time.perf_counter() - setup_start
+    if necessary is None:
+        res = False     # the necessary assignments conflict
+        if verbose:
+            print("PODEM:\tnecessary assignments conflict, fault untestable.")
+    else:
+        res = podem(
+            circuit,
+            faulty_node,
+            stuck_at,
+            implication_stack,
+            verbose=verbose,
+            limits=limits,
+            fault_gate=fault_gate,
+            necessary=necessary,
+        )
+    if res:
+        implication_stack.status = DETECTED
+    else:
+        implication_stack.status = ABORTED if implication_stack.aborted else UNTESTABLE
     if verbose:
         print(implication_stack.get_assignments())
-    faulty_node.remove_fault()
+    if fault_gate is None:
+        faulty_node.remove_fault()
+    else:
+        fault_gate.remove_pin_fault()
+    if cone:
+        circuit.set_fault_cone(None)
+    if sat_fallback and implication_stack.status == ABORTED:
+        if stats is not None:
+            sat_start = time.perf_counter()
+        result, assignments, solver = run_sat_atpg(
+            circuit,
+            faulty_node,
+            stuck_at,
+            fault_gate=fault_gate,
+            fixed_assignments=fixed_assignments,
+            verbose=verbose,
+            fault_pin=fault_pin,
+        )
+        if result == SAT:
+            res = True
+            implication_stack.status = DETECTED
+            assignments = {**(fixed_assignments or {}), **assignments}
+            implication_stack.stack = [PIAssignment(node, val) for node, val in assignments.items()]
+        elif result == UNSAT:
+            implication_stack.status = UNTESTABLE
+            implication_stack.aborted = False
+        if stats is not None:
+            stats.sat_calls += 1
+            stats.sat_conflicts += solver.conflicts
+            stats.times["sat"] += time.perf_counter() - sat_start
+    if stats is not None:
+        stats.decisions += implication_stack.decisions
+        stats.backtracks += implication_stack.backtracks
+        stats.nogoods_learned += implication_stack.nogoods_learned
+        stats.nogood_prunes += implication_stack.nogood_prunes
+        stats.end_fault(faulty_node, stuck_at, fault_gate, implication_stack.status, pin=fault_pin)
     return res, implication_stack
 
 
-def run_all_nodes_podem(circuit: Circuit, verbose: bool = True):
+def fill_assignments(circuit: Circuit, assignments, fill: int = 0):
+    """Turn a partial PI assignment {PI_Node: value} into a full pattern, one value per circuit input."""
+    return [assignments.get(node, fill) for node in circuit.inputs]
+
+
+def get_faults(circuit: Circuit):
+    """Return the faults of the internal node fault model: stuck at 0 and 1 on every internal node."""
+    faults = []
+    for node in circuit.nodes:
+        if node.is_pi() or node.is_po():
+            continue
+        for stuck_at in [0, 1]:
+            faults.append(Fault(node, stuck_at))
+    return faults
+
+
+def target_faults(circuit: Circuit, fault_list: bool = False):
+    """
+    Return (faults to run PODEM on, the FaultList they represent or None), see run_all_nodes_podem.
+    """
+    if not fault_list:
+        return get_faults(circuit), None
+    from fault_list import FaultList  # not at the top, fault_list.py imports this module
+    fault_list = FaultList(circuit, dominance=False)
+    return fault_list.targets, fault_list
+
+
+def format_results(results, faults, fault_list=None):
+    """
+    Turn {Fault: entry} for the targeted faults into the result structure of run_all_nodes_podem:
+    the results of every fault of fault_list, or {Node: {stuck_at: entry}} for the internal node
+    fault model, with detected_by as a (Node, stuck_at) tuple.
+
+    :param faults: the targeted faults, see target_faults
+    """
+    if fault_list is not None:
+        return fault_list.expand(results)
+    res = {}
+    for fault in faults:
+        entry = results[fault]
+        detected_by = entry.get("detected_by")
+        if isinstance(detected_by, Fault):
+            entry["detected_by"] = (detected_by.node, detected_by.stuck_at)
+        res.setdefault(fault.node, {})[fault.stuck_at] = entry
+    return res
+
+
+def run_all_nodes_podem(
+    circuit: Circuit,
+    verbose: bool = False,
+    fault_dropping: bool = False,
+    random_phase: RandomPatternPhase = None,
+    limits: PodemLimits = None,
+    cone: bool = True,
+    sat_fallback: bool = False,
+    fault_list: bool = False,
+):
+    """
+    Run PODEM on every fault of the circuit: stuck at 0 and 1 on every internal node (neither a PI
+    nor a PO, see get_faults), with results keyed by node.
+
+    :param fault_dropping: after each successful PODEM search, fault simulate the test (with its
+        unassigned PIs filled with 0) against every fault not handled yet and skip the search for
+        the faults it detects.
+    :param random_phase: if given, run this random pattern phase first and only run PODEM on the
+        faults that none of the random patterns detect.
+    :param limits: per-fault PODEM search limits, faults that hit them get the status ABORTED.
+    :param cone: restrict each PODEM search to the fault's cone, see run_podem.
+    :param sat_fallback: retry the faults PODEM aborts with the SAT engine, see run_podem.
+    :param fault_list: run on the faults of fault_list.FaultList(circuit, dominance=False) instead:
+        stuck at 0 and 1 on every node, PIs and POs included, and on every fanout branch.  PODEM
+        runs on one fault per equivalence class, its result is copied to the rest of the class and
+        the results are keyed by fault.
+    """
     res = {}  # See details below on this data structure
     """
     {
-        Node_name:
+        Node:
         {
             0:  # for stuck at 0
             {
                 "test_possible": True,
-                "assignements":
+                "status": DETECTED,     # or UNTESTABLE or ABORTED
+                "assignments":
                 {
                     PI_Node: value
                 }
+                # only with fault_dropping or random_phase, the (Node, stuck_at) fault whose test
+                # detects this one (possibly itself) or "random".  For a fault detected by a test
+                # generated for another fault or by a random pattern, the assignments are the
+                # full pattern.
+                "detected_by": (Node, stuck_at)
             }
             1:
             {
@@ -151,18 +532,75 @@ def run_all_nodes_podem(circuit: Circuit, verbose: bool = True):
             }
         }
     }
+
+    With fault_list:
+    {
+        Fault:  # every fault of the fault list, see fault_sim.Fault
+        {
+            ...     # as above, with "detected_by": Fault
+        }
+    }
     """
+    faults, collapsed = target_faults(circuit, fault_list)
 
-    for node in circuit.nodes:
-        if node.is_pi() or node.is_po():
+    fault_simulator = None
+    if fault_dropping or random_phase:
+        fault_simulator = FaultSimulator(circuit)
+    remaining = dict.fromkeys(faults)  # faults not handled yet, in order
+
+    if random_phase:
+        start = time.perf_counter()
+        patterns, detected, _ = random_phase.run(fault_simulator, faults, verbose=verbose)
+        if circuit.stats is not None:
+            circuit.stats.times["random_patterns"] += time.perf_counter() - start
+        for fault, pattern_idx in detected.items():
+            del remaining[fault]
+            res[fault] = {
+                "test_possible": True,
+                "status": DETECTED,
+                "assignments": dict(zip(circuit.inputs, patterns[pattern_idx])),
+                "detected_by": RANDOM,
+            }
+
+    for fault in faults:
+        if fault not in remaining:
+            continue    # already detected by an earlier test
+        del remaining[fault]
+        test_possible, stack = run_podem(
+            circuit,
+            faulty_node=fault.node,
+            stuck_at=fault.stuck_at,
+            verbose=verbose,
+            limits=limits,
+            cone=cone,
+            fault_gate=fault.gate,
+            fault_pin=fault.pin,
+            sat_fallback=sat_fallback,
+        )
+        assignments = stack.get_assignments()
+        res[fault] = {
+            "test_possible": test_possible,
+            "status": stack.status,
+            "assignments": assignments,
+        }
+        if not fault_simulator:
             continue
-        res[node] = {}
-        for stuck_at in [0, 1]:
-            test_possible, stack = run_podem(
-                circuit, faulty_node=node, stuck_at=stuck_at, verbose=verbose
-            )
-            res[node][stuck_at] = {
-                "test_possible": test_possible,
-                "assignments": stack.get_assignments(),
+        res[fault]["detected_by"] = fault if test_possible else None
+        if not test_possible or not fault_dropping:
+            continue
+        pattern = fill_assignments(circuit, assignments)
+        start = time.perf_counter()
+        detected = fault_simulator.simulate(list(remaining), [pattern])
+        if circuit.stats is not None:
+            circuit.stats.times["fault_simulation"] += time.perf_counter() - start
+        for dropped in detected:
+            del remaining[dropped]
+            res[dropped] = {
+                "test_possible": True,
+                "status": DETECTED,
+                "assignments": dict(zip(circuit.inputs, pattern)),
+                "detected_by": fault,
             }
-    return res
+        if verbose and len(detected) > 0:
+            print(f"Fault simulation: test for {fault} also detects {list(detected)}")
+    return format_results(res, faults, collapsed)
@@ -0,0 +1,177 @@
+"""
+Test set compaction.
+
+PODEM leaves most PIs unassigned, so each test is a cube: a partial assignment {PI_Node: value}.
+
+Dynamic compaction: after a cube is generated for a primary fault, PODEM is run again for other
+faults with the cube's assignments fixed, so the same test also covers them if the free PIs allow.
+These secondary searches use small limits, since most of them are expected to fail.
+
+Static compaction: compatible cubes (no PI assigned opposite values) are merged, the don't cares
+are filled and the patterns are fault simulated in reverse order, keeping only the patterns that
+detect a fault none of the later patterns detect.
+"""
+from itertools import islice
+from typing import Dict, List, Tuple
+from circuit import Circuit
+from classic_podem import DETECTED, PodemLimits, run_podem, fill_assignments
+from fault_sim import Fault, FaultSimulator
+from fault_list import FaultList
+
+
+def merge_cubes(cubes: List[dict]) -> List[dict]:
+    """
+    Greedily merge compatible cubes, the most specified first.  Each cube is merged into the first
+    merged cube it does not conflict with.
+    """
+    merged = []
+    for cube in sorted(cubes, key=len, reverse=True):
+        for target in merged:
+            if all(target.get(node, val) == val for node, val in cube.items()):
+                target.update(cube)
+                break
+        else:
+            merged.append(dict(cube))
+    return merged
+
+
+def reverse_order_compaction(
+    fault_simulator: FaultSimulator, patterns: List[List[int]], faults: List[Fault], block_size: int = 1024
+) -> List[List[int]]:
+    """
+    Fault simulate the patterns from last to first with fault dropping and return, in their original
+    order, the patterns that detect at least one fault not detected by a later pattern.  The
+    patterns kept detect the same faults as all the patterns together.
+    """
+    reversed_patterns = patterns[::-1]
+    remaining = list(faults)
+    keep = set()
+    for start in range(0, len(reversed_patterns), block_size):
+        if len(remaining) == 0:
+            break
+        block = reversed_patterns[start:start + block_size]
+        # the first detecting pattern of each fault within the block is the one a one by one pass keeps
+        detected, remaining = fault_simulator.drop_detected(remaining, block)
+        keep.update(start + pattern_idx for pattern_idx in detected.values())
+    return [reversed_patterns[idx] for idx in sorted(keep, reverse=True)]
+
+
+def static_compaction(
+    circuit: Circuit,
+    cubes: List[dict],
+    faults: List[Fault],
+    fill: int = 0,
+    fault_simulator: FaultSimulator = None,
+    fallback_patterns: Dict[Fault, List[int]] = None,
+) -> List[List[int]]:
+    """
+    Merge the cubes, fill them and drop the redundant patterns by reverse order fault simulation.
+
+    :param faults: the faults the test set must detect
+    :param fallback_patterns: {fault: pattern that detects it}, for faults that were detected by the
+        fill of an unmerged cube.  If merging changes that fill, the pattern is added back so that
+        no fault is lost.
+    """
+    if fault_simulator is None:
+        fault_simulator = FaultSimulator(circuit)
+    patterns = [fill_assignments(circuit, cube, fill=fill) for cube in merge_cubes(cubes)]
+    if fallback_patterns:
+        detected = fault_simulator.simulate(faults, patterns) if patterns else {}
+        added = set()
+        for fault in faults:
+            if fault not in detected and fault in fallback_patterns:
+                pattern = tuple(fallback_patterns[fault])
+                if pattern not in added:
+                    added.add(pattern)
+                    patterns.append(list(pattern))
+    return reverse_order_compaction(fault_simulator, patterns, faults)
+
+
+def run_compacted_podem(
+    circuit: Circuit,
+    faults: List[Fault] = None,
+    verbose: bool = False,
+    limits: PodemLimits = None,
+    dynamic: bool = True,
+    secondary_limits: PodemLimits = None,
+    max_secondary: int = 32,
+    fill: int = 0,
+    cone: bool = True,
+    sat_fallback: bool = False,
+) -> Tuple[List[List[int]], Dict[Fault, str]]:
+    """
+    Generate a compacted test set.  Each PODEM test is fault simulated to drop the faults it
+    already detects, then static compaction is applied to the cubes.
+
+    :param faults: defaults to one fault per equivalence class of FaultList(circuit)
+    :param dynamic: try to extend every cube to more faults, see the module docstring
+    :param secondary_limits: search limits for the secondary faults of dynamic compaction, by
+        default 8 backtracks
+    :param max_secondary: number of secondary faults tried per cube
+    :param sat_fallback: retry the primary faults PODEM aborts with the SAT engine, see run_podem.
+        Secondary searches are expected to fail and are never retried.
+    :return: (patterns, {fault: DETECTED, UNTESTABLE or ABORTED})
+    """
+    if faults is None:
+        faults = FaultList(circuit, dominance=False).targets
+    if secondary_limits is None:
+        secondary_limits = PodemLimits(max_backtracks=8)
+    fault_simulator = FaultSimulator(circuit)
+    status = {}
+    cubes = []
+    fallback_patterns = {}  # {fault: filled pattern that detected it}
+    remaining = dict.fromkeys(faults)  # faults not handled yet, in order
+
+    def search(fault, fixed_assignments=None, search_limits=None, fallback=False):
+        return run_podem(
+            circuit,
+            faulty_node=fault.node,
+            stuck_at=fault.stuck_at,
+            verbose=verbose,
+            limits=search_limits,
+            cone=cone,
+            fault_gate=fault.gate,
+            fault_pin=fault.pin,
+            fixed_assignments=fixed_assignments,
+            sat_fallback=fallback,
+        )
+
+    for fault in faults:
+        if fault not in remaining:
+            continue    # already detected by an earlier test
+        del remaining[fault]
+        test_possible, stack = search(fault, search_limits=limits, fallback=sat_fallback)
+        status[fault] = stack.status
+        if not test_possible:
+            continue
+        cube = stack.get_assignments()
+        if dynamic:
+            for other in list(islice(remaining, max_secondary)):
+                if len(cube) == len(circuit.inputs):
+                    break   # no free PIs left
+                test_possible, stack = search(other, fixed_assignments=cube, search_limits=secondary_limits)
+                if test_possible:
+                    cube = stack.get_assignments()
+                    del remaining[other]
+                    status[other] = DETECTED
+                    if verbose:
+                        print(f"Dynamic compaction: test for {fault} extended to {other}")
+        cubes.append(cube)
+        pattern = fill_assignments(circuit, cube, fill=fill)
+        for dropped in fault_simulator.simulate(list(remaining), [pattern]):
+            del remaining[dropped]
+            status[dropped] = DETECTED
+            fallback_patterns[dropped] = pattern
+
+    detected = [fault for fault in faults if status[fault] == DETECTED]
+    patterns = static_compaction(
+        circuit,
+        cubes,
+        detected,
+        fill=fill,
+        fault_simulator=fault_simulator,
+        fallback_patterns=fallback_patterns,
+    )
+    if verbose:
+        print(f"Compaction: {len(cubes)} tests compacted to {len(patterns)} patterns for {len(detected)} faults")
+    return patterns, status
@@ -0,0 +1,101 @@
+"""
+Compiled simulation.
+
+Instead of interpreting a list of gates, Python source is generated with one straight-line block
+per gate and compiled once.  Operand indices and truth tables are baked into the code, values
+computed earlier in the function are kept in local variables, and there is no per-gate loop
+overhead, method call or dispatch on the gate type.
+
+Two kinds of functions are generated:
+- word functions for bit-parallel good machine simulation, f(words, mask), which update a list of
+  packed words in place (see pattern_sim.py)
+- value functions for 5-valued simulation, f(), which update the CircuitCore values of the gate
+  outputs like Gate.propagate does, including stuck at nodes and faulty input pins (see
+  Circuit.propagate)
+
+Compiling is expensive, a function costs about as much as a few hundred interpreted passes over the
+same gates, so the callers only compile what they expect to evaluate many times.
+"""
+from typing import Callable, Dict, List
+from logic import GATE_TABLES, FAULT_EFFECT
+
+CHUNK = 16  # operands per generated expression, long expressions overflow the compiler's recursion
+
+
+def compile_function(source: str, name: str, namespace: dict) -> Callable:
+    """Compile the source of a single function and return the function."""
+    code = compile(source, f"<compiled {name}>", "exec")
+    namespace = dict(namespace)
+    exec(code, namespace)
+    return namespace[name]
+
+
+def word_function(steps, operators: Dict[int, str], name: str = "simulate_words") -> Callable:
+    """
+    Generate f(words, mask) evaluating PatternSimulator steps in order.
+
+    :param steps: [(output index, operation, inverted, input indices)]
+    :param operators: {operation: Python operator}, e.g. {AND: "&"}
+    """
+    lines = [f"def {name}(w, mask):"]
+    local = set()  # node indices already held in a local variable
+
+    def operand(idx):
+        return f"v{idx}" if idx in local else f"w[{idx}]"
+
+    for output, operation, inverted, inputs in steps:
+        op = f" {operators[operation]} "
+        lines.append(f"    v = {op.join(operand(idx) for idx in inputs[:CHUNK])}")
+        for start in range(CHUNK, len(inputs), CHUNK):
+            lines.append(f"    v = v{op}{op.join(operand(idx) for idx in inputs[start:start + CHUNK])}")
+        if inverted:
+            lines.append(f"    w[{output}] = v{output} = v ^ mask")
+        else:
+            lines.append(f"    w[{output}] = v{output} = v")
+        local.add(output)
+    lines.append("    return w")
+    return compile_function("\n".join(lines), name, {})
+
+
+def value_function(gates: List, nodes: List, name: str = "propagate_values") -> Callable:
+    """
+    Generate f() evaluating the gates in order on encoded node values.  Gates with a faulty input
+    pin fall back to Gate.evaluate and stuck at outputs get FAULT_EFFECT, as in Node.set_value.
+
+    :param gates: gates in evaluation order, usually circuit.eval_order or a fault cone
+    :param nodes: circuit.nodes, node i must have index i
+    """
+    tables = {}  # {id(table): name in the generated code}
+    namespace = {"N": nodes, "V": nodes[0].core.values, "FE": FAULT_EFFECT}
+
+    def table_name(table):
+        if id(table) not in tables:
+            tables[id(table)] = f"T{len(tables)}"
+            namespace[tables[id(table)]] = table
+        return tables[id(table)]
+
+    namespace["G"] = {gate.index: gate for gate in gates}
+    lines = [f"def {name}():"]
+    local = set()
+
+    def operand(node):
+        return f"v{node.index}" if node.index in local else f"V[{node.index}]"
+
+    for gate in gates:
+        table, finish, _ = GATE_TABLES[gate.type]
+        out = gate.output.index
+        # the fold starts from the identity of the operation, so it can start from the first input
+        expr = operand(gate.inputs[0])
+        fold = table_name(table)
+        for count, node in enumerate(gate.inputs[1:], 1):
+            if count % CHUNK == 0:
+                lines.append(f"    t = {expr}")
+                expr = "t"
+            expr = f"{fold}[{expr}][{operand(node)}]"
+        lines.append(f"    g = G[{gate.index}]")
+        lines.append(f"    v{out} = {table_name(finish)}[{expr}] if g.fault_pin is None else g.evaluate()")
+        lines.append(f"    n = N[{out}]")
+        lines.append(f"    V[{out}] = v{out} = v{out} if n.stuck_at is None else FE[n.stuck_at][v{out}]")
+        local.add(out)
+    lines.append("    return None")
+    return compile_function("\n".join(lines), name, namespace)
@@ -0,0 +1,153 @@
+"""
+Shared fixtures: small circuits and an exhaustive fault simulation oracle.
+
+The oracle simulates all 2^n patterns of a circuit at once, pattern k setting PI i to bit i of k,
+with its own gate evaluation over the CircuitCore arrays, so it shares no code with the engines it
+checks.
+"""
+import pytest
+from benchmark import CASES
+from classic_podem import DETECTED, UNTESTABLE, run_podem
+from core import GATE_TYPES
+from fault_list import FaultList
+from fault_sim import Fault
+from generator import random_circuit
+from netlist import read_bench
+
+# {name: bench text or random_circuit parameters}, every circuit has at most 8 PIs
+SMALL_CIRCUITS = {
+    "c17": CASES["c17"],
+    "s27": CASES["s27"],
+    "random-and-or": dict(num_gates=24, num_inputs=6, depth=6, xor_ratio=0.0, seed=1),
+    "random-xor": dict(num_gates=24, num_inputs=6, depth=5, max_fanin=4, xor_ratio=0.4, seed=2),
+    "random-reconvergent": dict(num_gates=32, num_inputs=7, depth=8, reconvergence=0.8, seed=3),
+    "random-deep": dict(num_gates=30, num_inputs=5, depth=15, seed=4),
+    "random-wide": dict(num_gates=40, num_inputs=8, depth=6, max_fanin=6, seed=5),
+    # a drives two pins of g and b two pins of h, so each pin has its own branch faults
+    "repeated-pins": """
+INPUT(a)
+INPUT(b)
+INPUT(c)
+OUTPUT(h)
+OUTPUT(k)
+g = AND(a, c, a)
+h = XOR(b, b, g)
+k = OR(b, c)
+""",
+}
+
+
+def build_circuit(name: str):
+    spec = SMALL_CIRCUITS[name]
+    if isinstance(spec, str):
+        return read_bench(spec.splitlines(), source=name)
+    return random_circuit(**spec)
+
+
+@pytest.fixture(params=list(SMALL_CIRCUITS))
+def small_circuit(request):
+    return build_circuit(request.param)
+
+
+def pattern_index(circuit, pattern) -> int:
+    """Index in the oracle words of a full pattern (one 0/1 value per PI)."""
+    return sum(val << idx for idx, val in enumerate(pattern))
+
+
+def exhaustive_words(circuit, fault=None):
+    """
+    Simulate every pattern, with a fault injected if given.  Returns (one word per node, mask),
+    bit k of a word being the node value under pattern k.
+    """
+    core = circuit.core
+    num_inputs = len(core.inputs)
+    count = 1 << num_inputs
+    mask = (1 << count) - 1
+    words = [0] * len(core.nodes)
+    for pos, idx in enumerate(core.inputs):
+        words[idx] = sum(1 << k for k in range(count) if (k >> pos) & 1)
+    stuck = None
+    if fault is not None:
+        stuck = mask if fault.stuck_at else 0
+        if fault.gate is None and fault.node.is_pi():
+            words[fault.node.index] = stuck
+    for gate_idx in range(len(core.gates)):
+        gate_type = GATE_TYPES[core.gate_type[gate_idx]]
+        inputs = [words[idx] for idx in core.gate_inputs(gate_idx)]
+        if fault is not None and fault.gate is not None and fault.gate.index == gate_idx:
+            inputs[fault.pin] = stuck
+        value = inputs[0]
+        for word in inputs[1:]:
+            if gate_type in ["and", "nand"]:
+                value &= word
+            elif gate_type in ["or", "nor"]:
+                value |= word
+            else:
+                value ^= word
+        if gate_type in ["not", "nand", "nor", "xnor"]:
+            value ^= mask
+        output = core.gate_output[gate_idx]
+        if fault is not None and fault.gate is None and fault.node.index == output:
+            value = stuck
+        words[output] = value
+    return words, mask
+
+
+def detecting_patterns(circuit, fault) -> int:
+    """Word with bit k set if pattern k detects the fault, 0 for an untestable fault."""
+    good, _ = exhaustive_words(circuit)
+    faulty, _ = exhaustive_words(circuit, fault)
+    detected = 0
+    for idx in circuit.core.outputs:
+        detected |= good[idx] ^ faulty[idx]
+    return detected
+
+
+def cube_detects(circuit, fault, cube) -> bool:
+    """True if every full pattern extending the partial assignment {PI_Node: value} detects the fault."""
+    detected = detecting_patterns(circuit, fault)
+    for k in range(1 << len(circuit.inputs)):
+        if all((k >> pos) & 1 == cube[node] for pos, node in enumerate(circuit.inputs) if node in cube):
+            if not (detected >> k) & 1:
+                return False
+    return True
+
+
+def node_results(results):
+    """Turn the {Node: {stuck_at: entry}} results of run_all_nodes_podem into {Fault: entry}."""
+    return {Fault(node, stuck_at): entry for node, entries in results.items() for stuck_at, entry in entries.items()}
+
+
+def check_results(circuit, results, faults=None):
+    """
+    Check {Fault: entry} results of an unlimited search against the oracle: every fault has an
+    entry, detectable faults are DETECTED by their assignments and the others are UNTESTABLE.
+
+    :param faults: defaults to every fault of the fault list
+    """
+    if faults is None:
+        faults = FaultList(circuit, dominance=False).faults
+    assert set(results) == set(faults)
+    for fault, entry in results.items():
+        if detecting_patterns(circuit, fault):
+            assert entry["status"] == DETECTED, fault
+            assert entry["test_possible"]
+            assert cube_detects(circuit, fault, entry["assignments"]), fault
+        else:
+            assert entry["status"] == UNTESTABLE, fault
+            assert not entry["test_possible"]
+
+
+def run_every_fault(circuit, **options):
+    """Run run_podem on every fault of the fault list, return {Fault: entry} like run_all_nodes_podem."""
+    results = {}
+    for fault in FaultList(circuit, dominance=False).faults:
+        test_possible, stack = run_podem(
+            circuit, fault.node, fault.stuck_at, fault_gate=fault.gate, fault_pin=fault.pin, **options
+        )
+        results[fault] = {
+            "test_possible": test_possible,
+            "status": stack.status,
+            "assignments": stack.get_assignments(),
+        }
+    return results
@@ -0,0 +1,109 @@
+"""
+Compact array representation of a levelized circuit.
+
+Nodes and gates are numbered: node i is circuit.nodes[i] and gate g is circuit.eval_order[g], so
+gate indices are already in evaluation order.  Connectivity is stored CSR style: the inputs of
+gate g are fanin[fanin_start[g]:fanin_start[g + 1]] and the gates fed by node i are
+fanout[fanout_start[i]:fanout_start[i + 1]].  Node.index and Gate.index refer back to positions in
+these arrays.
+
+The core also holds the state that used to live in every object: the encoded 5-valued value of
+each node (values, see logic.py), the level of each gate (level) and the fanout lists.  Node.value,
+Node.gates and Gate.depth are views over these arrays, and the hot loops of Circuit read the arrays
+directly.  The engines that simulate many machines at once (pattern_sim.py, fault_sim.py,
+learning.py, sat_atpg.py) keep their own values indexed by node index.
+"""
+from array import array
+from typing import List
+from logic import X
+
+GATE_TYPES = ("buf", "not", "and", "nand", "or", "nor", "xor", "xnor")
+TYPE_CODES = {gate_type: code for code, gate_type in enumerate(GATE_TYPES)}
+
+
+class CircuitCore:
+    def __init__(self, circuit):
+        """:param circuit: a Circuit, after levelization"""
+        self.nodes = circuit.nodes
+        self.gates = circuit.eval_order
+        # read before renumbering, the fanout of a node may still be a view over another core
+        fanouts = [node.gates for node in self.nodes]
+        for idx, gate in enumerate(self.gates):
+            gate.index = idx
+        for idx, node in enumerate(self.nodes):
+            node.index = idx
+            node.core = self
+            node._gates = None
+        num_nodes = len(self.nodes)
+        num_gates = len(self.gates)
+
+        self.gate_type = array("b", [TYPE_CODES[gate.type] for gate in self.gates])
+        self.gate_output = array("i", [gate.output.index for gate in self.gates])
+        self.driver = array("i", [-1]) * num_nodes  # gate driving each node, -1 for PIs
+        for gate in self.gates:
+            self.driver[gate.output.index] = gate.index
+
+        self.fanin_start = array("i", [0]) * (num_gates + 1)
+        self.fanin = array("i")
+        for gate in self.gates:
+            self.fanin.extend(node.index for node in gate.inputs)
+            self.fanin_start[gate.index + 1] = len(self.fanin)
+
+        self.fanout_start = array("i", [0]) * (num_nodes + 1)
+        self.fanout = array("i")
+        for idx, gates in enumerate(fanouts):
+            self.fanout.extend(gate.index for gate in gates)
+            self.fanout_start[idx + 1] = len(self.fanout)
+
+        self.inputs = array("i", [node.index for node in circuit.inputs])
+        self.outputs = array("i", [node.index for node in circuit.outputs.values()])
+
+        # gates are in evaluation order, so the gates driving the inputs of a gate come before it
+        self.level = array("i", [0]) * num_gates  # max number of gates from a PI, 1 for gates fed by PIs only
+        for gate_idx in range(num_gates):
+            level = 0
+            for node_idx in self.gate_inputs(gate_idx):
+                driver = self.driver[node_idx]
+                if driver != -1 and self.level[driver] > level:
+                    level = self.level[driver]
+            self.level[gate_idx] = level + 1
+        self.all_x = bytes([X]) * num_nodes
+        self.values = bytearray(self.all_x)  # encoded node values
+        self.faulty_pins = bytearray(num_nodes)  # faulty input pins each node drives, see Gate.make_pin_faulty
+
+    def gate_inputs(self, gate_idx: int):
+        return self.fanin[self.fanin_start[gate_idx]:self.fanin_start[gate_idx + 1]]
+
+    def node_fanout(self, node_idx: int):
+        return self.fanout[self.fanout_start[node_idx]:self.fanout_start[node_idx + 1]]
+
+    def fanout_cone(self, node_idx: int) -> List[int]:
+        """Indices of the gates in the transitive fanout of a node, in evaluation order."""
+        seen = bytearray(len(self.gates))
+        cone = []
+        nodes_to_explore = [node_idx]
+        while len(nodes_to_explore) > 0:
+            current = nodes_to_explore.pop(-1)
+            for pos in range(self.fanout_start[current], self.fanout_start[current + 1]):
+                gate_idx = self.fanout[pos]
+                if not seen[gate_idx]:
+                    seen[gate_idx] = 1
+                    cone.append(gate_idx)
+                    nodes_to_explore.append(self.gate_output[gate_idx])
+        cone.sort()
+        return cone
+
+    def fanin_cone(self, node_indices: List[int]) -> List[int]:
+        """Indices of the gates in the transitive fanin of some nodes, in evaluation order."""
+        seen = bytearray(len(self.gates))
+        cone = []
+        nodes_to_explore = list(node_indices)
+        while len(nodes_to_explore) > 0:
+            gate_idx = self.driver[nodes_to_explore.pop(-1)]
+            if gate_idx == -1 or seen[gate_idx]:
+                continue
+            seen[gate_idx] = 1
+            cone.append(gate_idx)
+            nodes_to_explore.extend(self.gate_inputs(gate_idx))
+        cone.sort()
+        return cone
@@ -0,0 +1,209 @@
+"""
+Fault list construction and collapsing.
+
+The fault universe has a stuck at 0 and a stuck at 1 fault on every node (the stem) and, for nodes
+that fan out to more than one place, on every fanout branch (Fault.gate and Fault.pin set), one per
+gate input pin.  It is collapsed with the gate-level rules below, where a gate input means the
+branch fault if the input node has branches and the stem fault otherwise:
+
+    equivalence     buf / not:      input s-a-v == output s-a-v / output s-a-(not v)
+                    and / nand:     every input s-a-0 == output s-a-0 / output s-a-1
+                    or / nor:       every input s-a-1 == output s-a-1 / output s-a-0
+    dominance       and / nand:     output s-a-1 / output s-a-0 dominates every input s-a-1
+                    or / nor:       output s-a-0 / output s-a-1 dominates every input s-a-0
+
+A test for one fault of an equivalence class detects all of them, so only one representative per
+class is targeted.  Every test for an input fault also detects the output fault that dominates it,
+so classes that dominate another class are not targeted either.  run_fault_list_podem confirms
+them by fault simulation and only runs PODEM on the ones no test detects.
+"""
+from typing import Dict
+from circuit import Circuit
+from classic_podem import DETECTED, PodemLimits, run_podem, fill_assignments
+from fault_sim import Fault, FaultSimulator
+from gate import Node, Gate
+
+# {gate type: [(input stuck at, equivalent output stuck at)]}
+EQUIVALENCES = {
+    "buf": [(0, 0), (1, 1)],
+    "not": [(0, 1), (1, 0)],
+    "and": [(0, 0)],
+    "nand": [(0, 1)],
+    "or": [(1, 1)],
+    "nor": [(1, 0)],
+}
+
+# {gate type: (input stuck at, output stuck at that dominates it)}
+DOMINANCES = {
+    "and": (1, 1),
+    "nand": (1, 0),
+    "or": (0, 0),
+    "nor": (0, 1),
+}
+
+
+def has_branches(node: Node) -> bool:
+    """True if the node fans out to more than one gate or to a gate and a PO."""
+    return node.fanout_count() > 1 or (node.declared_po and node.fanout_count() > 0)
+
+
+class FaultList:
+    def __init__(self, circuit: Circuit, dominance: bool = True):
+        """
+        Enumerates the stem and branch faults of a circuit and collapses them.
+
+        :param dominance: also drop the classes that dominate another class, not only equivalent faults
+        """
+        self.circuit = circuit
+        self.faults = []  # [Fault], every fault in the circuit
+        for node in circuit.nodes:
+            for stuck_at in [0, 1]:
+                self.faults.append(Fault(node, stuck_at))
+            if has_branches(node):
+                # a gate appears once per pin the node drives
+                for gate in dict.fromkeys(node.gates):
+                    for pin, inp in enumerate(gate.inputs):
+                        if inp is node:
+                            for stuck_at in [0, 1]:
+                                self.faults.append(Fault(node, stuck_at, gate, pin))
+        position = {fault: idx for idx, fault in enumerate(self.faults)}
+
+        # union find over fault positions, the root of a class is its first fault
+        parent = list(range(len(self.faults)))
+
+        def find(idx):
+            while parent[idx] != idx:
+                parent[idx] = parent[parent[idx]]
+                idx = parent[idx]
+            return idx
+
+        def union(a, b):
+            a, b = find(a), find(b)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+        dominance_pairs = []  # [(position of dominating fault, position of dominated fault)]
+        for gate in circuit.eval_order:
+            for input_stuck_at, output_stuck_at in EQUIVALENCES.get(gate.type, []):
+                output = position[Fault(gate.output, output_stuck_at)]
+                for pin, node in enumerate(gate.inputs):
+                    union(position[self.input_fault(node, input_stuck_at, gate, pin)], output)
+            if gate.type in DOMINANCES:
+                input_stuck_at, output_stuck_at = DOMINANCES[gate.type]
+                output = position[Fault(gate.output, output_stuck_at)]
+                for pin, node in enumerate(gate.inputs):
+                    inp = position[self.input_fault(node, input_stuck_at, gate, pin)]
+                    if len(gate.inputs) == 1:
+                        union(inp, output)  # a single input and/or is a buffer
+                    else:
+                        dominance_pairs.append((output, inp))
+
+        self.representative = {}  # {Fault: first fault of its equivalence class}
+        self.classes = {}  # {representative: [Fault]}, the equivalence classes
+        for idx, fault in enumerate(self.faults):
+            rep = self.faults[find(idx)]
+            self.representative[fault] = rep
+            self.classes.setdefault(rep, []).append(fault)
+
+        # {representative of a dropped class: [representatives of the classes it dominates]}
+        self.dominating = {}
+        if dominance:
+            for dominating, dominated in dominance_pairs:
+                dominating, dominated = self.faults[find(dominating)], self.faults[find(dominated)]
+                if dominating != dominated:
+                    self.dominating.setdefault(dominating, []).append(dominated)
+        # faults to run ATPG on, in the order of self.faults
+        self.targets = [rep for rep in self.classes if rep not in self.dominating]
+
+    def input_fault(self, node: Node, stuck_at: int, gate: Gate, pin: int) -> Fault:
+        """
+        The fault on the line from node into pin gate.inputs[pin]: its branch fault if node has
+        branches, else its stem fault.
+        """
+        if has_branches(node):
+            return Fault(node, stuck_at, gate, pin)
+        return Fault(node, stuck_at)
+
+    def expand(self, results: Dict[Fault, dict]) -> Dict[Fault, dict]:
+        """Copy the result of every representative to the faults of its class, in the order of self.faults."""
+        return {
+            fault: dict(results[self.representative[fault]])
+            for fault in self.faults if self.representative[fault] in results
+        }
+
+    def __repr__(self):
+        return (
+            f"FaultList: {len(self.faults)} faults, {len(self.classes)} equivalence classes, "
+            f"{len(self.targets)} targets"
+        )
+
+
+def run_fault_list_podem(
+    circuit: Circuit,
+    fault_list: FaultList = None,
+    verbose: bool = False,
+    limits: PodemLimits = None,
+    cone: bool = True,
+    sat_fallback: bool = False,
+) -> Dict[Fault, dict]:
+    """
+    Run PODEM on the targets of a collapsed fault list and expand the results to every fault.
+
+    Returns {Fault: {"test_possible", "status", "assignments", "detected_by"}} like the entries of
+    run_all_nodes_podem, where detected_by is the target whose test detects the fault.  Assignments
+    are partial for targets and their equivalent faults, and full patterns for faults confirmed
+    by fault simulation.
+
+    :param fault_list: defaults to FaultList(circuit)
+    :param sat_fallback: retry the faults PODEM aborts with the SAT engine, see run_podem.
+    """
+    if fault_list is None:
+        fault_list = FaultList(circuit)
+    if verbose:
+        print(fault_list)
+
+    results = {}  # {representative: entry}
+    tests = []  # [full pattern], one per detected target
+    test_targets = []  # [Fault], the target of each test
+
+    def target(fault):
+        test_possible, stack = run_podem(
+            circuit,
+            faulty_node=fault.node,
+            stuck_at=fault.stuck_at,
+            verbose=verbose,
+            limits=limits,
+            cone=cone,
+            fault_gate=fault.gate,
+            fault_pin=fault.pin,
+            sat_fallback=sat_fallback,
+        )
+        assignments = stack.get_assignments()
+        results[fault] = {
+            "test_possible": test_possible,
+            "status": stack.status,
+            "assignments": assignments,
+            "detected_by": fault if test_possible else None,
+        }
+        if test_possible:
+            tests.append(fill_assignments(circuit, assignments))
+            test_targets.append(fault)
+
+    for fault in fault_list.targets:
+        target(fault)
+
+    # classes dropped by dominance are detected by the tests of the classes they dominate, unless
+    # those are untestable or aborted
+    dropped = list(fault_list.dominating)
+    detected = FaultSimulator(circuit).simulate(dropped, tests) if tests else {}
+    for fault in dropped:
+        if fault in detected:
+            results[fault] = {
+                "test_possible": True,
+                "status": DETECTED,
+                "assignments": dict(zip(circuit.inputs, tests[detected[fault]])),
+                "detected_by": test_targets[detected[fault]],
+            }
+        else:
+            target(fault)
+    return fault_list.expand(results)
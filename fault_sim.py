@@ -0,0 +1,196 @@
+"""
+Parallel-pattern single-fault propagation (PPSFP) fault simulation.
+
+The fault-free circuit is simulated once per block of packed patterns with PatternSimulator.  Each
+fault is then injected on its own and only the gates in the fanout cone of the faulty node are
+re-evaluated.  A pattern detects the fault if any PO word differs from the fault-free one.  A fault
+on a fanout branch is injected by re-evaluating the gate it feeds with the faulty input value.
+"""
+import random
+from collections import namedtuple
+from typing import Dict, List
+from circuit import Circuit
+from gate import Node
+from compiled import word_function
+from pattern_sim import PatternSimulator, pack_patterns, evaluate_words, AND, OR, OPERATORS
+
+# detect calls using a fanout cone before the cone is compiled, when the simulator is compiled
+COMPILE_THRESHOLD = 64
+
+# gate is None for a fault on a node (the stem), else the fault is on input pin gate.inputs[pin],
+# which node drives, i.e. on one fanout branch of node.  A node can drive several pins of one gate.
+Fault = namedtuple("Fault", ["node", "stuck_at", "gate", "pin"], defaults=[None, None])
+
+
+class FaultSimulator:
+    def __init__(self, circuit: Circuit, simulator: PatternSimulator = None):
+        self.circuit = circuit
+        self.simulator = simulator if simulator else PatternSimulator(circuit)
+        self.output_indices = set(self.simulator.output_indices)
+        self.cones = {}  # {node index: ([steps in the fanout cone], [PO indices in the fanout cone])}
+        # {node index: compiled function of the cone steps}, used when the simulator is compiled
+        self.compiled_cones = {}
+        self.cone_uses = {}  # {node index: detect calls}, for COMPILE_THRESHOLD
+
+    def get_cone(self, node: Node):
+        """
+        Return the evaluation steps for the gates in the fanout cone of a node, in evaluation order,
+        and the indices of the POs in that cone.  Cached per node.
+        """
+        if node.index in self.cones:
+            return self.cones[node.index]
+        steps = [self.simulator.steps[gate_idx] for gate_idx in self.circuit.core.fanout_cone(node.index)]
+        outputs = [step[0] for step in steps if step[0] in self.output_indices]
+        if node.index in self.output_indices:
+            outputs.append(node.index)
+        self.cones[node.index] = (steps, outputs)
+        return steps, outputs
+
+    def get_compiled_cone(self, node: Node, steps):
+        """
+        Return the compiled function of the cone steps of a node (see compiled.word_function), or
+        None until the cone has been used COMPILE_THRESHOLD times.
+        """
+        function = self.compiled_cones.get(node.index)
+        if function is None:
+            uses = self.cone_uses.get(node.index, 0) + 1
+            self.cone_uses[node.index] = uses
+            if uses < COMPILE_THRESHOLD:
+                return None
+            del self.cone_uses[node.index]
+            function = word_function(steps, OPERATORS, name=f"cone_{node.index}")
+            self.compiled_cones[node.index] = function
+        return function
+
+    def detect(self, fault: Fault, good_words: List[int], count: int) -> int:
+        """
+        Return a word with bit k set if pattern k detects the fault.
+
+        :param good_words: fault-free node words from PatternSimulator.simulate_words
+        :param count: number of patterns packed in the words
+        """
+        mask = (1 << count) - 1
+        node_idx = fault.node.index
+        faulty_value = mask if fault.stuck_at else 0
+        if faulty_value == good_words[node_idx]:
+            return 0    # not activated by any pattern
+        words = list(good_words)
+        if fault.gate is None:
+            steps, outputs = self.get_cone(fault.node)
+            words[node_idx] = faulty_value
+        else:
+            # only the gate on the faulty branch sees the faulty value
+            steps, outputs = self.get_cone(fault.gate.output)
+            output, operation, inverted, inputs = self.simulator.steps[fault.gate.index]
+            values = [words[idx] for idx in inputs]
+            values[fault.pin] = faulty_value
+            words[output] = evaluate_words(operation, inverted, values, mask)
+        function = None
+        if self.simulator.compiled:
+            function = self.get_compiled_cone(fault.node if fault.gate is None else fault.gate.output, steps)
+        if function is not None:
+            function(words, mask)
+        else:
+            for output, operation, inverted, inputs in steps:
+                value = words[inputs[0]]
+                if operation == AND:
+                    for idx in inputs[1:]:
+                        value &= words[idx]
+                elif operation == OR:
+                    for idx in inputs[1:]:
+                        value |= words[idx]
+                else:
+                    for idx in inputs[1:]:
+                        value ^= words[idx]
+                if inverted:
+                    value ^= mask
+                words[output] = value
+        detected = 0
+        for idx in outputs:
+            detected |= words[idx] ^ good_words[idx]
+        return detected
+
+    def simulate(self, faults: List[Fault], patterns: List[List[int]]) -> Dict[Fault, int]:
+        """
+        Fault simulate a list of 0/1 patterns (one value per PI, in the order of circuit.inputs).
+        Returns {fault: index of the first pattern that detects it} for the detected faults.
+        """
+        detected = {}
+        good_words = self.simulator.simulate_words(pack_patterns(patterns), len(patterns))
+        for fault in faults:
+            word = self.detect(fault, good_words, len(patterns))
+            if word:
+                detected[fault] = (word & -word).bit_length() - 1
+        return detected
+
+    def drop_detected(self, faults: List[Fault], patterns: List[List[int]]):
+        """
+        Fault simulate the patterns and split the faults into detected and remaining ones.
+        Returns ({fault: index of the first detecting pattern}, [remaining faults in their original order]).
+        """
+        detected = self.simulate(faults, patterns)
+        remaining = [fault for fault in faults if fault not in detected]
+        return detected, remaining
+
+
+class RandomPatternPhase:
+    def __init__(
+        self,
+        batch_size: int = 64,
+        seed: int = 0,
+        min_new_faults: int = 1,
+        patience: int = 1,
+        max_batches: int = None,
+    ):
+        """
+        Applies batches of pseudo-random patterns and keeps the ones that detect new faults.
+
+        Stopping rule: stop after `patience` batches in a row that each detect fewer than
+        min_new_faults new faults, after max_batches batches, or when no faults are left.
+
+        :param batch_size: number of patterns simulated in parallel per batch
+        :param seed: seed for the pattern generator, the phase is deterministic for a given seed
+        """
+        self.batch_size = batch_size
+        self.seed = seed
+        self.min_new_faults = min_new_faults
+        self.patience = patience
+        self.max_batches = max_batches
+        self.batches_run = 0
+
+    def run(self, fault_simulator: FaultSimulator, faults: List[Fault], verbose: bool = False):
+        """
+        Returns a tuple of
+        (1) list of kept patterns (one 0/1 value per PI, in the order of circuit.inputs)
+        (2) dict {fault: index of the kept pattern that detects it}
+        (3) list of faults not detected by any pattern, in their original order
+        """
+        rng = random.Random(self.seed)
+        num_inputs = len(fault_simulator.circuit.inputs)
+        kept = []
+        detected = {}
+        remaining = list(faults)
+        unproductive = 0
+        self.batches_run = 0
+        while len(remaining) > 0 and unproductive < self.patience:
+            if self.max_batches is not None and self.batches_run >= self.max_batches:
+                break
+            self.batches_run += 1
+            batch = [[rng.getrandbits(1) for _ in range(num_inputs)] for _ in range(self.batch_size)]
+            batch_detected, remaining = fault_simulator.drop_detected(remaining, batch)
+            kept_indices = {}  # {index in batch: index in kept}
+            for fault, pattern_idx in batch_detected.items():
+                if pattern_idx not in kept_indices:
+                    kept_indices[pattern_idx] = len(kept)
+                    kept.append(batch[pattern_idx])
+                detected[fault] = kept_indices[pattern_idx]
+            if len(batch_detected) < self.min_new_faults:
+                unproductive += 1
+            else:
+                unproductive = 0
+            if verbose:
+                print(
+                    f"Random patterns:\tbatch {self.batches_run} detected {len(batch_detected)} new faults, "
+                    f"{len(remaining)} left."
+                )
+        return kept, detected, remaining
@@ -1,5 +1,5 @@
-import itertools
 from typing import TypeVar, Generic
+from logic import X, D, D_BAR, ENCODE, DECODE, GATE_TABLES, FAULT_EFFECT, evaluate
 
 # needed because node and gate classes reference each other
 GateType = TypeVar("GateType")
@@ -10,20 +10,73 @@ def generate_name(count):
 
 
 class Node:
+    __slots__ = (
+        "stuck_at", "core", "_gates", "gate_output", "auto_name", "_name", "cc0", "cc1", "co",
+        "declared_po", "index",
+    )
     name_count = 0
 
     def __init__(self, name: str=None, gate_output: GateType=None, stuck_at=None):
         self.stuck_at = stuck_at
-        self.state = 'X'
-        self.gates = []  # gates for which this node is an input
+        # the CircuitCore holding the value and fanout of this node, set when a Circuit is built
+        self.core = None
+        self._gates = []  # gates for which this node is an input, until the core holds them
         self.gate_output = gate_output  # gate for which this node is an output, None for PI
-        if name is not None:
-            self.name = name
-        else:
+        # creation stamp of generated names, a Circuit renames these nodes per circuit.  Generated
+        # names are not stored, see name.
+        self.auto_name = None
+        self._name = name
+        if name is None:
             Node.name_count += 1
-            self.name = generate_name(self.name_count)
+            self.auto_name = Node.name_count
         self.cc0 = None
         self.cc1 = None
+        self.co = None  # SCOAP combinational observability, set by Circuit.set_observability()
+        self.declared_po = False  # set for POs that also fan out to other gates, see is_po()
+        self.index = None  # position in the circuit's CircuitCore arrays, see core.py
+
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            return generate_name(self.auto_name)
+        return self._name
+
+    @name.setter
+    def name(self, name: str):
+        self._name = name
+
+    @property
+    def value(self) -> int:
+        """Encoded state, see logic.py, kept in CircuitCore.values.  X while not in a circuit."""
+        if self.core is None:
+            return X
+        return self.core.values[self.index]
+
+    @value.setter
+    def value(self, value: int):
+        self.core.values[self.index] = value
+
+    @property
+    def gates(self) -> list:
+        """Gates for which this node is an input, read from the CircuitCore fanout."""
+        core = self.core
+        if core is None:
+            return self._gates
+        gates = core.gates
+        return [gates[gate_idx] for gate_idx in core.node_fanout(self.index)]
+
+    @gates.setter
+    def gates(self, gates: list):
+        if self.core is not None:
+            raise ValueError(f"The fanout of {self.name} is fixed once it is part of a circuit")
+        self._gates = gates
+
+    def fanout_count(self) -> int:
+        """Number of gates fed by this node."""
+        core = self.core
+        if core is None:
+            return len(self._gates)
+        return core.fanout_start[self.index + 1] - core.fanout_start[self.index]
 
     def set_controllability(self):
         """Return a tuple of CC0, CC1"""
@@ -34,47 +87,19 @@ class Node:
         gate_type = self.gate_output.type
         gate_inputs = self.gate_output.inputs
 
-        def xor_cc1_xnor_cc0(inputs):
+        def parity_controllability(inputs):
             """
-            Gets the xor cc1 and the equivalent xnor cc0
-            = min(all combinations with odd number of 1's) + 1
+            Return the minimum cost of setting the inputs to an even and to an odd number of 1's.
+            Built up one input at a time, so linear in the fan-in.
             """
-            def construct_odds(n):
-                """
-                Returns all combinations of n input variables with odd number of 1's.
-
-                If a number is a 1, it is included in the result, else it is not
-                included in the result and is assumed to be 0.
-
-                Returned as a list of tuples.
-
-                Examples:
-                construct_odds(2) -> [(1), (2)]
-                construct_odds(3) -> [(1), (2), (3), (1, 2, 3)]
-                construct_odds(4) -> [(1), (2), (3), (4), (1, 2, 3), (1, 2, 4), (1, 3, 4), (2, 3, 4)]
-
-                :param n: number of input variables
-                :return: a list of tuples
-                """
-                odds = [x for x in range(1, n + 1) if x % 2 == 1]
-
-                res = []
-                for odd in odds:
-                    res.extend(list(itertools.combinations(range(1, n + 1), odd)))
-                return res
-
-            min = 1000000
-            for combination in construct_odds(len(inputs)):
-                term = 0
-                for idx, input in enumerate(gate_inputs):
-                    if idx + 1 in combination:
-                        term += input.cc1
-                    else:
-                        term += input.cc0
-                if term < min:
-                    min = term
-            return min + 1
-
+            even, odd = 0, float("inf")
+            for inp in inputs:
+                even, odd = min(even + inp.cc0, odd + inp.cc1), min(even + inp.cc1, odd + inp.cc0)
+            return even, odd
+
+        if gate_type == 'buf':
+            cc0 = gate_inputs[0].cc0 + 1
+            cc1 = gate_inputs[0].cc1 + 1
         if gate_type == 'not':
             cc0 = gate_inputs[0].cc1 + 1
             cc1 = gate_inputs[0].cc0 + 1
@@ -91,11 +116,13 @@ class Node:
             cc0 = min([x.cc1 for x in gate_inputs]) + 1
             cc1 = sum([x.cc0 for x in gate_inputs]) + 1
         if gate_type == 'xor':
-            cc0 = min([sum([x.cc0 for x in gate_inputs]), sum([x.cc1 for x in gate_inputs])]) + 1
-            cc1 = xor_cc1_xnor_cc0(gate_inputs)
+            even, odd = parity_controllability(gate_inputs)
+            cc0 = even + 1
+            cc1 = odd + 1
         if gate_type == 'xnor':
-            cc0 = xor_cc1_xnor_cc0(gate_inputs)
-            cc1 = min([sum([x.cc0 for x in gate_inputs]), sum([x.cc1 for x in gate_inputs])]) + 1
+            even, odd = parity_controllability(gate_inputs)
+            cc0 = odd + 1
+            cc1 = even + 1
         self.cc0 = cc0
         self.cc1 = cc1
         return cc0, cc1
@@ -105,7 +132,7 @@ class Node:
     
     def remove_fault(self):
         self.stuck_at = None
-        self.state = 'X'
+        self.value = X
     
     def make_faulty(self, stuck_at: int, set: bool=False):
         self.stuck_at = stuck_at
@@ -113,54 +140,61 @@ class Node:
             self.activate_fault()
 
     def reset(self):
-        self.state = 'X'
+        self.value = X
+
+    @property
+    def state(self):
+        """The state of this node as one of 0, 1, 'X', 'D', '~D'."""
+        return DECODE[self.value]
+
+    @state.setter
+    def state(self, val):
+        self.value = ENCODE[val]
 
     def is_faulty(self):
         return self.stuck_at != None
 
     def is_fanout(self):
-        return len(self.gates) > 1
+        return self.fanout_count() > 1
 
     def set_state(self, val):
-        if self.is_faulty() and val in ['D', '~D']:
-            raise ValueError(f"Trying to assign {val} to a faulty gate {self}")
-        if self.stuck_at == 0 and val == 1:
-            self.state = 'D'
-            return
-        if self.stuck_at == 1 and val == 0:
-            self.state = '~D'
-            return
-        self.state = val
+        self.set_value(ENCODE[val])
+
+    def set_value(self, value: int):
+        """Like set_state, but takes an encoded value."""
+        if self.stuck_at is not None:
+            if value == D or value == D_BAR:
+                raise ValueError(f"Trying to assign {DECODE[value]} to a faulty gate {self}")
+            value = FAULT_EFFECT[self.stuck_at][value]
+        self.core.values[self.index] = value
 
     def activate_fault(self):
         if self.is_faulty():
-            state = ['D', '~D']
-            self.state = state[self.stuck_at]
+            self.value = (D, D_BAR)[self.stuck_at]
     
     def is_fault_activated(self):
         if not self.is_faulty():
             raise ValueError("Calling node.is_fault_activated on non_faulty node.")
-        state = ['D', '~D']
-        return self.state == state[self.stuck_at]
+        return self.value == (D, D_BAR)[self.stuck_at]
 
     def is_po(self):
-        return len(self.gates) == 0
+        return self.declared_po or self.fanout_count() == 0
 
     def has_x_path(self):
         """Returns true if there is a path with only X's from this node to a PO."""
         if self.is_po():
-            return self.state == 'X'
+            return self.value == X
 
-        explored = []
-        # list of gates which have state X
-        to_explore = [gate.output for gate in self.gates if gate.output.state == 'X']
+        # nodes which have state X
+        to_explore = [gate.output for gate in self.gates if gate.output.value == X]
+        explored = set(to_explore)
         while len(to_explore) > 0:
             node = to_explore.pop(-1)   # dfs
-            explored.append(node)
             if node.is_po():
                 return True
             for gate in node.gates:
-                if gate.output.state == 'X':
+                if gate.output.value == X and gate.output not in explored:
+                    explored.add(gate.output)
                     to_explore.append(gate.output)
         return False
 
@@ -179,7 +213,10 @@ class Gate(Generic[GateType]):
     0, 1, X (undetermined), D (1 on good circuit, 0 on bad circuit) and ~D (not D)
     Inputs may have both X's and D's
     """
+    __slots__ = ("type", "auto_name", "_name", "inputs", "output", "index", "fault_pin", "fault_effect")
+    control_value = -1  # 0 for and/nand, 1 for or/nor
     name_counts = {
+        "buf": 0,
         "not": 0,
         "and": 0,
         "nand": 0,
@@ -189,21 +226,47 @@ class Gate(Generic[GateType]):
         "xnor": 0
     }
 
-    def __init__(self, type, *inputs: Node):
-        self.control_value = -1     # will be set to 0 for and/nand, 1 for or/nor
+    def __init__(self, type, *inputs: Node, name: str = None, output_name: str = None):
         self.type = type
-        Gate.name_counts[type] += 1
-        self.name = f"{type}{Gate.name_counts[type]}"
-        self.inputs = list(inputs)
+        # creation stamp of generated names, a Circuit renames these gates per circuit.  Generated
+        # names are not stored, see name.
+        self.auto_name = None
+        self._name = name
+        if name is None:
+            Gate.name_counts[type] += 1
+            self.auto_name = Gate.name_counts[type]
+        self.inputs = inputs
         for node in self.inputs:
-            node.gates.append(self)
-        self.output = Node(gate_output=self)  # will get set after propagate() is called
-        self.depth = self.set_depth()  # max number of gates between this one and PIs
+            node._gates.append(self)
+        self.output = Node(name=output_name, gate_output=self)  # will get set after propagate() is called
+        self.index = None  # position in the circuit's CircuitCore arrays, see core.py
+        # position in self.inputs of a faulty input pin (a fanout branch fault), see make_pin_faulty
+        self.fault_pin = None
+        self.fault_effect = None
+
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            return f"{self.type}{self.auto_name}"
+        return self._name
+
+    @name.setter
+    def name(self, name: str):
+        self._name = name
+
+    @property
+    def depth(self):
+        """Max number of gates between this one and the PIs, kept in CircuitCore.level."""
+        core = self.output.core
+        if core is None:
+            return None
+        return core.level[self.index]
 
     def set_depth(self):
         """
         Determines max number of gates between this one and primary inputs.  Used so that circuit
-        propagation does not run into any dependency issues.
+        propagation does not run into any dependency issues.  The depth of the gates driving the
+        inputs must already be known.
 
         Depth = max(depth of gates connected to inputs) + 1
         """
@@ -217,10 +280,10 @@ class Gate(Generic[GateType]):
         return depth + 1
 
     def get_unassigned_inputs(self):
-        return [node for node in self.inputs if node.state == 'X']
+        return [node for node in self.inputs if node.value == X]
 
     def get_assigned_inputs(self):
-        return [node for node in self.inputs if node.state != 'X']
+        return [node for node in self.inputs if node.value != X]
 
     def get_hardest_controllable_input(self, val, unassigned=True):
         """Returns the input node to this gate that is the hardest to control.
@@ -251,47 +314,83 @@ class Gate(Generic[GateType]):
         if len(inputs) == 0 or not unassigned:
             inputs = self.inputs
 
-        minm = 100000
+        minm = None
         node = None
         attribute = "cc0" if val == 0 else "cc1"
         for inp in inputs:
             controllability = getattr(inp, attribute)
-            if controllability < minm:
+            if minm is None or controllability < minm:
                 node = inp
                 minm = controllability
         return node
 
     def is_on_d_frontier(self) -> bool:
         """In order to be true, the output must be X and there must be a D or ~D on the input."""
-        if self.output.state != 'X':
+        values = self.output.core.values
+        if values[self.output.index] != X:
             return False
-        
-        input_vals = [inp.state for inp in self.inputs]
-
-        if 'D' in input_vals or '~D' in input_vals:
-            return True
+        if self.fault_pin is not None:
+            for val in self.input_values():
+                if val == D or val == D_BAR:
+                    return True
+            return False
+        for inp in self.inputs:
+            val = values[inp.index]
+            if val == D or val == D_BAR:
+                return True
         return False
 
+    def make_pin_faulty(self, pin: int, stuck_at: int):
+        """
+        Make input pin self.inputs[pin] stuck at a value.  Unlike Node.make_faulty, the other gates
+        fed by the node driving it, and its other pins on this gate, still see its fault-free value.
+        """
+        self.remove_pin_fault()
+        self.fault_pin = pin
+        self.fault_effect = FAULT_EFFECT[stuck_at]
+        self.output.core.faulty_pins[self.inputs[pin].index] += 1
+
+    def remove_pin_fault(self):
+        if self.fault_pin is not None:
+            self.output.core.faulty_pins[self.inputs[self.fault_pin].index] -= 1
+        self.fault_pin = None
+        self.fault_effect = None
+
+    def input_values(self):
+        """Encoded values seen by this gate, with the pin fault applied if there is one."""
+        values = [node.value for node in self.inputs]
+        if self.fault_pin is not None:
+            values[self.fault_pin] = self.fault_effect[values[self.fault_pin]]
+        return values
+
     def reset(self):
         for node in self.inputs:
             node.reset()
         self.output.reset()
 
+    def evaluate(self) -> int:
+        """Return the encoded output value for the current (encoded) input values."""
+        table, finish, value = GATE_TABLES[self.type]
+        if self.fault_pin is not None:
+            for val in self.input_values():
+                value = table[value][val]
+            return finish[value]
+        values = self.output.core.values
+        for node in self.inputs:
+            value = table[value][values[node.index]]
+        return finish[value]
+
     def propagate(self, verbose=False):
         """Propagate the current value of the gate's input Node to the output Node."""
-        inputs = []
-        for node in self.inputs:
-            inputs.append(node.state)
-        output = self._propagate(inputs)
-        self.output.set_state(output)
+        self.output.set_value(self.evaluate())
 
         if verbose:
             print(self)
         return self.output.state
 
     def _propagate(self, inputs):
-        """Calls appropriate function"""
-        return getattr(self, f"{self.type}_propagate")(inputs)
+        """Evaluates this gate's type on a list of 0, 1, 'X', 'D', '~D' values."""
+        return DECODE[evaluate(self.type, [ENCODE[val] for val in inputs])]
 
     def invert(self, val):
         inverted = {
@@ -309,57 +408,11 @@ class Gate(Generic[GateType]):
 
     def and_propagate(self, inputs):
         assert len(inputs) > 1
-
-        if 0 in inputs: # at least one 0
-            return 0
-
-        if all([x == 1 for x in inputs]): # all 1's
-            return 1
-
-        # if we get to here, we know there are no 0's, just 1, X, D, ~D
-
-        d_found = 'D' in inputs
-        d_prime_found = '~D' in inputs
-
-        if d_found and d_prime_found:
-            return 0
-
-        # if we get here, we know that there are not both D and ~D.  There also might be X's and 1's
-        if 'X' in inputs:
-            return 'X'
-
-        if d_found and not d_prime_found:
-            return 'D'
-        if not d_found and d_prime_found:
-            return '~D'
-
-        return 0
+        return DECODE[evaluate("and", [ENCODE[val] for val in inputs])]
 
     def or_propagate(self, inputs):
         assert len(inputs) > 1
-
-        if 1 in inputs: # at least one 1
-            return 1
-
-        if not any(inputs): # all 0's
-            return 0
-
-        # if we get to here, we know there are no 1's, just 0, X, D, ~D
-
-        d_found = 'D' in inputs
-        d_prime_found = '~D' in inputs
-
-        if d_found and d_prime_found:      # there is at least one 1
-            return 1
-
-        if 'X' in inputs:       # covers X's and D's or X's and ~D's
-            return 'X'
-
-        if d_found:     # covers D's
-            return 'D'
-
-        # covers ~D's
-        return '~D'
+        return DECODE[evaluate("or", [ENCODE[val] for val in inputs])]
 
     def nand_propagate(self, inputs):
         return self.invert(self.and_propagate(inputs))
@@ -368,58 +421,68 @@ class Gate(Generic[GateType]):
         return self.invert(self.or_propagate(inputs))
 
     def xor_propagate(self, inputs):
-        def xor_2inp(a, b):
-            first_and = self.and_propagate([a, self.invert(b)])
-            second_and = self.and_propagate([b, self.invert(a)])
-            return self.or_propagate([first_and, second_and])
-
-        val = inputs.pop(-1)
-
-        while len(inputs) > 0:
-            new_val = inputs.pop(-1)
-            val = xor_2inp(val, new_val)
-
-        return val
+        return DECODE[evaluate("xor", [ENCODE[val] for val in inputs])]
 
     def xnor_propagate(self, inputs):
         return self.invert(self.xor_propagate(inputs))
 
     def __repr__(self):
         return f"Gate {self.name}".ljust(12) + f"(depth {self.depth}):".ljust(13) + \
-               f"{self.output}".ljust(13) + f" =   {self.type.upper()}".ljust(9) + f" {self.inputs}"
+               f"{self.output}".ljust(13) + f" =   {self.type.upper()}".ljust(9) + f" {list(self.inputs)}"
+
+
+class Buf(Gate):
+    __slots__ = ()
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("buf", *inputs, **kwargs)
 
 
 class Not(Gate):
-    def __init__(self, *inputs):
-        super().__init__("not", *inputs)
+    __slots__ = ()
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("not", *inputs, **kwargs)
 
 
 class And(Gate):
-    def __init__(self, *inputs):
-        super().__init__("and", *inputs)
-        self.control_value = 0
+    __slots__ = ()
+    control_value = 0
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("and", *inputs, **kwargs)
 
 
 class Or(Gate):
-    def __init__(self, *inputs):
-        super().__init__("or", *inputs)
-        self.control_value = 1
+    __slots__ = ()
+    control_value = 1
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("or", *inputs, **kwargs)
 
 class Nand(Gate):
-    def __init__(self, *inputs):
-        super().__init__("nand", *inputs)
-        self.control_value = 0
+    __slots__ = ()
+    control_value = 0
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("nand", *inputs, **kwargs)
 
 
 class Nor(Gate):
-    def __init__(self, *inputs):
-        super().__init__("nor", *inputs)
-        self.control_value = 1
+    __slots__ = ()
+    control_value = 1
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("nor", *inputs, **kwargs)
 
 class Xor(Gate):
-    def __init__(self, *inputs):
-        super().__init__("xor", *inputs)
+    __slots__ = ()
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("xor", *inputs, **kwargs)
 
 class Xnor(Gate):
-    def __init__(self, *inputs):
-        super().__init__("xnor", *inputs)
+    __slots__ = ()
+
+    def __init__(self, *inputs, **kwargs):
+        super().__init__("xnor", *inputs, **kwargs)
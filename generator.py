@@ -0,0 +1,139 @@
+"""
+Deterministic random combinational circuits, for benchmarks and tests.
+
+Gates are placed on `depth` levels.  Every gate takes its first input from the level just below
+it, so the circuit has exactly the requested depth, and the other inputs from the NEARBY_LEVELS
+levels below it.  With probability `reconvergence` such an extra input is taken from a node that
+shares a driver input with the first one, which creates reconvergent fanout (paths that split and
+meet again).  Nodes nobody reads become POs.  The same parameters and seed always give the same
+circuit.
+
+Random patterns should toggle most nets, like they do in real netlists, so the generator keeps
+the signal probability (probability of a 1 under random inputs, assuming independent inputs) of
+every net near 0.5.  An and/or gate is an AND when its first input is more often 1 than 0 and an
+OR otherwise, inputs are only added while the output probability stays within
+[MIN_PROBABILITY, 1 - MIN_PROBABILITY], which limits the effective fan-in, and whether the gates
+of a level invert (NAND/NOR) is drawn once per level.
+"""
+import random
+from circuit import Circuit
+from netlist import NetlistBuilder
+
+# gate types other than xor/xnor, weighted like typical ISCAS-85 netlists
+BASIC_TYPES = ["and", "nand", "or", "nor", "and", "nand", "or", "nor", "not", "buf"]
+NEARBY_LEVELS = 3  # extra gate inputs come from this many levels below the gate
+MIN_PROBABILITY = 0.25  # no and/or gate output is 1 (or 0) with a lower signal probability
+
+
+def output_probability(gate_type: str, probabilities) -> float:
+    """Signal probability of a gate output, from the signal probabilities of its inputs."""
+    if gate_type in ["xor", "xnor"]:
+        prob = 0.0
+        for inp in probabilities:
+            prob = prob * (1 - inp) + inp * (1 - prob)
+        return prob if gate_type == "xor" else 1 - prob
+    if gate_type in ["and", "nand"]:
+        prob = 1.0
+        for inp in probabilities:
+            prob *= inp
+    elif gate_type in ["or", "nor"]:
+        prob = 1.0
+        for inp in probabilities:
+            prob *= 1 - inp
+        prob = 1 - prob
+    else:   # buf, not
+        prob = probabilities[0]
+    return 1 - prob if gate_type in ["nand", "nor", "not"] else prob
+
+
+def random_netlist(
+    num_gates: int,
+    num_inputs: int = 32,
+    depth: int = 20,
+    max_fanin: int = 3,
+    xor_ratio: float = 0.1,
+    reconvergence: float = 0.3,
+    seed: int = 0,
+) -> NetlistBuilder:
+    """
+    Return a NetlistBuilder holding a random circuit, see the module docstring.
+
+    :param num_gates: number of gates, at least depth
+    :param max_fanin: gates other than buf/not get 2 to max_fanin inputs, and/or gates fewer
+        when more would push their signal probability out of range
+    :param xor_ratio: fraction of xor/xnor gates
+    :param reconvergence: probability that an extra gate input reconverges with the first one
+    """
+    if depth < 1 or num_gates < depth:
+        raise ValueError(f"Need at least one gate per level, got {num_gates} gates for depth {depth}")
+    if num_inputs < 1 or max_fanin < 2:
+        raise ValueError("Need at least 1 input and a max fan-in of at least 2")
+    rng = random.Random(seed)
+    builder = NetlistBuilder(f"<random seed={seed}>")
+    levels = [[f"i{idx}" for idx in range(num_inputs)]]  # [[net]], level 0 are the PIs
+    for net in levels[0]:
+        builder.add_input(net, 0)
+    probability = {net: 0.5 for net in levels[0]}  # {net: signal probability}
+    drivers = {}  # {net: [input nets of its gate]}
+    readers = {net: [] for net in levels[0]}  # {net: [output nets of the gates it feeds]}
+
+    # spread the gates over the levels, at least one per level
+    per_level = [1] * depth
+    for _ in range(num_gates - depth):
+        per_level[rng.randrange(depth)] += 1
+
+    count = 0
+    for level in range(1, depth + 1):
+        nets = []
+        nearby = [net for nets_below in levels[max(0, level - NEARBY_LEVELS):] for net in nets_below]
+        inverted = rng.random() < 0.5   # NAND/NOR instead of AND/OR on this level
+        for _ in range(per_level[level - 1]):
+            output = f"g{count}"
+            count += 1
+            if rng.random() < xor_ratio:
+                gate_type = rng.choice(["xor", "xnor"])
+            else:
+                gate_type = rng.choice(BASIC_TYPES)
+            first = rng.choice(levels[level - 1])
+            inputs = [first]
+            if gate_type not in ["buf", "not", "xor", "xnor"]:
+                if probability[first] >= 0.5:
+                    gate_type = "nand" if inverted else "and"
+                else:
+                    gate_type = "nor" if inverted else "or"
+            if gate_type not in ["buf", "not"]:
+                fanin = rng.randint(2, max_fanin)
+                # nets that share a driver input with first, reading them reconverges the fanout
+                siblings = [
+                    net for stem in drivers.get(first, []) for net in readers[stem]
+                    if net != first and net in drivers and net not in nets
+                ]
+                for _ in range(10 * fanin):
+                    if len(inputs) == fanin or len(inputs) == len(nearby):
+                        break
+                    if siblings and rng.random() < reconvergence:
+                        net = rng.choice(siblings)
+                    else:
+                        net = rng.choice(nearby)
+                    if net in inputs:
+                        continue
+                    new_prob = output_probability(gate_type, [probability[net] for net in inputs + [net]])
+                    if gate_type not in ["xor", "xnor"] and not MIN_PROBABILITY <= new_prob <= 1 - MIN_PROBABILITY:
+                        continue
+                    inputs.append(net)
+                if len(inputs) == 1:
+                    gate_type = rng.choice(["buf", "not"])
+            builder.add_gate(gate_type, output, inputs, 0)
+            probability[output] = output_probability(gate_type, [probability[net] for net in inputs])
+            drivers[output] = inputs
+            readers[output] = []
+            for net in inputs:
+                readers[net].append(output)
+            nets.append(output)
+        levels.append(nets)
+    return builder
+
+
+def random_circuit(num_gates: int, **kwargs) -> Circuit:
+    """Build the circuit of random_netlist, same parameters."""
+    return random_netlist(num_gates, **kwargs).build()
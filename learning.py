@@ -0,0 +1,229 @@
+"""
+Static learning (SOCRATES style).
+
+Implications are derived on the fault-free circuit with 0/1 values, forward and backward through
+every gate.  For example an AND output at 1 implies 1 on every input, and an AND output at 0 with
+all inputs but one at 1 implies 0 on the last one.  Assigning a single node value and running the
+implications to a fixpoint gives its direct implications.
+
+Learning uses the contrapositive: if a=v implies b=w, then b=(not w) implies a=(not v).  When the
+direct implications of b=(not w) miss a=(not v), typically because a and b are related through
+reconvergent fanout, the implication is stored in the index and used by every later implication.
+A value whose direct implications conflict can never occur, so the node is constant.
+
+During test generation the index gives the necessary assignments of a fault.  These are the
+values every test must set: fault activation, non-controlling side inputs of the gates every
+propagation path goes through, and whatever those imply.  PODEM checks them after every
+decision to backtrack as soon as one is violated.
+"""
+from array import array
+from typing import Dict, List, Optional, Tuple
+from circuit import Circuit
+from core import GATE_TYPES
+from gate import Node, Gate
+from pattern_sim import OPERATIONS, AND, OR
+
+
+def literal(node_idx: int, val: int) -> int:
+    """Node value as a single int, 2 * node index + value."""
+    return 2 * node_idx + val
+
+
+class StaticLearning:
+    def __init__(self, circuit: Circuit, verbose: bool = False, learn: bool = True):
+        """
+        Learn the implications of the circuit, see the module docstring.
+
+        :param learn: False skips learning, to reuse the learned and constants of a circuit with
+            the same node numbering
+        """
+        self.circuit = circuit
+        core = circuit.core
+        self.core = core
+        self.steps = []  # [(operation, controlling value or None for xor, inverted, input indices, output)]
+        for gate_idx in range(len(core.gates)):
+            operation, inverted = OPERATIONS[GATE_TYPES[core.gate_type[gate_idx]]]
+            control = 0 if operation == AND else 1 if operation == OR else None
+            self.steps.append(
+                (operation, control, int(inverted), tuple(core.gate_inputs(gate_idx)), core.gate_output[gate_idx])
+            )
+        self.learned = {}  # {literal: array of implied literals}, only the indirect implications
+        self.constants = {}  # {node index: the only value the node can take}
+        if learn:
+            self.learn()
+        if verbose:
+            print(
+                f"Static learning:\t{sum(len(lits) for lits in self.learned.values())} implications learned, "
+                f"{len(self.constants)} constant nodes"
+            )
+
+    def imply(self, assignments: Dict[int, int], use_learned: bool = True) -> Optional[Dict[int, int]]:
+        """
+        Run the implications of some node values to a fixpoint.
+
+        :param assignments: {node index: 0 or 1}
+        :return: {node index: value} with everything implied, or None on a conflict
+        """
+        core = self.core
+        steps = self.steps
+        values = {}
+        queue = []
+
+        def assign(idx, val):
+            old = values.get(idx)
+            if old is None:
+                values[idx] = val
+                queue.append(idx)
+                return True
+            return old == val
+
+        for idx, val in assignments.items():
+            if not assign(idx, val):
+                return None
+        for idx, val in self.constants.items():
+            if not assign(idx, val):
+                return None
+        while queue:
+            idx = queue.pop()
+            if use_learned:
+                for lit in self.learned.get(literal(idx, values[idx]), ()):
+                    if not assign(lit >> 1, lit & 1):
+                        return None
+            gates = list(core.node_fanout(idx))
+            driver = core.driver[idx]
+            if driver != -1:
+                gates.append(driver)
+            for gate_idx in gates:
+                operation, control, inverted, inputs, output = steps[gate_idx]
+                out = values.get(output)
+                if control is not None:
+                    unknown = None
+                    unknown_count = 0
+                    controlled = False
+                    for node in inputs:
+                        val = values.get(node)
+                        if val is None:
+                            unknown = node
+                            unknown_count += 1
+                        elif val == control:
+                            controlled = True
+                    if controlled:
+                        if not assign(output, control ^ inverted):
+                            return None
+                    elif unknown_count == 0:
+                        if not assign(output, (1 - control) ^ inverted):
+                            return None
+                    elif out is not None:
+                        if out == (1 - control) ^ inverted:
+                            for node in inputs:
+                                if not assign(node, 1 - control):
+                                    return None
+                        elif unknown_count == 1:
+                            if not assign(unknown, control):
+                                return None
+                else:
+                    parity = inverted
+                    unknown = None
+                    unknown_count = 0
+                    for node in inputs:
+                        val = values.get(node)
+                        if val is None:
+                            unknown = node
+                            unknown_count += 1
+                        else:
+                            parity ^= val
+                    if unknown_count == 0:
+                        if not assign(output, parity):
+                            return None
+                    elif unknown_count == 1 and out is not None:
+                        if not assign(unknown, parity ^ out):
+                            return None
+        return values
+
+    def learn(self):
+        """One learning pass over every node value, see the module docstring."""
+        num_nodes = len(self.core.nodes)
+        direct = {}  # {literal: {node index: value}}
+        for idx in range(num_nodes):
+            for val in (0, 1):
+                implied = self.imply({idx: val}, use_learned=False)
+                if implied is None:
+                    self.constants[idx] = 1 - val
+                else:
+                    direct[literal(idx, val)] = implied
+        learned = {}
+        for lit, implied in direct.items():
+            idx, val = lit >> 1, lit & 1
+            for other, other_val in implied.items():
+                if other == idx:
+                    continue
+                # lit implies other=other_val, so other=(not other_val) implies idx=(not val)
+                premise = literal(other, 1 - other_val)
+                if premise in direct and direct[premise].get(idx) != 1 - val:
+                    learned.setdefault(premise, []).append(literal(idx, 1 - val))
+        self.learned = {lit: array("i", lits) for lit, lits in learned.items()}
+
+    def dominators(self, site: int) -> List[int]:
+        """
+        Indices of the gates every path from a node to a PO goes through, in evaluation order.  The
+        fault effect of a fault on that node has to pass through all of them.
+        """
+        core = self.core
+        reaches_output = self.circuit.structure.reaches_output
+        outputs = set(core.outputs)
+        cone = core.fanout_cone(site)
+        dominated = {}  # {node index: frozenset of the nodes every path from it to a PO goes through}
+        for gate_idx in reversed(cone):
+            output = core.gate_output[gate_idx]
+            if output in dominated:
+                continue
+            dominated[output] = self.node_dominators(output, outputs, dominated, reaches_output)
+        nodes = self.node_dominators(site, outputs, dominated, reaches_output)
+        return sorted(core.driver[idx] for idx in nodes if idx != site)
+
+    def node_dominators(self, idx: int, outputs: set, dominated: dict, reaches_output: bytearray) -> frozenset:
+        if idx in outputs:
+            return frozenset([idx])  # observed here, the effect need not go any further
+        common = None
+        for gate_idx in self.core.node_fanout(idx):
+            output = self.core.gate_output[gate_idx]
+            if not reaches_output[gate_idx]:
+                continue
+            common = dominated[output] if common is None else common & dominated[output]
+        return frozenset([idx]) | (common or frozenset())
+
+    def necessary_assignments(
+        self, faulty_node: Node, stuck_at: int, fault_gate: Gate = None
+    ) -> Optional[List[Tuple[Node, int]]]:
+        """
+        The good machine values every test for the fault must set, or None if they conflict, which
+        proves the fault untestable.  The fault site itself is included.
+
+        :param fault_gate: for a fanout branch fault, the gate whose input pin from faulty_node is
+            stuck at, as in run_podem
+        """
+        core = self.core
+        site = faulty_node.index if fault_gate is None else fault_gate.output.index
+        required = {faulty_node.index: 1 - stuck_at}
+        gates = self.dominators(site)
+        if fault_gate is not None:
+            gates.insert(0, fault_gate.index)
+        # nodes that can carry the fault effect are stamped, side inputs are the gate inputs outside of it
+        structure = self.circuit.structure
+        stamps = structure.stamps
+        epoch = structure.new_epoch()
+        stamps[site] = stamps[faulty_node.index] = epoch
+        for gate_idx in core.fanout_cone(site):
+            stamps[core.gate_output[gate_idx]] = epoch
+        for gate_idx in gates:
+            operation, control, inverted, inputs, output = self.steps[gate_idx]
+            if control is None:
+                continue    # any side input value propagates through xor/xnor
+            for idx in inputs:
+                if stamps[idx] != epoch:
+                    if required.setdefault(idx, 1 - control) != 1 - control:
+                        return None
+        implied = self.imply(required)
+        if implied is None:
+            return None
+        return [(core.nodes[idx], val) for idx, val in implied.items()]
@@ -0,0 +1,95 @@
+"""
+Integer encoding of the 5-valued logic used during simulation.
+
+The values 0, 1, 'X', 'D' and '~D' are only used at the API boundary (Node.state, Node.set_state,
+Gate.propagate).  Internally every node holds one of the small integers below in Node.value and
+gates are evaluated with precomputed truth tables.
+
+Each value is a pair (good machine value, faulty machine value) of 3-valued logic (0, 1, X):
+    ZERO = (0, 0), ONE = (1, 1), X = (X, X), D = (1, 0), D_BAR = (0, 1)
+Folding an n-input gate two inputs at a time can produce pairs that are not one of the 5 values,
+such as (X, 0) for X AND D, so the tables are defined over all 9 pairs and the result is collapsed
+back to the 5 values once at the end.  This keeps the fold exact, e.g. X AND D AND ~D = 0.
+"""
+
+ZERO, ONE, X, D, D_BAR = range(5)
+
+# good machine value of each code, None for X
+GOOD_VALUE = (0, 1, None, 1, 0)
+
+ENCODE = {0: ZERO, 1: ONE, 'X': X, 'D': D, '~D': D_BAR}
+DECODE = (0, 1, 'X', 'D', '~D')
+
+# 3-valued logic, 2 is X
+_PAIRS = ((0, 0), (1, 1), (2, 2), (1, 0), (0, 1), (2, 0), (2, 1), (0, 2), (1, 2))
+_CODES = {pair: code for code, pair in enumerate(_PAIRS)}
+
+
+def _and3(a, b):
+    if a == 0 or b == 0:
+        return 0
+    if a == 1 and b == 1:
+        return 1
+    return 2
+
+
+def _or3(a, b):
+    if a == 1 or b == 1:
+        return 1
+    if a == 0 and b == 0:
+        return 0
+    return 2
+
+
+def _xor3(a, b):
+    if a == 2 or b == 2:
+        return 2
+    return a ^ b
+
+
+def _not3(a):
+    return a if a == 2 else 1 - a
+
+
+def _table(op):
+    """Return table[a][b] = op applied to both the good and faulty machine values of a and b."""
+    return tuple(
+        tuple(_CODES[(op(ga, gb), op(fa, fb))] for gb, fb in _PAIRS)
+        for ga, fa in _PAIRS
+    )
+
+
+AND_TABLE = _table(_and3)
+OR_TABLE = _table(_or3)
+XOR_TABLE = _table(_xor3)
+NOT_TABLE = tuple(_CODES[(_not3(g), _not3(f))] for g, f in _PAIRS)
+
+# map a folded value back to one of the 5 values, optionally inverting it first
+COLLAPSE = tuple(code if code < 5 else X for code in range(len(_PAIRS)))
+INVERT_COLLAPSE = tuple(COLLAPSE[NOT_TABLE[code]] for code in range(len(_PAIRS)))
+
+# {gate type: (table used to fold the inputs, table applied to the folded value, value the fold starts from)}
+GATE_TABLES = {
+    "buf": (AND_TABLE, COLLAPSE, ONE),
+    "not": (AND_TABLE, INVERT_COLLAPSE, ONE),
+    "and": (AND_TABLE, COLLAPSE, ONE),
+    "nand": (AND_TABLE, INVERT_COLLAPSE, ONE),
+    "or": (OR_TABLE, COLLAPSE, ZERO),
+    "nor": (OR_TABLE, INVERT_COLLAPSE, ZERO),
+    "xor": (XOR_TABLE, COLLAPSE, ZERO),
+    "xnor": (XOR_TABLE, INVERT_COLLAPSE, ZERO),
+}
+
+# {stuck at value: table mapping a value assigned to a faulty node to the value it ends up with}
+FAULT_EFFECT = {
+    0: tuple(D if code == ONE else code for code in range(5)),
+    1: tuple(D_BAR if code == ZERO else code for code in range(5)),
+}
+
+
+def evaluate(gate_type: str, values) -> int:
+    """Evaluate a gate of the given type on a sequence of encoded input values."""
+    table, finish, value = GATE_TABLES[gate_type]
+    for val in values:
+        value = table[value][val]
+    return finish[value]
@@ -0,0 +1,296 @@
+"""
+Netlist loaders for ISCAS-85/89 .bench files and a gate-level subset of structural Verilog.
+
+Both formats are read line by line.  Statements are collected by a NetlistBuilder, which then
+instantiates the gates in topological order (netlists do not have to list gates in order) and
+returns a Circuit.
+
+Sequential ISCAS-89 circuits are handled as full scan: the output of every DFF becomes a pseudo
+primary input and its data input becomes a pseudo primary output.
+"""
+import re
+from typing import Iterable
+from circuit import Circuit
+from gate import Node, Buf, Not, And, Nand, Or, Nor, Xor, Xnor
+
+GATE_CLASSES = {
+    "buf": Buf,
+    "not": Not,
+    "and": And,
+    "nand": Nand,
+    "or": Or,
+    "nor": Nor,
+    "xor": Xor,
+    "xnor": Xnor,
+}
+
+# {.bench gate keyword: gate type}, "dff" is handled separately
+BENCH_TYPES = {
+    "BUF": "buf",
+    "BUFF": "buf",
+    "NOT": "not",
+    "INV": "not",
+    "AND": "and",
+    "NAND": "nand",
+    "OR": "or",
+    "NOR": "nor",
+    "XOR": "xor",
+    "XNOR": "xnor",
+    "DFF": "dff",
+}
+
+BENCH_PORT = re.compile(r"^(INPUT|OUTPUT)\s*\(\s*([^()\s]+)\s*\)$", re.IGNORECASE)
+BENCH_GATE = re.compile(r"^([^=\s]+)\s*=\s*(\w+)\s*\(([^()]*)\)$")
+IDENTIFIER = re.compile(r"^[A-Za-z_][\w$]*$")
+VERILOG_INSTANCE = re.compile(r"\s*([A-Za-z_][\w$]*)?\s*\(([^()]*)\)\s*(?:,|$)")
+
+
+class NetlistError(ValueError):
+    def __init__(self, source: str, line: int, message: str):
+        super().__init__(f"{source}:{line}: {message}")
+        self.source = source
+        self.line = line
+
+
+class NetlistBuilder:
+    def __init__(self, source: str = "<netlist>"):
+        """
+        Collects the statements of a netlist in any order and builds a Circuit from them.
+
+        :param source: name of the file being read, used in error messages
+        """
+        self.source = source
+        self.inputs = []  # [name], in declaration order
+        self.outputs = []  # [(name, line)]
+        self.definitions = {}  # {output net: (gate type, [input nets], gate name, line)}
+        self.declared = {}  # {net: line}, for duplicate definitions
+        self.gate_names = {}  # {gate name: line}, for duplicate instance names
+
+    def error(self, line: int, message: str):
+        return NetlistError(self.source, line, message)
+
+    def declare(self, net: str, line: int):
+        if net in self.declared:
+            raise self.error(line, f"net {net} is already driven (line {self.declared[net]})")
+        self.declared[net] = line
+
+    def add_input(self, net: str, line: int):
+        self.declare(net, line)
+        self.inputs.append(net)
+
+    def add_output(self, net: str, line: int):
+        self.outputs.append((net, line))
+
+    def add_gate(self, gate_type: str, output: str, inputs: list, line: int, name: str = None):
+        if gate_type not in GATE_CLASSES:
+            raise self.error(line, f"unsupported gate type {gate_type}")
+        if len(inputs) == 0:
+            raise self.error(line, f"gate driving {output} has no inputs")
+        if gate_type in ["buf", "not"] and len(inputs) != 1:
+            raise self.error(line, f"{gate_type} gate driving {output} must have exactly 1 input")
+        self.declare(output, line)
+        name = name if name else output
+        if name in self.gate_names:
+            raise self.error(line, f"gate name {name} is already used (line {self.gate_names[name]})")
+        self.gate_names[name] = line
+        self.definitions[output] = (gate_type, inputs, name, line)
+
+    def add_flip_flop(self, output: str, data: str, line: int):
+        """Full scan: the flip-flop output is a pseudo PI and its data input a pseudo PO."""
+        self.add_input(output, line)
+        self.add_output(data, line)
+
+    def build(self) -> Circuit:
+        """Instantiate the gates in topological order and return the Circuit."""
+        if len(self.inputs) == 0:
+            raise self.error(0, "netlist has no inputs")
+        nodes = {net: Node(name=net) for net in self.inputs}  # {net: Node}
+        in_progress = set()
+        for net in self.definitions:
+            # iterative depth first search so that deep netlists do not hit the recursion limit
+            nets_to_build = [(net, False)]
+            while len(nets_to_build) > 0:
+                current, inputs_built = nets_to_build.pop(-1)
+                if current in nodes:
+                    continue
+                gate_type, inputs, name, line = self.definitions[current]
+                if inputs_built:
+                    gate = GATE_CLASSES[gate_type](
+                        *[nodes[inp] for inp in inputs], name=name, output_name=current
+                    )
+                    nodes[current] = gate.output
+                    in_progress.discard(current)
+                    continue
+                in_progress.add(current)
+                nets_to_build.append((current, True))
+                for inp in inputs:
+                    if inp in nodes:
+                        continue
+                    if inp in in_progress:
+                        raise self.error(line, f"combinational loop through net {inp}")
+                    if inp not in self.definitions:
+                        raise self.error(line, f"net {inp} is never driven")
+                    nets_to_build.append((inp, False))
+        for net, line in self.outputs:
+            if net not in nodes:
+                raise self.error(line, f"output {net} is never driven")
+            nodes[net].declared_po = True
+        return Circuit(*[nodes[net] for net in self.inputs])
+
+
+def read_bench(lines: Iterable[str], source: str = "<bench>") -> Circuit:
+    """Build a Circuit from the lines of an ISCAS-85/89 .bench netlist."""
+    builder = NetlistBuilder(source)
+    for line_number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = BENCH_PORT.match(line)
+        if match:
+            if match.group(1).upper() == "INPUT":
+                builder.add_input(match.group(2), line_number)
+            else:
+                builder.add_output(match.group(2), line_number)
+            continue
+        match = BENCH_GATE.match(line)
+        if not match:
+            raise builder.error(line_number, f"cannot parse '{line}'")
+        output, keyword, arguments = match.groups()
+        inputs = [inp.strip() for inp in arguments.split(",") if inp.strip()]
+        if keyword.upper() not in BENCH_TYPES:
+            raise builder.error(line_number, f"unsupported gate type {keyword}")
+        gate_type = BENCH_TYPES[keyword.upper()]
+        if gate_type == "dff":
+            if len(inputs) != 1:
+                raise builder.error(line_number, f"DFF driving {output} must have exactly 1 input")
+            builder.add_flip_flop(output, inputs[0], line_number)
+        else:
+            builder.add_gate(gate_type, output, inputs, line_number)
+    return builder.build()
+
+
+def verilog_statements(lines: Iterable[str]):
+    """
+    Strip comments and yield (line number, statement) for every ';' terminated statement.  Text
+    left after the last ';' (normally endmodule) is yielded as a final statement.
+    """
+    in_comment = False
+    statement = ""
+    start = None
+    for line_number, line in enumerate(lines, start=1):
+        idx = 0
+        while idx < len(line):
+            if in_comment:
+                end = line.find("*/", idx)
+                if end == -1:
+                    break
+                in_comment = False
+                idx = end + 2
+            elif line.startswith("/*", idx):
+                in_comment = True
+                idx += 2
+            elif line.startswith("//", idx):
+                break
+            elif line[idx] == ";":
+                yield start, statement.strip()
+                statement = ""
+                start = None
+                idx += 1
+            else:
+                if start is None and not line[idx].isspace():
+                    start = line_number
+                statement += line[idx]
+                idx += 1
+        statement += " "
+    if statement.strip():
+        yield start, statement.strip()
+
+
+def read_verilog(lines: Iterable[str], source: str = "<verilog>") -> Circuit:
+    """
+    Build a Circuit from a single module of gate-level Verilog.  Supported statements are input,
+    output and wire declarations of scalar nets, the primitives buf, not, and, nand, or, nor, xor
+    and xnor (instance names optional, several instances per statement allowed) and continuous
+    assignments of a net or its inverse (assign a = b; assign a = ~b;).
+    """
+    builder = NetlistBuilder(source)
+    in_module = False
+    ended = False
+    line_number = 0
+    for line_number, statement in verilog_statements(lines):
+        if not statement:
+            continue
+        if ended:
+            raise builder.error(line_number, f"statement after endmodule: '{statement}'")
+        keyword = statement.split(None, 1)[0]
+        rest = statement[len(keyword):].strip()
+        if keyword == "module":
+            if in_module:
+                raise builder.error(line_number, "only one module per file is supported")
+            in_module = True
+            continue
+        if not in_module:
+            raise builder.error(line_number, f"statement outside of a module: '{statement}'")
+        if keyword == "endmodule":
+            if rest:
+                raise builder.error(line_number, f"statement after endmodule: '{rest}'")
+            ended = True
+            continue
+        if keyword in ["input", "output", "wire"]:
+            if "[" in rest:
+                raise builder.error(line_number, "vector nets are not supported")
+            for net in [net.strip() for net in rest.split(",")]:
+                if not IDENTIFIER.match(net):
+                    raise builder.error(line_number, f"invalid net name '{net}'")
+                if keyword == "input":
+                    builder.add_input(net, line_number)
+                elif keyword == "output":
+                    builder.add_output(net, line_number)
+            continue
+        if keyword == "assign":
+            match = re.match(r"^([A-Za-z_][\w$]*)\s*=\s*(~?)\s*([A-Za-z_][\w$]*)$", rest)
+            if not match:
+                raise builder.error(line_number, f"unsupported assignment '{statement}'")
+            output, invert, inp = match.groups()
+            builder.add_gate("not" if invert else "buf", output, [inp], line_number)
+            continue
+        if keyword not in GATE_CLASSES:
+            raise builder.error(line_number, f"unsupported statement '{statement}'")
+        instances = []
+        pos = 0
+        while pos < len(rest):
+            match = VERILOG_INSTANCE.match(rest, pos)
+            if not match:
+                raise builder.error(line_number, f"cannot parse '{statement}'")
+            instances.append((match.group(1), match.group(2)))
+            pos = match.end()
+        for name, ports in instances:
+            ports = [port.strip() for port in ports.split(",")]
+            for port in ports:
+                if not IDENTIFIER.match(port):
+                    raise builder.error(line_number, f"invalid net name '{port}'")
+            if len(ports) < 2:
+                raise builder.error(line_number, f"{keyword} instance needs an output and an input")
+            builder.add_gate(keyword, ports[0], ports[1:], line_number, name=name)
+    if not ended:
+        raise builder.error(line_number, "missing endmodule")
+    return builder.build()
+
+
+def load_bench(path: str) -> Circuit:
+    with open(path) as f:
+        return read_bench(f, source=path)
+
+
+def load_verilog(path: str) -> Circuit:
+    with open(path) as f:
+        return read_verilog(f, source=path)
+
+
+def load_netlist(path: str) -> Circuit:
+    """Load a .bench or .v netlist, based on the file extension."""
+    if path.endswith(".bench"):
+        return load_bench(path)
+    if path.endswith(".v") or path.endswith(".verilog"):
+        return load_verilog(path)
+    raise ValueError(f"Unknown netlist format for {path}, expected .bench or .v")
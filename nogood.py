@@ -0,0 +1,72 @@
+"""
+Nogoods learned by PODEM, shared by the searches of every fault of a circuit.
+
+A goal is a good machine node value every test of the fault must set: fault activation, and the
+necessary assignments of learning.StaticLearning when circuit.learning is set.  Good machine values
+do not depend on the fault, so when every branch of the search below a partial PI assignment failed
+because the same goal was contradicted, no extension of that assignment can set the goal, whatever
+the fault.  Only the PIs in the fanin of the goal node decide it, so the assignment restricted to
+them is stored as a nogood for the goal.
+
+Goals and PI assignments are literals, see learning.literal.  Before each decision PODEM looks up
+the nogoods of its goals: a decision that completes a nogood is not tried, the other value is
+assigned instead.  The cache has a bounded size and drops the least recently used nogood first.
+"""
+from collections import OrderedDict
+from typing import Iterable, Set
+from circuit import Circuit
+
+NOGOOD_CACHE_SIZE = 4096  # nogoods kept per circuit
+
+
+class NogoodCache:
+    def __init__(self, circuit: Circuit, max_size: int = NOGOOD_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.circuit = circuit
+        self.max_size = max_size
+        self.entries = OrderedDict()  # {(goal literal, nogood): None}, least recently used first
+        self.by_goal = {}  # {goal literal: {nogood}}, a nogood is a frozenset of PI literals
+        self.supports = {}  # {node index: frozenset of the PI indices in its fanin}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def support(self, node_idx: int) -> frozenset:
+        if node_idx not in self.supports:
+            core = self.circuit.core
+            support = {node_idx} if core.driver[node_idx] == -1 else set()
+            for gate_idx in core.fanin_cone([node_idx]):
+                support.update(idx for idx in core.gate_inputs(gate_idx) if core.driver[idx] == -1)
+            self.supports[node_idx] = frozenset(support)
+        return self.supports[node_idx]
+
+    def add(self, goal: int, literals: Iterable[int]) -> bool:
+        """
+        Record that the PI assignment literals cannot be extended to set the goal.  Returns False
+        if an already known nogood covers it.
+        """
+        support = self.support(goal >> 1)
+        nogood = frozenset(lit for lit in literals if lit >> 1 in support)
+        known = self.by_goal.setdefault(goal, set())
+        for other in known:
+            if other <= nogood:
+                self.entries.move_to_end((goal, other))
+                return False
+        known.add(nogood)
+        self.entries[(goal, nogood)] = None
+        if len(self.entries) > self.max_size:
+            (old_goal, old_nogood), _ = self.entries.popitem(last=False)
+            self.by_goal[old_goal].discard(old_nogood)
+        return True
+
+    def lookup(self, goals: Iterable[int], literals: Set[int]) -> frozenset:
+        """The goals that cannot be set by any extension of the PI assignment literals."""
+        blocked = []
+        for goal in goals:
+            for nogood in self.by_goal.get(goal, ()):
+                if nogood <= literals:
+                    self.entries.move_to_end((goal, nogood))
+                    blocked.append(goal)
+                    break
+        return frozenset(blocked)
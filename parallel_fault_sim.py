@@ -0,0 +1,216 @@
+"""
+Parallel-fault simulation with dual-rail words, for grading externally supplied pattern sets
+(functional or customer vectors) without running PODEM.
+
+Every node holds two words, ones and zeros.  Bit k of ones is set if the node is 1 in machine k,
+bit k of zeros if it is 0, and neither bit is set for X, so patterns may leave PIs unspecified.
+Bit 0 is the fault-free machine and bits 1 to word_size are faulty machines, one fault each, so one
+pass over the levelized gates simulates one pattern for word_size faults.  A fault is injected by
+forcing its bit on the faulty node, or on the faulty gate input for a fanout branch fault.
+
+A pattern detects a fault if a PO has a 0/1 good value and the opposite value in the fault's
+machine.  If the faulty value is X instead, the fault is only possibly detected, since it depends
+on how the X resolves in silicon.  The simulation is 3-valued per machine, so it is exact for
+fully specified patterns and pessimistic (never optimistic) for patterns with X.
+
+For fully specified patterns, FaultSimulator in fault_sim.py packs patterns instead of faults and is
+faster, this module is for pattern sets with X and for reports of the POs each fault reaches.
+"""
+from typing import Dict, Iterable, List
+from circuit import Circuit
+from fault_sim import Fault
+from fault_list import FaultList
+from pattern_sim import PatternSimulator, AND, OR
+
+PATTERN_VALUES = {"0": 0, "1": 1, "x": "X", "X": "X", "-": "X"}
+
+
+def read_patterns(lines: Iterable[str]) -> List[List]:
+    """
+    Read one pattern per line, one character per PI in the order of circuit.inputs: 0, 1 or X
+    (also x or -).  Blank lines and lines starting with # are skipped.
+    """
+    patterns = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if len(line) == 0 or line.startswith("#"):
+            continue
+        if any(char not in PATTERN_VALUES for char in line):
+            raise ValueError(f"Line {number}: invalid pattern {line}, expected only 0, 1 and X")
+        patterns.append([PATTERN_VALUES[char] for char in line])
+    return patterns
+
+
+class CoverageReport:
+    def __init__(self, faults: List[Fault], num_patterns: int):
+        self.faults = faults
+        self.num_patterns = num_patterns
+        self.detected = {}  # {fault: index of the first detecting pattern}
+        self.outputs = {}  # {fault: [PO Node]}, the POs the fault was observed on
+        self.detection_counts = {}  # {fault: detecting patterns}, exact only without fault dropping
+        self.possibly_detected = {}  # {fault: index of the first pattern}, only faults not detected
+
+    @property
+    def undetected(self) -> List[Fault]:
+        return [fault for fault in self.faults if fault not in self.detected and fault not in self.possibly_detected]
+
+    @property
+    def coverage(self) -> float:
+        return len(self.detected) / len(self.faults) if self.faults else 1.0
+
+    def summary(self) -> dict:
+        return {
+            "faults": len(self.faults),
+            "patterns": self.num_patterns,
+            "detected": len(self.detected),
+            "possibly_detected": len(self.possibly_detected),
+            "undetected": len(self.faults) - len(self.detected) - len(self.possibly_detected),
+            "coverage": self.coverage,
+        }
+
+    def __repr__(self):
+        summary = self.summary()
+        return (
+            f"Coverage: {summary['coverage'] * 100:.2f}% of {summary['faults']} faults with "
+            f"{summary['patterns']} patterns, {summary['detected']} detected, "
+            f"{summary['possibly_detected']} possibly detected, {summary['undetected']} undetected"
+        )
+
+
+class ParallelFaultSimulator:
+    def __init__(self, circuit: Circuit, word_size: int = 64, simulator: PatternSimulator = None):
+        """
+        :param word_size: faults simulated per pass, Python ints have no fixed width so this can
+            be larger than 64
+        :param simulator: only used for its gate evaluation steps
+        """
+        if word_size < 1:
+            raise ValueError(f"word_size must be at least 1, got {word_size}")
+        self.circuit = circuit
+        self.word_size = word_size
+        simulator = simulator if simulator else PatternSimulator(circuit)
+        self.steps = simulator.steps
+        self.input_indices = simulator.input_indices
+        self.output_indices = simulator.output_indices
+        self.num_nodes = len(simulator.nodes)
+
+    def simulate_group(self, pattern: List, faults: List[Fault]) -> Dict[int, tuple]:
+        """
+        Simulate one pattern for up to word_size faults, fault i on bit i + 1.
+
+        :param pattern: one value per PI, 0, 1 or 'X'
+        :return: {PO index: (word of detected fault bits, word of possibly detected fault bits)},
+            only for the POs where some fault is observed
+        """
+        assert len(pattern) == len(self.input_indices)
+        assert len(faults) <= self.word_size
+        mask = (1 << (len(faults) + 1)) - 1
+        faulty_bits = mask ^ 1
+        stems = {}  # {node index: [stuck at 0 bits, stuck at 1 bits]}
+        pins = {}  # {gate index: {input position: [stuck at 0 bits, stuck at 1 bits]}}
+        for bit, fault in enumerate(faults, 1):
+            if fault.gate is None:
+                forced = stems.setdefault(fault.node.index, [0, 0])
+            else:
+                forced = pins.setdefault(fault.gate.index, {}).setdefault(fault.pin, [0, 0])
+            forced[fault.stuck_at] |= 1 << bit
+
+        ones = [0] * self.num_nodes
+        zeros = [0] * self.num_nodes
+        for idx, val in zip(self.input_indices, pattern):
+            if val == 1:
+                ones[idx] = mask
+            elif val == 0:
+                zeros[idx] = mask
+            elif val != "X":
+                raise ValueError(f"Invalid pattern value {val}, expected 0, 1 or 'X'")
+            if idx in stems:
+                sa0, sa1 = stems[idx]
+                ones[idx] = (ones[idx] & ~sa0) | sa1
+                zeros[idx] = (zeros[idx] & ~sa1) | sa0
+
+        for gate_idx, (output, operation, inverted, inputs) in enumerate(self.steps):
+            in_ones = [ones[idx] for idx in inputs]
+            in_zeros = [zeros[idx] for idx in inputs]
+            if gate_idx in pins:
+                for pos, (sa0, sa1) in pins[gate_idx].items():
+                    in_ones[pos] = (in_ones[pos] & ~sa0) | sa1
+                    in_zeros[pos] = (in_zeros[pos] & ~sa1) | sa0
+            one, zero = in_ones[0], in_zeros[0]
+            if operation == AND:
+                for pos in range(1, len(inputs)):
+                    one &= in_ones[pos]
+                    zero |= in_zeros[pos]
+            elif operation == OR:
+                for pos in range(1, len(inputs)):
+                    one |= in_ones[pos]
+                    zero &= in_zeros[pos]
+            else:
+                for pos in range(1, len(inputs)):
+                    one, zero = (one & in_zeros[pos]) | (zero & in_ones[pos]), (one & in_ones[pos]) | (zero & in_zeros[pos])
+            if inverted:
+                one, zero = zero, one
+            if output in stems:
+                sa0, sa1 = stems[output]
+                one, zero = (one & ~sa0) | sa1, (zero & ~sa1) | sa0
+            ones[output] = one
+            zeros[output] = zero
+
+        observed = {}
+        for idx in self.output_indices:
+            if ones[idx] & 1:
+                detected = zeros[idx] & faulty_bits
+            elif zeros[idx] & 1:
+                detected = ones[idx] & faulty_bits
+            else:
+                continue    # X in the good machine detects nothing
+            possible = ~(ones[idx] | zeros[idx]) & faulty_bits
+            if detected or possible:
+                observed[idx] = (detected, possible)
+        return observed
+
+    def grade(self, patterns: List[List], faults: List[Fault] = None, drop: bool = True, verbose: bool = False) -> CoverageReport:
+        """
+        Fault simulate the patterns in order and report the coverage.
+
+        :param patterns: lists of 0, 1 or 'X' per PI, see read_patterns
+        :param faults: defaults to every fault of FaultList(circuit)
+        :param drop: stop simulating a fault once it is detected.  Without dropping the report also
+            has every PO each fault reaches and the number of patterns that detect it.
+        """
+        if faults is None:
+            faults = FaultList(self.circuit).faults
+        report = CoverageReport(faults, len(patterns))
+        outputs = {}  # {fault: {PO index}}
+        remaining = list(faults)
+        for pattern_idx, pattern in enumerate(patterns):
+            if len(remaining) == 0:
+                break
+            detected_now = set()
+            for start in range(0, len(remaining), self.word_size):
+                group = remaining[start:start + self.word_size]
+                for po_idx, (detected, possible) in self.simulate_group(pattern, group).items():
+                    while detected:
+                        low = detected & -detected
+                        detected ^= low
+                        fault = group[low.bit_length() - 2]
+                        detected_now.add(fault)
+                        outputs.setdefault(fault, set()).add(po_idx)
+                    while possible:
+                        low = possible & -possible
+                        possible ^= low
+                        fault = group[low.bit_length() - 2]
+                        if fault not in report.detected:
+                            report.possibly_detected.setdefault(fault, pattern_idx)
+            for fault in detected_now:
+                report.detected.setdefault(fault, pattern_idx)
+                report.detection_counts[fault] = report.detection_counts.get(fault, 0) + 1
+                report.possibly_detected.pop(fault, None)
+            if drop:
+                remaining = [fault for fault in remaining if fault not in detected_now]
+            if verbose:
+                print(f"Pattern {pattern_idx}:\t{len(report.detected)} faults detected, {len(remaining)} left")
+        nodes = self.circuit.core.nodes
+        for fault, indices in outputs.items():
+            report.outputs[fault] = [nodes[idx] for idx in self.output_indices if idx in indices]
+        return report
@@ -0,0 +1,222 @@
+"""
+Parallel PODEM over a fault list with a pool of worker processes.
+
+PODEM changes node values and faults in place, so every worker needs its own Circuit.  The circuit
+is packed once into plain arrays (PackedCircuit), which are cheap to pickle, and each worker
+rebuilds it when it starts.  Faults are then handed out in small batches with imap_unordered, so a
+worker that finishes a batch of easy faults picks up the next one while others are still busy on
+hard ones.  Faults are sent as (node index, stuck at, gate index and pin, -1 for a stem fault) and
+node and gate indices are the same in the rebuilt circuit, so results can be mapped back to the
+caller's faults.
+
+The circuit attributes in SETTINGS, the static learning and the nogood cache size are copied to
+the workers.  If circuit.stats is set, every batch is run with a fresh Stats, which is sent back
+with the results and merged into circuit.stats, so the phase times add up the time of all workers.
+"""
+import multiprocessing
+import time
+from array import array
+from collections import namedtuple
+from circuit import Circuit
+from classic_podem import RANDOM, DETECTED, PodemLimits, format_results, run_podem, target_faults
+from core import GATE_TYPES
+from fault_sim import Fault, FaultSimulator, RandomPatternPhase
+from gate import Node
+from learning import StaticLearning
+from netlist import GATE_CLASSES
+from nogood import NogoodCache
+from stats import Stats
+
+# Circuit attributes copied to the workers, see Circuit.__init__.  A frontier_heuristic must be a
+# module level function, so that it can be pickled.
+SETTINGS = ("frontier_heuristic", "compiled", "multiple_backtrace")
+
+# The CircuitCore arrays, plus the names and declared POs.  Node i is circuit.nodes[i] and gate g is
+# circuit.eval_order[g], see core.py.
+PackedCircuit = namedtuple(
+    "PackedCircuit",
+    [
+        "node_names", "gate_names", "gate_type", "gate_output", "fanin_start", "fanin",
+        "fanout_start", "fanout", "inputs", "declared_po",
+    ],
+)
+
+
+def pack_circuit(circuit: Circuit) -> PackedCircuit:
+    core = circuit.core
+    return PackedCircuit(
+        node_names=[node.name for node in circuit.nodes],
+        gate_names=[gate.name for gate in circuit.eval_order],
+        gate_type=core.gate_type,
+        gate_output=core.gate_output,
+        fanin_start=core.fanin_start,
+        fanin=core.fanin,
+        fanout_start=core.fanout_start,
+        fanout=core.fanout,
+        inputs=core.inputs,
+        declared_po=bytearray(node.declared_po for node in circuit.nodes),
+    )
+
+
+def unpack_circuit(packed: PackedCircuit) -> Circuit:
+    """
+    Rebuild a circuit from pack_circuit.  The fanout of every node is restored in its original
+    order, so the rebuilt circuit numbers its nodes and gates exactly like the packed one.
+    """
+    nodes = [None] * len(packed.node_names)
+    for idx in packed.inputs:
+        nodes[idx] = Node(name=packed.node_names[idx])
+    gates = []
+    # gates are packed in evaluation order, so their inputs always exist already
+    for gate_idx, name in enumerate(packed.gate_names):
+        inputs = packed.fanin[packed.fanin_start[gate_idx]:packed.fanin_start[gate_idx + 1]]
+        output = packed.gate_output[gate_idx]
+        gate = GATE_CLASSES[GATE_TYPES[packed.gate_type[gate_idx]]](
+            *[nodes[idx] for idx in inputs], name=name, output_name=packed.node_names[output]
+        )
+        nodes[output] = gate.output
+        gates.append(gate)
+    for idx, node in enumerate(nodes):
+        fanout = packed.fanout[packed.fanout_start[idx]:packed.fanout_start[idx + 1]]
+        node.gates = [gates[gate_idx] for gate_idx in fanout]
+        node.declared_po = bool(packed.declared_po[idx])
+    return Circuit(*[nodes[idx] for idx in packed.inputs])
+
+
+# state of a worker process, set once by _init_worker
+_circuit = None
+_options = None
+_collect_stats = False
+
+
+def _init_worker(
+    packed: PackedCircuit, options: dict, settings: dict, learned=None, nogood_size=None, collect_stats=False
+):
+    """
+    :param settings: {attribute: value} of the caller's circuit, see SETTINGS
+    :param learned: (learned, constants) of the caller's StaticLearning, if it has one
+    :param nogood_size: max_size of the caller's NogoodCache, if it has one.  Each worker learns
+        into its own cache.
+    :param collect_stats: collect a Stats per batch, see _run_batch
+    """
+    global _circuit, _options, _collect_stats
+    _circuit = unpack_circuit(packed)
+    for name, value in settings.items():
+        setattr(_circuit, name, value)
+    _collect_stats = collect_stats
+    if nogood_size is not None:
+        _circuit.nogoods = NogoodCache(_circuit, nogood_size)
+    if learned is not None:
+        _circuit.learning = StaticLearning(_circuit, learn=False)
+        _circuit.learning.learned, _circuit.learning.constants = learned
+    _options = options
+
+
+def _run_batch(batch):
+    """
+    Run PODEM on a list of (node index, stuck at, gate index or -1, pin or -1).  Returns (one result
+    tuple per fault, the Stats of the batch or None).
+    """
+    _circuit.stats = Stats() if _collect_stats else None
+    results = []
+    for node_idx, stuck_at, gate_idx, pin in batch:
+        test_possible, stack = run_podem(
+            _circuit,
+            faulty_node=_circuit.nodes[node_idx],
+            stuck_at=stuck_at,
+            fault_gate=None if gate_idx == -1 else _circuit.eval_order[gate_idx],
+            fault_pin=None if pin == -1 else pin,
+            **_options,
+        )
+        assignments = array("i")    # PI index, value, PI index, value, ...
+        for node, val in stack.get_assignments().items():
+            assignments.extend((node.index, val))
+        results.append((node_idx, stuck_at, gate_idx, pin, test_possible, stack.status, assignments))
+    return results, _circuit.stats
+
+
+def run_parallel_podem(
+    circuit: Circuit,
+    processes: int = None,
+    batch_size: int = 16,
+    verbose: bool = False,
+    random_phase: RandomPatternPhase = None,
+    limits: PodemLimits = None,
+    cone: bool = True,
+    sat_fallback: bool = False,
+    fault_list: bool = False,
+):
+    """
+    Like run_all_nodes_podem, with the PODEM searches spread over a pool of processes.  Targets the
+    same faults and returns the same result structure.  Fault dropping is not supported, since
+    faults are handed out before the tests that could drop them are known.
+
+    :param processes: number of worker processes, defaults to the number of CPUs
+    :param batch_size: number of faults sent to a worker at a time.  Smaller batches balance the
+        load better, larger ones cost less communication.
+    :param random_phase: if given, run this random pattern phase first (in this process) and only
+        send the faults it does not detect to the workers.
+    :param sat_fallback: retry the faults PODEM aborts with the SAT engine, see run_podem.
+    :param fault_list: target the collapsed fault list, see run_all_nodes_podem.
+    """
+    targets, collapsed = target_faults(circuit, fault_list)
+    faults = targets
+    res = {}  # {Fault: {...}}, see run_all_nodes_podem
+
+    fault_simulator = None
+    if random_phase:
+        fault_simulator = FaultSimulator(circuit)
+        start = time.perf_counter()
+        patterns, detected, faults = random_phase.run(fault_simulator, faults, verbose=verbose)
+        if circuit.stats is not None:
+            circuit.stats.times["random_patterns"] += time.perf_counter() - start
+        for fault, pattern_idx in detected.items():
+            res[fault] = {
+                "test_possible": True,
+                "status": DETECTED,
+                "assignments": dict(zip(circuit.inputs, patterns[pattern_idx])),
+                "detected_by": RANDOM,
+            }
+
+    batches = [
+        [
+            (
+                fault.node.index,
+                fault.stuck_at,
+                -1 if fault.gate is None else fault.gate.index,
+                -1 if fault.pin is None else fault.pin,
+            )
+            for fault in faults[start:start + batch_size]
+        ]
+        for start in range(0, len(faults), batch_size)
+    ]
+    options = {"verbose": verbose, "limits": limits, "cone": cone, "sat_fallback": sat_fallback}
+    packed = pack_circuit(circuit)
+    learned = None
+    if circuit.learning is not None:
+        learned = (circuit.learning.learned, circuit.learning.constants)
+    nogood_size = circuit.nogoods.max_size if circuit.nogoods is not None else None
+    settings = {name: getattr(circuit, name) for name in SETTINGS}
+    initargs = (packed, options, settings, learned, nogood_size, circuit.stats is not None)
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=initargs) as pool:
+        for results, stats in pool.imap_unordered(_run_batch, batches):
+            if stats is not None:
+                circuit.stats.merge(stats)
+            for node_idx, stuck_at, gate_idx, pin, test_possible, status, assignments in results:
+                if gate_idx == -1:
+                    fault = Fault(circuit.nodes[node_idx], stuck_at)
+                else:
+                    fault = Fault(circuit.nodes[node_idx], stuck_at, circuit.eval_order[gate_idx], pin)
+                res[fault] = {
+                    "test_possible": test_possible,
+                    "status": status,
+                    "assignments": {
+                        circuit.nodes[assignments[pos]]: assignments[pos + 1]
+                        for pos in range(0, len(assignments), 2)
+                    },
+                }
+                if fault_simulator:
+                    res[fault]["detected_by"] = fault if test_possible else None
+                if verbose:
+                    print(f"Parallel PODEM:\t{fault}: {status}")
+    return format_results(res, targets, collapsed)
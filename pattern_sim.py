@@ -0,0 +1,134 @@
+"""
+Bit-parallel fault-free simulation.
+
+Many 0/1 patterns are packed into one Python int per node, bit k of every word belonging to pattern
+k, so that a single pass over the levelized gates simulates all of them with bitwise operations.
+Python ints have no fixed width, so a block can hold any number of patterns (64, 1024, ...).
+"""
+from typing import List
+from circuit import Circuit
+from compiled import word_function
+from core import GATE_TYPES
+
+AND, OR, XOR = range(3)
+
+# {gate type: (operation, output inverted)}
+OPERATIONS = {
+    "buf": (AND, False),    # single input, so AND of the input is the input itself
+    "not": (AND, True),
+    "and": (AND, False),
+    "nand": (AND, True),
+    "or": (OR, False),
+    "nor": (OR, True),
+    "xor": (XOR, False),
+    "xnor": (XOR, True),
+}
+OPERATORS = {AND: "&", OR: "|", XOR: "^"}  # Python operator of each operation, for compiled.py
+
+
+def pack_patterns(patterns: List[List[int]]) -> List[int]:
+    """
+    Pack a list of patterns (each a list of 0/1 values, one per PI) into one word per PI.
+    Bit k of word i is the value of PI i in pattern k.
+    """
+    if len(patterns) == 0:
+        return []
+    words = [0] * len(patterns[0])
+    for bit, pattern in enumerate(patterns):
+        for idx, val in enumerate(pattern):
+            if val:
+                words[idx] |= 1 << bit
+    return words
+
+
+def unpack_words(words: List[int], count: int) -> List[List[int]]:
+    """Inverse of pack_patterns: return count patterns with one value per word."""
+    return [[(word >> bit) & 1 for word in words] for bit in range(count)]
+
+
+def evaluate_words(operation: int, inverted: bool, values: List[int], mask: int) -> int:
+    """Apply one gate evaluation step to a list of packed input words."""
+    value = values[0]
+    if operation == AND:
+        for word in values[1:]:
+            value &= word
+    elif operation == OR:
+        for word in values[1:]:
+            value |= word
+    else:
+        for word in values[1:]:
+            value ^= word
+    if inverted:
+        value ^= mask
+    return value
+
+
+class PatternSimulator:
+    def __init__(self, circuit: Circuit, compiled: bool = False):
+        """
+        Flattens the circuit's CircuitCore into a list of gate evaluation steps, in the depth order
+        computed when the circuit was levelized.  Nodes are referred to by Node.index.
+
+        :param compiled: generate and compile straight-line code for the steps (see compiled.py).
+            Building is slower, simulating a block is about twice as fast.
+        """
+        self.circuit = circuit
+        core = circuit.core
+        self.nodes = core.nodes
+        self.input_indices = list(core.inputs)
+        self.output_indices = list(core.outputs)
+        self.steps = []  # [(output index, operation, inverted, input indices)], one per gate index
+        for gate_idx in range(len(core.gates)):
+            operation, inverted = OPERATIONS[GATE_TYPES[core.gate_type[gate_idx]]]
+            inputs = tuple(core.gate_inputs(gate_idx))
+            self.steps.append((core.gate_output[gate_idx], operation, inverted, inputs))
+        self.compiled = compiled
+        self.simulate_steps = word_function(self.steps, OPERATORS) if compiled else None
+
+    def simulate_words(self, input_words: List[int], count: int) -> List[int]:
+        """
+        Simulate count packed patterns.
+
+        :param input_words: one word per PI, in the order of circuit.inputs
+        :param count: number of patterns packed in the words
+        :return: one word per node, indexed like self.nodes
+        """
+        assert len(input_words) == len(self.input_indices)
+        mask = (1 << count) - 1
+        words = [0] * len(self.nodes)
+        for idx, word in zip(self.input_indices, input_words):
+            words[idx] = word & mask
+        if self.simulate_steps is not None:
+            return self.simulate_steps(words, mask)
+        for output, operation, inverted, inputs in self.steps:
+            value = words[inputs[0]]
+            if operation == AND:
+                for idx in inputs[1:]:
+                    value &= words[idx]
+            elif operation == OR:
+                for idx in inputs[1:]:
+                    value |= words[idx]
+            else:
+                for idx in inputs[1:]:
+                    value ^= words[idx]
+            if inverted:
+                value ^= mask
+            words[output] = value
+        return words
+
+    def simulate(self, input_words: List[int], count: int) -> List[int]:
+        """Like simulate_words, but return only the PO words, in the order of circuit.outputs."""
+        words = self.simulate_words(input_words, count)
+        return [words[idx] for idx in self.output_indices]
+
+    def simulate_patterns(self, patterns: List[List[int]], block_size: int = 1024) -> List[List[int]]:
+        """
+        Simulate a list of 0/1 patterns, block_size patterns per pass.
+        Returns the PO values for each pattern, in the order of circuit.outputs.
+        """
+        responses = []
+        for start in range(0, len(patterns), block_size):
+            block = patterns[start:start + block_size]
+            outputs = self.simulate(pack_patterns(block), len(block))
+            responses.extend(unpack_words(outputs, len(block)))
+        return responses
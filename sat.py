@@ -0,0 +1,269 @@
+"""
+A small CDCL SAT solver in pure Python.
+
+Variables are positive ints from new_var() and a literal is a variable or its negation, as in the
+DIMACS format.  The solver uses two watched literals per clause, first UIP conflict analysis with
+non-chronological backjumping, VSIDS-like variable activities, phase saving and Luby restarts.
+Learnt clauses are kept, so it is meant for the small to medium formulas of single fault ATPG
+rather than for large industrial instances.
+"""
+import heapq
+from typing import Dict, Iterable, List
+
+SAT = "sat"
+UNSAT = "unsat"
+UNKNOWN = "unknown"  # the conflict limit was reached
+
+RESTART_BASE = 100  # conflicts, scaled by the Luby sequence
+ACTIVITY_DECAY = 0.95
+
+
+def luby(i: int) -> int:
+    """The i-th element (from 0) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i = i % size
+    return 1 << seq
+
+
+class SatSolver:
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []  # [[literal]], the first two literals of a clause are watched
+        self.watches = [[], []]  # {watch index of a literal: [clauses watching it]}, see watch_index
+        self.assigns = [0]  # {variable: 1 true, -1 false, 0 unassigned}
+        self.level = [0]
+        self.reason = [None]  # {variable: clause that implied it, None for decisions}
+        self.activity = [0.0]
+        self.phase = [-1]  # last value of each variable, reused when deciding on it
+        self.trail = []  # assigned literals in assignment order
+        self.trail_lim = []  # trail length at the start of each decision level
+        self.queue_head = 0
+        self.order = []  # heap of (-activity, variable), may hold stale entries
+        self.activity_inc = 1.0
+        self.ok = True  # False once an empty clause was derived at level 0
+        self.conflicts = 0
+        self.decisions = 0
+        self.saved_model = None
+
+    @staticmethod
+    def watch_index(lit: int) -> int:
+        return 2 * lit if lit > 0 else -2 * lit + 1
+
+    def new_var(self) -> int:
+        self.num_vars += 1
+        self.assigns.append(0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(-1)
+        self.watches.append([])
+        self.watches.append([])
+        heapq.heappush(self.order, (0.0, self.num_vars))
+        return self.num_vars
+
+    def value(self, lit: int) -> int:
+        """1 if the literal is true, -1 if false, 0 if unassigned."""
+        return self.assigns[lit] if lit > 0 else -self.assigns[-lit]
+
+    def add_clause(self, lits: Iterable[int]) -> bool:
+        """Add a clause, before solving.  Returns False if the formula became unsatisfiable."""
+        if not self.ok:
+            return False
+        clause = []
+        for lit in lits:
+            if -lit in clause:
+                return True     # tautology
+            value = self.value(lit)
+            if value == 1:
+                return True     # already satisfied at level 0
+            if value == 0 and lit not in clause:
+                clause.append(lit)
+        if len(clause) == 0:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+        return self.ok
+
+    def attach(self, clause: List[int]):
+        self.clauses.append(clause)
+        self.watches[self.watch_index(clause[0])].append(clause)
+        self.watches[self.watch_index(clause[1])].append(clause)
+
+    def enqueue(self, lit: int, reason):
+        var = abs(lit)
+        self.assigns[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """Unit propagation, returns a conflicting clause or None."""
+        assigns = self.assigns
+        while self.queue_head < len(self.trail):
+            false_lit = -self.trail[self.queue_head]
+            self.queue_head += 1
+            watchers = self.watches[self.watch_index(false_lit)]
+            kept = []
+            for pos, clause in enumerate(watchers):
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if (assigns[first] if first > 0 else -assigns[-first]) == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if (assigns[lit] if lit > 0 else -assigns[-lit]) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        self.watches[self.watch_index(lit)].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (assigns[first] if first > 0 else -assigns[-first]) == -1:
+                        kept.extend(watchers[pos + 1:])
+                        self.watches[self.watch_index(false_lit)] = kept
+                        return clause
+                    self.enqueue(first, clause)
+            self.watches[self.watch_index(false_lit)] = kept
+        return None
+
+    def bump(self, var: int):
+        self.activity[var] += self.activity_inc
+        if self.activity[var] > 1e100:
+            for idx in range(1, self.num_vars + 1):
+                self.activity[idx] *= 1e-100
+            self.activity_inc *= 1e-100
+            self.order = [(-self.activity[idx], idx) for idx in range(1, self.num_vars + 1) if self.assigns[idx] == 0]
+            heapq.heapify(self.order)
+        elif self.assigns[var] == 0:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def analyze(self, conflict: List[int]):
+        """First UIP learning.  Returns (learnt clause with the asserting literal first, backjump level)."""
+        seen = set()
+        learnt = [0]
+        current = len(self.trail_lim)
+        counter = 0
+        lit = None
+        idx = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause if lit is None else clause[1:]:
+                var = abs(other)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            while abs(self.trail[idx]) not in seen:
+                idx -= 1
+            lit = self.trail[idx]
+            idx -= 1
+            clause = self.reason[abs(lit)]
+            seen.discard(abs(lit))
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = -lit
+        if len(learnt) == 1:
+            return learnt, 0
+        # the literal of the highest remaining level is watched with the asserting one
+        top = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[top] = learnt[top], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def cancel_until(self, level: int):
+        if len(self.trail_lim) <= level:
+            return
+        for lit in self.trail[self.trail_lim[level]:]:
+            var = abs(lit)
+            self.phase[var] = self.assigns[var]
+            self.assigns[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.queue_head = len(self.trail)
+
+    def pick_branch_variable(self) -> int:
+        while self.order:
+            _, var = heapq.heappop(self.order)
+            if self.assigns[var] == 0:
+                return var
+        return 0
+
+    def solve(self, assumptions: Iterable[int] = (), max_conflicts: int = None) -> str:
+        """
+        Returns SAT, UNSAT (under the assumptions, if any) or UNKNOWN if max_conflicts was reached.
+        After SAT, self.model() is a satisfying assignment.
+        """
+        assumptions = list(assumptions)
+        if not self.ok:
+            return UNSAT
+        self.cancel_until(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return UNSAT
+        restarts = 0
+        restart_at = RESTART_BASE * luby(restarts)
+        conflicts_since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts_since_restart += 1
+                if len(self.trail_lim) == 0:
+                    self.ok = False
+                    return UNSAT
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.activity_inc /= ACTIVITY_DECAY
+                if max_conflicts is not None and self.conflicts >= max_conflicts:
+                    self.cancel_until(0)
+                    return UNKNOWN
+                continue
+            if conflicts_since_restart >= restart_at:
+                restarts += 1
+                restart_at = RESTART_BASE * luby(restarts)
+                conflicts_since_restart = 0
+                self.cancel_until(0)
+                continue
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self.value(lit)
+                if value == -1:
+                    self.cancel_until(0)
+                    return UNSAT
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.enqueue(lit, None)
+                continue
+            var = self.pick_branch_variable()
+            if var == 0:
+                self.saved_model = list(self.assigns)
+                self.cancel_until(0)
+                return SAT
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(var if self.phase[var] == 1 else -var, None)
+
+    def model(self) -> Dict[int, bool]:
+        """{variable: value} of the last SAT result."""
+        return {var: self.saved_model[var] == 1 for var in range(1, self.num_vars + 1)}
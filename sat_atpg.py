@@ -0,0 +1,179 @@
+"""
+SAT-based test generation for a single stuck at fault.
+
+The fault is turned into a miter: the fault-free circuit restricted to the fault's cone (the gates
+find_nodes_gates_from_fault returns) and a faulty copy of the gates in the fanout of the fault
+site, which share the inputs and everything outside the fanout.  Every gate is Tseitin encoded into
+clauses.  Unit clauses activate the fault (the good value of the faulty node is the opposite of
+the stuck at value), and a final clause requires some PO of the cone to differ between the two copies.
+Difference variables along the fanout of the fault site (the D-chain) are redundant but help the
+solver find conflicts early, a difference that cannot reach a PO is refuted by propagation.
+
+A satisfying assignment of the PIs is a test, and an unsatisfiable miter proves the fault untestable.
+That is where this beats PODEM, which can only prove it by exhausting its decision tree.
+"""
+from typing import Dict, List, Tuple
+from circuit import Circuit
+from core import GATE_TYPES
+from gate import Node, Gate
+from pattern_sim import OPERATIONS, AND, OR
+from sat import SatSolver, SAT
+
+SAT_MAX_CONFLICTS = 20000  # default conflict limit per fault, the fault is aborted when it is reached
+
+
+def encode_gate(solver: SatSolver, output: int, operation: int, inputs: List[int]):
+    """
+    Add the Tseitin clauses of output <-> operation(inputs).  output and inputs are literals, so an
+    inverting gate is encoded with the negated output literal.
+    """
+    if operation == AND:
+        for lit in inputs:
+            solver.add_clause([-output, lit])
+        solver.add_clause([output] + [-lit for lit in inputs])
+    elif operation == OR:
+        for lit in inputs:
+            solver.add_clause([output, -lit])
+        solver.add_clause([-output] + list(inputs))
+    else:
+        # chain of 2-input xors through auxiliary variables
+        acc = inputs[0]
+        for lit in inputs[1:]:
+            out = solver.new_var()
+            solver.add_clause([-out, acc, lit])
+            solver.add_clause([-out, -acc, -lit])
+            solver.add_clause([out, -acc, lit])
+            solver.add_clause([out, acc, -lit])
+            acc = out
+        solver.add_clause([-output, acc])
+        solver.add_clause([output, -acc])
+
+
+class FaultMiter:
+    def __init__(
+        self, circuit: Circuit, faulty_node: Node, stuck_at: int, fault_gate: Gate = None, fault_pin: int = None
+    ):
+        """
+        Build the clauses of the miter, see the module docstring.
+
+        :param fault_gate: for a fanout branch fault, the gate whose input pin from faulty_node is
+            stuck at, as in run_podem
+        :param fault_pin: position of that pin in fault_gate.inputs, as in run_podem
+        """
+        self.circuit = circuit
+        self.solver = SatSolver()
+        core = circuit.core
+        start = faulty_node if fault_gate is None else fault_gate.output
+        primary_outputs, _, _, _ = circuit.find_nodes_gates_from_fault(start)
+        outputs = [node.index for node in primary_outputs.values()]
+        self.good = {}  # {node index: variable of the fault-free value}
+        self.faulty = {}  # {node index: variable of the faulty value}, only in the fanout of the fault
+
+        for gate_idx in core.fanin_cone(outputs):
+            self.encode(core, gate_idx, self.good_var)
+        # constant faulty value at the fault site
+        stuck = self.solver.new_var()
+        self.solver.add_clause([stuck if stuck_at else -stuck])
+        if fault_gate is None:
+            self.faulty[faulty_node.index] = stuck
+        else:
+            if fault_pin is None:
+                fault_pin = fault_gate.inputs.index(faulty_node)
+            self.encode(core, fault_gate.index, self.good_var, self.faulty, stuck_pin=(fault_pin, stuck))
+        for gate_idx in core.fanout_cone(start.index):
+            self.encode(core, gate_idx, lambda idx: self.faulty.get(idx) or self.good_var(idx), self.faulty)
+
+        # activation
+        good_site = self.good_var(faulty_node.index)
+        self.solver.add_clause([-good_site if stuck_at else good_site])
+        # observation: difference variables on the faulty nodes, a difference at a node that is not
+        # a PO needs a difference at the output of one of the gates it feeds (the D-chain), and the
+        # fault site differs
+        differences = {}  # {node index: variable, true if the good and faulty values differ}
+        for idx, faulty in self.faulty.items():
+            good = self.good_var(idx)
+            difference = differences[idx] = self.solver.new_var()
+            self.solver.add_clause([-difference, good, faulty])
+            self.solver.add_clause([-difference, -good, -faulty])
+        output_set = set(outputs)
+        for idx, difference in differences.items():
+            if idx in output_set:
+                continue
+            successors = [
+                differences[core.gate_output[gate_idx]]
+                for gate_idx in core.node_fanout(idx)
+                if core.gate_output[gate_idx] in differences
+            ]
+            self.solver.add_clause([-difference] + successors)
+        self.solver.add_clause([differences[start.index]])
+        self.solver.add_clause([differences[idx] for idx in outputs if idx in differences])
+
+    def good_var(self, node_idx: int) -> int:
+        if node_idx not in self.good:
+            self.good[node_idx] = self.solver.new_var()
+        return self.good[node_idx]
+
+    def encode(self, core, gate_idx: int, input_var, variables: dict = None, stuck_pin: tuple = None):
+        """
+        Encode gate gate_idx, its output variable is added to variables (self.good by default).
+
+        :param stuck_pin: (input position, variable) to use for that input instead of input_var
+        """
+        operation, inverted = OPERATIONS[GATE_TYPES[core.gate_type[gate_idx]]]
+        inputs = [input_var(idx) for idx in core.gate_inputs(gate_idx)]
+        if stuck_pin is not None:
+            inputs[stuck_pin[0]] = stuck_pin[1]
+        output_idx = core.gate_output[gate_idx]
+        if variables is None:
+            output = self.good_var(output_idx)
+        else:
+            output = variables[output_idx] = self.solver.new_var()
+        encode_gate(self.solver, -output if inverted else output, operation, inputs)
+
+    def solve(self, fixed_assignments: Dict[Node, int] = None, max_conflicts: int = SAT_MAX_CONFLICTS):
+        """
+        :param fixed_assignments: {PI_Node: value} the test must extend
+        :return: (SAT, UNSAT or UNKNOWN, {PI_Node: value} for the PIs of the cone when SAT)
+        """
+        assumptions = []
+        for node, val in (fixed_assignments or {}).items():
+            if node.index in self.good:
+                var = self.good[node.index]
+                assumptions.append(var if val else -var)
+        result = self.solver.solve(assumptions, max_conflicts=max_conflicts)
+        assignments = {}
+        if result == SAT:
+            model = self.solver.model()
+            for node in self.circuit.inputs:
+                if node.index in self.good:
+                    assignments[node] = int(model[self.good[node.index]])
+        return result, assignments
+
+
+def run_sat_atpg(
+    circuit: Circuit,
+    faulty_node: Node,
+    stuck_at: int,
+    fault_gate: Gate = None,
+    fixed_assignments: Dict[Node, int] = None,
+    max_conflicts: int = SAT_MAX_CONFLICTS,
+    verbose: bool = False,
+    fault_pin: int = None,
+) -> Tuple[str, Dict[Node, int], SatSolver]:
+    """
+    Generate a test with the SAT solver.  Node values in the circuit are not touched.  fault_gate
+    and fault_pin select a fanout branch fault, as in run_podem.
+
+    :return: (SAT if a test was found, UNSAT if the fault is untestable or UNKNOWN if max_conflicts
+        was reached, {PI_Node: value}, the solver for its counters)
+    """
+    miter = FaultMiter(circuit, faulty_node, stuck_at, fault_gate, fault_pin)
+    result, assignments = miter.solve(fixed_assignments, max_conflicts=max_conflicts)
+    if verbose:
+        branch = "" if fault_gate is None else f" at the input of {fault_gate.name}"
+        print(
+            f"SAT:\t{faulty_node.name}{branch} stuck at {stuck_at}: {result} after "
+            f"{miter.solver.conflicts} conflicts, {miter.solver.num_vars} variables, "
+            f"{len(miter.solver.clauses)} clauses"
+        )
+    return result, assignments, miter.solver
@@ -0,0 +1,125 @@
+"""
+Counters and timers for the ATPG hot path.
+
+Collection is off by default.  Assign a Stats to circuit.stats to turn it on:
+
+    circuit.stats = Stats()
+    run_all_nodes_podem(circuit)
+    print(circuit.stats.summary())
+    circuit.stats.write_json_lines("stats.jsonl")
+
+When circuit.stats is None the instrumented code only pays for an `is None` check per call (not per
+gate), and nothing is formatted or printed.  Counters are plain attributes so that incrementing
+them is as cheap as possible.
+"""
+import json
+import time
+from typing import List
+
+COUNTERS = (
+    "gate_evaluations",     # gates evaluated by propagate and propagate_events
+    "propagations",         # calls to propagate and propagate_events
+    "decisions",            # PI assignments made by PODEM
+    "backtracks",
+    "x_path_checks",
+    "backtrace_steps",      # gates traversed by backtrace
+    "learning_conflicts",   # backtracks caused by a contradicted necessary assignment
+    "nogoods_learned",      # nogoods added to circuit.nogoods, see nogood.py
+    "nogood_prunes",        # decisions whose value was flipped because it completed a nogood
+    "sat_calls",            # faults retried with the SAT engine after PODEM aborted
+    "sat_conflicts",
+)
+
+# phases timed by PODEM and the run_* drivers, in seconds
+PHASES = (
+    "setup",            # fault cone, reset and initial propagation in run_podem
+    "x_path",
+    "objective",        # including the multiple backtrace, see Circuit.backtrace_objectives
+    "backtrace",
+    "imply",
+    "backtrack",
+    "sat",
+    "random_patterns",
+    "fault_simulation",
+)
+
+
+class Stats:
+    def __init__(self):
+        self.gate_evaluations = 0
+        self.propagations = 0
+        self.decisions = 0
+        self.backtracks = 0
+        self.x_path_checks = 0
+        self.backtrace_steps = 0
+        self.learning_conflicts = 0
+        self.nogoods_learned = 0
+        self.nogood_prunes = 0
+        self.sat_calls = 0
+        self.sat_conflicts = 0
+        self.times = dict.fromkeys(PHASES, 0.0)  # {phase: seconds}
+        self.faults = []  # one record per run_podem call, see end_fault
+        self._fault_start = None
+
+    def counters(self) -> dict:
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def start_fault(self):
+        self._fault_start = (self.counters(), dict(self.times), time.perf_counter())
+
+    def end_fault(self, node, stuck_at: int, gate, status: str, pin: int = None) -> dict:
+        """
+        Record the counter and timer increments since start_fault for a fault.  Records look like
+        {"fault": node name, "stuck_at": 0, "gate": gate name or None, "pin": input position or None,
+        "status": "detected", "time": seconds, <counter>: increment, ..., "times": {phase: seconds}}
+        """
+        counters, times, start = self._fault_start
+        record = {
+            "fault": node.name,
+            "stuck_at": stuck_at,
+            "gate": gate.name if gate is not None else None,
+            "pin": pin,
+            "status": status,
+            "time": time.perf_counter() - start,
+        }
+        for name in COUNTERS:
+            record[name] = getattr(self, name) - counters[name]
+        record["times"] = {phase: self.times[phase] - times[phase] for phase in PHASES}
+        self.faults.append(record)
+        return record
+
+    def summary(self) -> dict:
+        """Totals over everything collected so far."""
+        total_time = sum(record["time"] for record in self.faults)
+        summary = {"faults": len(self.faults), "fault_time": total_time}
+        summary.update(self.counters())
+        summary["times"] = dict(self.times)
+        if total_time > 0:
+            summary["faults_per_second"] = len(self.faults) / total_time
+        statuses = {}
+        for record in self.faults:
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+        summary["statuses"] = statuses
+        return summary
+
+    def merge(self, other: "Stats"):
+        """Add the counters, phase times and per-fault records of another Stats, e.g. from a worker."""
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for phase in PHASES:
+            self.times[phase] += other.times[phase]
+        self.faults.extend(other.faults)
+
+    def json_lines(self) -> List[str]:
+        """The per-fault records followed by the summary (with "summary": true), one JSON object per line."""
+        lines = [json.dumps(record) for record in self.faults]
+        lines.append(json.dumps(dict(self.summary(), summary=True)))
+        return lines
+
+    def write_json_lines(self, path: str):
+        with open(path, "w") as f:
+            for line in self.json_lines():
+                f.write(line + "\n")
+
+    def __repr__(self):
+        return f"Stats: {self.counters()}"
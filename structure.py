@@ -0,0 +1,66 @@
+"""
+Structural index of a circuit, built once from its CircuitCore.
+
+For every node it keeps the minimum number of gates between the node and a PO, UNREACHABLE if there
+is no path to a PO, and for every gate whether its output reaches a PO.  The POs a particular node
+reaches are found on demand from its fanout cone, so the index stays linear in the circuit size.
+Searches that need a visited set use epoch stamps, so no set has to be cleared or allocated per
+search.
+
+A node is fanout free if its transitive fanin has no fanout stem, the free lines of FAN.  Any value
+of a fanout free node can be justified by a single backtrace without conflicts, since its fanin is a
+tree.  The fanout free nodes closest to the POs are the headlines.
+"""
+from array import array
+from typing import List
+from core import CircuitCore
+
+UNREACHABLE = 2 ** 31 - 1  # po_distance of nodes with no path to a PO
+
+
+class StructuralIndex:
+    def __init__(self, core: CircuitCore):
+        self.core = core
+        num_nodes = len(core.nodes)
+        self.po_distance = array("i", [UNREACHABLE]) * num_nodes
+        for idx in core.outputs:
+            self.po_distance[idx] = 0
+        # gates are in evaluation order, so in reverse every fanout gate comes before its inputs
+        for gate_idx in range(len(core.gates) - 1, -1, -1):
+            distance = self.po_distance[core.gate_output[gate_idx]]
+            if distance == UNREACHABLE:
+                continue
+            for node_idx in core.gate_inputs(gate_idx):
+                if distance + 1 < self.po_distance[node_idx]:
+                    self.po_distance[node_idx] = distance + 1
+        # 1 for the gates whose output reaches a PO, indexed like core.gates
+        self.reaches_output = bytearray(
+            self.po_distance[output] != UNREACHABLE for output in core.gate_output
+        )
+        self.fanout_free = bytearray(num_nodes)  # 1 for fanout free nodes, PIs included
+        for idx in core.inputs:
+            self.fanout_free[idx] = 1
+        for gate_idx in range(len(core.gates)):
+            self.fanout_free[core.gate_output[gate_idx]] = all(
+                self.fanout_free[node_idx] and len(core.node_fanout(node_idx)) == 1
+                for node_idx in core.gate_inputs(gate_idx)
+            )
+        self.stamps = array("i", [0]) * num_nodes
+        self.epoch = 0
+
+    def new_epoch(self) -> int:
+        """Start a new search: every node counts as unvisited until stamped with the returned epoch."""
+        self.epoch += 1
+        return self.epoch
+
+    def reachable_outputs(self, node_idx: int) -> List[int]:
+        """Node indices of the POs reachable from a node, in the order of core.outputs."""
+        core = self.core
+        if self.po_distance[node_idx] == UNREACHABLE:
+            return []
+        stamps = self.stamps
+        epoch = self.new_epoch()
+        stamps[node_idx] = epoch
+        for gate_idx in core.fanout_cone(node_idx):
+            stamps[core.gate_output[gate_idx]] = epoch
+        return [idx for idx in core.outputs if stamps[idx] == epoch]
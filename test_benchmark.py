@@ -0,0 +1,17 @@
+import copy
+from benchmark import compare, run_suite
+
+
+def test_suite_and_compare():
+    results = run_suite(["c17", "s27"], verbose=False, num_faults=10, num_patterns=2, repeat=1)
+    for case in results["cases"].values():
+        assert case["coverage"] == 1.0
+        assert case["targets"] <= case["faults"]
+        assert case["podem_full_compiled_faults_per_s"] > 0
+    assert not any(row[-1] for row in compare(results, results))
+
+    worse = copy.deepcopy(results)
+    worse["cases"]["c17"]["coverage"] = 0.5
+    worse["cases"]["s27"]["run_all_s"] *= 2
+    regressions = {(name, metric) for name, metric, *_, regression in compare(worse, results) if regression}
+    assert regressions == {("c17", "coverage"), ("s27", "run_all_s")}
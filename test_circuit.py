@@ -0,0 +1,107 @@
+import random
+from classic_podem import ImplicationStack
+from netlist import NetlistBuilder
+
+
+def snapshot(circuit):
+    return [node.value for node in circuit.nodes], set(circuit.d_frontier)
+
+
+def check_against_full_propagation(circuit):
+    values, d_frontier = snapshot(circuit)
+    circuit.propagate()
+    assert snapshot(circuit) == (values, d_frontier)
+
+
+def test_event_driven_matches_full_propagation(small_circuit):
+    circuit = small_circuit
+    rng = random.Random(0)
+    for fault_node in circuit.nodes[::3]:
+        circuit.reset()
+        fault_node.make_faulty(stuck_at=rng.getrandbits(1), set=False)
+        circuit.propagate()
+        stack = ImplicationStack(circuit=circuit)
+        for _ in range(20):
+            unassigned = [node for node in circuit.inputs if node not in stack.get_assignments()]
+            if unassigned and rng.random() < 0.7:
+                stack.imply(rng.choice(unassigned), rng.getrandbits(1))
+            elif not stack.backtrack():
+                break
+            check_against_full_propagation(circuit)
+        fault_node.remove_fault()
+
+
+def test_undo_restores_values(small_circuit):
+    circuit = small_circuit
+    circuit.reset()
+    circuit.propagate()
+    before = snapshot(circuit)
+    stack = ImplicationStack(circuit=circuit)
+    for node in circuit.inputs:
+        stack.imply(node, 1)
+    while stack.stack:
+        stack.set_x()
+    assert snapshot(circuit) == before
+
+
+
+def test_levelization(small_circuit):
+    circuit = small_circuit
+    position = {gate: idx for idx, gate in enumerate(circuit.eval_order)}
+    for gate in circuit.eval_order:
+        depths = [node.gate_output.depth for node in gate.inputs if node.gate_output is not None]
+        assert gate.depth == 1 + max(depths, default=0)
+        for node in gate.inputs:
+            if node.gate_output is not None:
+                assert position[node.gate_output] < position[gate]
+    assert len(circuit.eval_order) == len(circuit.gates_list)
+
+
+def test_deep_chain():
+    builder = NetlistBuilder()
+    builder.add_input("n0", 0)
+    for idx in range(1, 5001):
+        builder.add_gate("not", f"n{idx}", [f"n{idx - 1}"], idx)
+    circuit = builder.build()
+    assert circuit.get_gate("n5000").depth == 5000
+    circuit.propagate([1], reset=True)
+    assert circuit.get_outputs() == [1]
+
+
+def test_d_frontier_in_cone(small_circuit):
+    circuit = small_circuit
+    rng = random.Random(1)
+    for fault_node in circuit.nodes[1::3]:
+        circuit.set_fault_cone(fault_node)
+        circuit.reset()
+        circuit.propagate()
+        fault_node.make_faulty(stuck_at=rng.getrandbits(1), set=False)
+        stack = ImplicationStack(circuit=circuit)
+        for node in rng.sample(circuit.inputs, len(circuit.inputs)):
+            stack.imply(node, rng.getrandbits(1))
+            expected = [gate for gate in circuit.cone_gates if gate.is_on_d_frontier()]
+            assert circuit.get_d_frontier() == expected
+        fault_node.remove_fault()
+        circuit.set_fault_cone(None)
+
+
+def test_fault_cone(small_circuit):
+    circuit = small_circuit
+    core = circuit.core
+    rng = random.Random(2)
+    pattern = [rng.getrandbits(1) for _ in circuit.inputs]
+    circuit.propagate(pattern, reset=True)
+    full = [node.value for node in circuit.nodes]
+    for fault_node in circuit.nodes:
+        outputs = circuit.structure.reachable_outputs(fault_node.index)
+        circuit.set_fault_cone(fault_node)
+        assert [gate.index for gate in circuit.cone_gates] == core.fanin_cone(outputs)
+        assert sorted(node.index for node in circuit.fault_pos.values()) == sorted(outputs)
+        circuit.reset()
+        circuit.propagate(pattern)
+        for node in circuit.nodes:
+            if circuit.is_simulated(node):
+                assert node.value == full[node.index]
+        circuit.set_fault_cone(None)
+    assert circuit.cone_gates is None
+    assert not any(circuit.in_cone)
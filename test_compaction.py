@@ -0,0 +1,72 @@
+import random
+import pytest
+from classic_podem import DETECTED, UNTESTABLE, run_podem
+from compaction import merge_cubes, reverse_order_compaction, run_compacted_podem
+from conftest import cube_detects, detecting_patterns, pattern_index
+from fault_list import FaultList
+from fault_sim import FaultSimulator
+
+
+def test_merge_cubes():
+    a, b, c = "a", "b", "c"     # any hashable works as a PI
+    cubes = [{a: 1}, {a: 0, b: 1}, {b: 1, c: 0}, {c: 1}]
+    merged = merge_cubes(cubes)
+    assert merged == [{a: 0, b: 1, c: 0}, {a: 1, c: 1}]
+    for cube in cubes:
+        assert any(all(target.get(pi) == val for pi, val in cube.items()) for target in merged)
+
+
+def test_reverse_order_compaction(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in circuit.inputs] for _ in range(30)]
+    fault_simulator = FaultSimulator(circuit)
+    kept = reverse_order_compaction(fault_simulator, patterns, faults, block_size=8)
+    assert all(pattern in patterns for pattern in kept)
+    assert set(fault_simulator.simulate(faults, kept)) == set(fault_simulator.simulate(faults, patterns))
+
+
+@pytest.mark.parametrize("dynamic", [True, False])
+def test_compacted_test_set(small_circuit, dynamic):
+    circuit = small_circuit
+    patterns, status = run_compacted_podem(circuit, dynamic=dynamic)
+    indices = [pattern_index(circuit, pattern) for pattern in patterns]
+    assert set(status) == set(FaultList(circuit, dominance=False).targets)
+    for fault, fault_status in status.items():
+        word = detecting_patterns(circuit, fault)
+        if fault_status == DETECTED:
+            assert any((word >> idx) & 1 for idx in indices), fault
+        else:
+            assert fault_status == UNTESTABLE
+            assert word == 0
+    # every pattern detects a fault no later pattern detects, see reverse_order_compaction
+    tests = {fault: detecting_patterns(circuit, fault) for fault in status}
+    for pos, idx in enumerate(indices):
+        assert any(
+            (word >> idx) & 1 and not any((word >> later) & 1 for later in indices[pos + 1:])
+            for word in tests.values()
+        )
+
+
+def test_fixed_assignments(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).targets
+    rng = random.Random(3)
+    for fault in faults:
+        fixed = {node: rng.getrandbits(1) for node in rng.sample(circuit.inputs, 2)}
+        test_possible, stack = run_podem(
+            circuit, fault.node, fault.stuck_at, fault_gate=fault.gate, fault_pin=fault.pin,
+            fixed_assignments=fixed,
+        )
+        cube = stack.get_assignments()
+        if test_possible:
+            assert cube.items() >= fixed.items()
+            assert cube_detects(circuit, fault, cube)
+        else:
+            # no pattern that extends the fixed assignments detects the fault
+            word = detecting_patterns(circuit, fault)
+            for k in range(1 << len(circuit.inputs)):
+                pattern = [(k >> pos) & 1 for pos in range(len(circuit.inputs))]
+                if all(pattern[circuit.inputs.index(node)] == val for node, val in fixed.items()):
+                    assert not (word >> k) & 1
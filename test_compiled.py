@@ -0,0 +1,62 @@
+import random
+import circuit as circuit_module
+from circuit import COMPILED_CACHE_SIZE
+from conftest import check_results, exhaustive_words, run_every_fault
+from fault_list import FaultList
+from netlist import NetlistBuilder
+from pattern_sim import PatternSimulator, pack_patterns
+
+
+def test_word_function_matches_oracle(small_circuit):
+    circuit = small_circuit
+    words, mask = exhaustive_words(circuit)
+    inputs = [words[idx] for idx in circuit.core.inputs]
+    assert PatternSimulator(circuit, compiled=True).simulate_words(inputs, mask.bit_length()) == words
+
+
+def test_wide_gates():
+    builder = NetlistBuilder()
+    for idx in range(40):
+        builder.add_input(f"i{idx}", 0)
+    for gate_type in ["and", "nor", "xnor"]:
+        builder.add_gate(gate_type, gate_type, [f"i{idx}" for idx in range(40)], 0)
+    circuit = builder.build()
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in range(40)] for _ in range(64)]
+    patterns += [[1] * 40, [0] * 40]
+    words = pack_patterns(patterns)
+    expected = PatternSimulator(circuit).simulate_words(words, len(patterns))
+    assert PatternSimulator(circuit, compiled=True).simulate_words(words, len(patterns)) == expected
+
+
+def test_compiled_propagate_with_faults(small_circuit):
+    circuit = small_circuit
+    rng = random.Random(1)
+    patterns = [[rng.choice([0, 1, "X"]) for _ in circuit.inputs] for _ in range(4)]
+    for fault in FaultList(circuit, dominance=False).faults:
+        if fault.gate is None:
+            fault.node.make_faulty(stuck_at=fault.stuck_at, set=False)
+        else:
+            fault.gate.make_pin_faulty(fault.pin, fault.stuck_at)
+        for pattern in patterns:
+            circuit.compiled = False
+            circuit.propagate(pattern, reset=True)
+            expected = [node.value for node in circuit.nodes]
+            circuit.compiled = True
+            circuit.propagate(pattern, reset=True)
+            assert [node.value for node in circuit.nodes] == expected, fault
+        if fault.gate is None:
+            fault.node.remove_fault()
+        else:
+            fault.gate.remove_pin_fault()
+
+
+def test_compiled_cones(small_circuit, monkeypatch):
+    circuit = small_circuit
+    monkeypatch.setattr(circuit_module, "COMPILE_THRESHOLD", 1)
+    circuit.compiled = True
+    check_results(circuit, run_every_fault(circuit, event_driven=False))
+    assert 0 < len(circuit.compiled_functions) <= COMPILED_CACHE_SIZE
+    # one function per set of POs reached, shared by every fault whose cone it is
+    po_sets = {tuple(circuit.structure.reachable_outputs(node.index)) for node in circuit.nodes}
+    assert set(circuit.compiled_functions) <= po_sets | {None}
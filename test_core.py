@@ -0,0 +1,57 @@
+from core import GATE_TYPES
+
+
+def transitive_fanout(node):
+    gates = set()
+    nodes = [node]
+    while nodes:
+        for gate in nodes.pop().gates:
+            if gate not in gates:
+                gates.add(gate)
+                nodes.append(gate.output)
+    return gates
+
+
+def test_arrays_match_objects(small_circuit):
+    circuit = small_circuit
+    core = circuit.core
+    for idx, node in enumerate(circuit.nodes):
+        assert node.index == idx
+        assert list(core.node_fanout(idx)) == [gate.index for gate in node.gates]
+        driver = -1 if node.gate_output is None else node.gate_output.index
+        assert core.driver[idx] == driver
+    for idx, gate in enumerate(circuit.eval_order):
+        assert gate.index == idx
+        assert GATE_TYPES[core.gate_type[idx]] == gate.type
+        assert core.gate_output[idx] == gate.output.index
+        assert list(core.gate_inputs(idx)) == [node.index for node in gate.inputs]
+    assert list(core.inputs) == [node.index for node in circuit.inputs]
+    assert list(core.outputs) == [node.index for node in circuit.outputs.values()]
+
+
+def test_cones(small_circuit):
+    circuit = small_circuit
+    core = circuit.core
+    fanout = {node: transitive_fanout(node) for node in circuit.nodes}
+    for node in circuit.nodes:
+        assert core.fanout_cone(node.index) == sorted(gate.index for gate in fanout[node])
+        # a gate is in the fanin of a node if it drives it or the node is in the gate's fanout
+        fanin = [
+            gate.index for gate in circuit.eval_order
+            if gate.output is node or node.gate_output in fanout[gate.output]
+        ]
+        assert core.fanin_cone([node.index]) == fanin
+
+
+def test_views(small_circuit):
+    circuit = small_circuit
+    core = circuit.core
+    for gate in circuit.eval_order:
+        assert gate.depth == core.level[gate.index]
+        assert gate.depth == 1 + max([0] + [inp.gate_output.depth for inp in gate.inputs if not inp.is_pi()])
+    for node in circuit.nodes:
+        assert node._gates is None
+        node.state = "D"
+        assert core.values[node.index] == node.value
+    circuit.reset()
+    assert all(node.state == "X" for node in circuit.nodes)
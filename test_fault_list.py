@@ -0,0 +1,53 @@
+import pytest
+from classic_podem import get_faults, run_all_nodes_podem
+from conftest import build_circuit, check_results, detecting_patterns, node_results
+from fault_list import FaultList, run_fault_list_podem
+
+
+def test_equivalent_faults_have_the_same_tests(small_circuit):
+    circuit = small_circuit
+    fault_list = FaultList(circuit)
+    for rep, faults in fault_list.classes.items():
+        tests = detecting_patterns(circuit, rep)
+        for fault in faults:
+            assert detecting_patterns(circuit, fault) == tests, (rep, fault)
+
+
+def test_dominance(small_circuit):
+    circuit = small_circuit
+    fault_list = FaultList(circuit)
+    for dominating, dominated_classes in fault_list.dominating.items():
+        tests = detecting_patterns(circuit, dominating)
+        for dominated in dominated_classes:
+            assert detecting_patterns(circuit, dominated) & ~tests == 0, (dominating, dominated)
+    assert set(fault_list.targets) <= set(fault_list.classes)
+    assert len(FaultList(circuit, dominance=False).targets) == len(fault_list.classes)
+
+
+def test_run_fault_list_podem(small_circuit):
+    circuit = small_circuit
+    check_results(circuit, run_fault_list_podem(circuit))
+
+
+@pytest.mark.parametrize("fault_dropping", [False, True])
+def test_run_all_nodes_podem(small_circuit, fault_dropping):
+    circuit = small_circuit
+    check_results(circuit, run_all_nodes_podem(circuit, fault_list=True, fault_dropping=fault_dropping))
+
+
+def test_internal_nodes_by_default(small_circuit):
+    circuit = small_circuit
+    res = run_all_nodes_podem(circuit)
+    faults = get_faults(circuit)
+    assert list(res) == list(dict.fromkeys(fault.node for fault in faults))
+    check_results(circuit, node_results(res), faults)
+
+
+def test_repeated_pins():
+    circuit = build_circuit("repeated-pins")
+    a, gate = circuit.get_node("a"), circuit.get_node("g").gate_output
+    branches = [fault for fault in FaultList(circuit, dominance=False).faults if fault.node is a and fault.gate is gate]
+    assert [(fault.pin, fault.stuck_at) for fault in branches] == [(0, 0), (0, 1), (2, 0), (2, 1)]
+    # a stuck at 1 on one pin of g is masked by a = 0 on the other
+    assert detecting_patterns(circuit, branches[1]) == 0
+    check_results(circuit, run_fault_list_podem(circuit))
@@ -0,0 +1,55 @@
+import random
+from classic_podem import DETECTED, RANDOM, get_faults, run_all_nodes_podem
+from conftest import check_results, detecting_patterns, node_results, pattern_index
+from fault_list import FaultList
+from fault_sim import FaultSimulator, RandomPatternPhase
+
+
+def test_simulate_matches_oracle(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in circuit.inputs] for _ in range(40)]
+    detected = FaultSimulator(circuit).simulate(faults, patterns)
+    for fault in faults:
+        oracle = detecting_patterns(circuit, fault)
+        hits = [idx for idx, pattern in enumerate(patterns) if (oracle >> pattern_index(circuit, pattern)) & 1]
+        assert detected.get(fault) == (hits[0] if hits else None), fault
+
+
+def test_drop_detected_keeps_order(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    patterns = [[0] * len(circuit.inputs), [1] * len(circuit.inputs)]
+    detected, remaining = FaultSimulator(circuit).drop_detected(faults, patterns)
+    assert remaining == [fault for fault in faults if fault not in detected]
+
+
+def test_fault_dropping(small_circuit):
+    circuit = small_circuit
+    res = node_results(run_all_nodes_podem(circuit, fault_dropping=True))
+    check_results(circuit, res, get_faults(circuit))
+    for fault, entry in res.items():
+        if entry["status"] == DETECTED:
+            assert entry["detected_by"] is not None
+
+
+def test_random_phase(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    fault_simulator = FaultSimulator(circuit)
+    patterns, detected, remaining = RandomPatternPhase(batch_size=8, seed=1).run(fault_simulator, faults)
+    assert set(detected) | set(remaining) == set(faults)
+    assert not set(detected) & set(remaining)
+    for fault, pattern_idx in detected.items():
+        assert (detecting_patterns(circuit, fault) >> pattern_index(circuit, patterns[pattern_idx])) & 1
+    assert fault_simulator.simulate(remaining, patterns) == {}
+    # same seed, same patterns
+    assert RandomPatternPhase(batch_size=8, seed=1).run(fault_simulator, faults)[0] == patterns
+
+
+def test_random_phase_before_podem(small_circuit):
+    circuit = small_circuit
+    res = node_results(run_all_nodes_podem(circuit, random_phase=RandomPatternPhase(batch_size=4, seed=2)))
+    check_results(circuit, res, get_faults(circuit))
+    assert any(entry.get("detected_by") == RANDOM for entry in res.values())
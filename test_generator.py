@@ -0,0 +1,47 @@
+import random
+import pytest
+from benchmark import CASES
+from fault_list import FaultList
+from fault_sim import FaultSimulator
+from generator import random_circuit, random_netlist
+from pattern_sim import PatternSimulator
+
+RANDOM_CASES = [name for name, spec in CASES.items() if isinstance(spec, dict)]
+NUM_PATTERNS = 1024
+
+
+def random_words(circuit, seed=0):
+    rng = random.Random(seed)
+    return [rng.getrandbits(NUM_PATTERNS) for _ in circuit.inputs]
+
+
+def test_same_seed_same_circuit():
+    first = random_netlist(100, depth=10, seed=3)
+    second = random_netlist(100, depth=10, seed=3)
+    assert first.definitions == second.definitions
+    assert random_netlist(100, depth=10, seed=4).definitions != first.definitions
+
+
+def test_depth():
+    circuit = random_circuit(60, num_inputs=8, depth=12, seed=1)
+    assert len(circuit.eval_order) == 60
+    assert max(gate.depth for gate in circuit.eval_order) == 12
+
+
+@pytest.mark.parametrize("name", RANDOM_CASES)
+def test_random_patterns_toggle_nets(name):
+    circuit = random_circuit(seed=0, **CASES[name])
+    words = PatternSimulator(circuit).simulate_words(random_words(circuit), NUM_PATTERNS)
+    mask = (1 << NUM_PATTERNS) - 1
+    toggled = sum(1 for word in words if word not in (0, mask))
+    assert toggled / len(words) >= 0.95
+
+
+@pytest.mark.parametrize("name", ["c432-like", "c499-like", "c880-like"])
+def test_random_pattern_coverage(name):
+    circuit = random_circuit(seed=0, **CASES[name])
+    faults = FaultList(circuit, dominance=False).faults
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in circuit.inputs] for _ in range(NUM_PATTERNS)]
+    detected = FaultSimulator(circuit).simulate(faults, patterns)
+    assert len(detected) / len(faults) >= 0.9
@@ -0,0 +1,35 @@
+from conftest import detecting_patterns, exhaustive_words
+from fault_list import FaultList
+from learning import StaticLearning
+
+
+def holds(words, mask, idx, val):
+    """Word with bit k set if node idx has value val under pattern k."""
+    return words[idx] if val else words[idx] ^ mask
+
+
+def test_learned_implications_hold(small_circuit):
+    circuit = small_circuit
+    learning = StaticLearning(circuit)
+    words, mask = exhaustive_words(circuit)
+    for idx, val in learning.constants.items():
+        assert holds(words, mask, idx, val) == mask
+    for premise, implied in learning.learned.items():
+        patterns = holds(words, mask, premise >> 1, premise & 1)
+        for lit in implied:
+            assert patterns & ~holds(words, mask, lit >> 1, lit & 1) == 0
+
+
+def test_necessary_assignments_hold_in_every_test(small_circuit):
+    circuit = small_circuit
+    learning = StaticLearning(circuit)
+    words, mask = exhaustive_words(circuit)
+    for fault in FaultList(circuit, dominance=False).faults:
+        tests = detecting_patterns(circuit, fault)
+        necessary = learning.necessary_assignments(fault.node, fault.stuck_at, fault.gate)
+        if necessary is None:
+            assert tests == 0, fault
+            continue
+        assert (fault.node, 1 - fault.stuck_at) in necessary
+        for node, val in necessary:
+            assert tests & ~holds(words, mask, node.index, val) == 0, (fault, node, val)
@@ -0,0 +1,42 @@
+from itertools import product
+import pytest
+from logic import ZERO, ONE, X, D, D_BAR, GATE_TABLES, evaluate
+
+# (good machine value, faulty machine value) of each code, None for X
+MACHINES = {ZERO: (0, 0), ONE: (1, 1), X: (None, None), D: (1, 0), D_BAR: (0, 1)}
+CODES = {machines: code for code, machines in MACHINES.items()}
+
+
+def reference(gate_type, values):
+    """3-valued evaluation of each machine over all inputs at once."""
+    results = []
+    for machine in (0, 1):
+        inputs = [MACHINES[val][machine] for val in values]
+        if gate_type in ["xor", "xnor"]:
+            out = None if None in inputs else sum(inputs) % 2
+        else:
+            control = 1 if gate_type in ["or", "nor"] else 0
+            if control in inputs:
+                out = control
+            elif None in inputs:
+                out = None
+            else:
+                out = 1 - control
+        if out is not None and gate_type in ["not", "nand", "nor", "xnor"]:
+            out = 1 - out
+        results.append(out)
+    return CODES.get(tuple(results), X)
+
+
+@pytest.mark.parametrize("gate_type", list(GATE_TABLES))
+def test_evaluate_matches_machine_pairs(gate_type):
+    widths = [1] if gate_type in ["buf", "not"] else [2, 3, 4]
+    for width in widths:
+        for values in product(MACHINES, repeat=width):
+            assert evaluate(gate_type, values) == reference(gate_type, values), values
+
+
+def test_fold_is_exact():
+    assert evaluate("and", [X, D, D_BAR]) == ZERO
+    assert evaluate("or", [X, D, D_BAR]) == ONE
+    assert evaluate("and", [X, D]) == X
@@ -0,0 +1,82 @@
+import pytest
+from benchmark import C17, S27
+from conftest import exhaustive_words
+from netlist import NetlistError, read_bench, read_verilog
+
+C17_VERILOG = """
+// c17 in structural Verilog
+module c17 (N1, N2, N3, N6, N7, N22, N23);
+  input N1, N2, N3, N6, N7;
+  output N22, N23;
+  wire N10, N11, N16, N19;
+  nand NAND2_1 (N10, N1, N3);
+  nand NAND2_2 (N11, N3, N6), NAND2_3 (N16, N2, N11);
+  nand (N19, N11, N7);
+  nand NAND2_5 (N22, N10, N16);
+  nand NAND2_6 (N23, N16, N19);
+endmodule
+"""
+
+
+def output_words(circuit):
+    words, _ = exhaustive_words(circuit)
+    return {node.name: words[node.index] for node in circuit.outputs.values()}
+
+
+def test_bench_and_verilog_agree():
+    bench = read_bench(C17.splitlines())
+    verilog = read_verilog(C17_VERILOG.splitlines())
+    assert output_words(verilog) == {"N" + name: word for name, word in output_words(bench).items()}
+
+
+def test_gates_out_of_order():
+    lines = C17.strip().splitlines()
+    ports = [line for line in lines if "=" not in line]
+    gates = [line for line in lines if "=" in line]
+    shuffled = read_bench(ports + gates[::-1])
+    assert output_words(shuffled) == output_words(read_bench(lines))
+
+
+def test_name_lookup():
+    circuit = read_bench(C17.splitlines())
+    assert circuit.get_node("16").name == "16"
+    assert circuit.get_gate("16").output is circuit.get_node("16")
+    with pytest.raises(ValueError):
+        circuit.get_node("missing")
+
+
+def test_full_scan():
+    circuit = read_bench(S27.splitlines())
+    names = [node.name for node in circuit.inputs]
+    assert names == ["G0", "G1", "G2", "G3", "G5", "G6", "G7"]
+    for name in ["G10", "G11", "G13", "G17"]:
+        assert circuit.get_node(name).is_po()
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("INPUT(a)\nOUTPUT(b)\nb = AND(a, c)", "never driven"),
+        ("INPUT(a)\nOUTPUT(b)\nb = NOT(a)\nb = BUF(a)", "already driven"),
+        ("INPUT(a)\nOUTPUT(b)\nb = AND(a, c)\nc = OR(a, b)", "combinational loop"),
+        ("INPUT(a)\nOUTPUT(b)\nb = MUX(a, a)", "unsupported gate type"),
+        ("INPUT(a)\nOUTPUT(c)\nb = NOT(a)", "output c is never driven"),
+        ("INPUT(a)\nOUTPUT(b)\nb = NOT(a, a)", "exactly 1 input"),
+    ],
+)
+def test_bench_errors(text, message):
+    with pytest.raises(NetlistError, match=message):
+        read_bench(text.splitlines())
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("module m (a, b);\ninput a;\noutput b;\nnot g (b, a);\n", "missing endmodule"),
+        ("module m (a, b);\ninput [1:0] a;\nendmodule", "vector nets"),
+        ("module m (a, b, c);\ninput a;\noutput b, c;\nnot g (b, a);\nnot g (c, a);\nendmodule", "already used"),
+    ],
+)
+def test_verilog_errors(text, message):
+    with pytest.raises(NetlistError, match=message):
+        read_verilog(text.splitlines())
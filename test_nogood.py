@@ -0,0 +1,51 @@
+import pytest
+from benchmark import C17
+from conftest import check_results, exhaustive_words, run_every_fault
+from learning import StaticLearning, literal
+from netlist import read_bench
+from nogood import NogoodCache
+
+
+def satisfied(words, mask, lit):
+    """Word with bit k set if the literal holds under pattern k."""
+    return words[lit >> 1] if lit & 1 else words[lit >> 1] ^ mask
+
+
+@pytest.mark.parametrize("learning", [False, True])
+def test_nogoods_are_sound(small_circuit, learning):
+    circuit = small_circuit
+    if learning:
+        circuit.learning = StaticLearning(circuit)
+    circuit.nogoods = NogoodCache(circuit)
+    check_results(circuit, run_every_fault(circuit))
+    words, mask = exhaustive_words(circuit)
+    for goal, nogood in circuit.nogoods.entries:
+        patterns = mask
+        for lit in nogood:
+            assert lit >> 1 in circuit.nogoods.support(goal >> 1)
+            patterns &= satisfied(words, mask, lit)
+        # no pattern that extends the nogood sets the goal
+        assert patterns & satisfied(words, mask, goal) == 0, (goal, nogood)
+
+
+def test_cache_is_bounded(small_circuit):
+    circuit = small_circuit
+    circuit.learning = StaticLearning(circuit)
+    circuit.nogoods = NogoodCache(circuit, max_size=2)
+    check_results(circuit, run_every_fault(circuit))
+    assert len(circuit.nogoods) <= 2
+    assert sum(len(nogoods) for nogoods in circuit.nogoods.by_goal.values()) == len(circuit.nogoods)
+
+
+def test_add_and_lookup():
+    circuit = read_bench(C17.splitlines())
+    cache = NogoodCache(circuit)
+    goal = literal(circuit.get_node("10").index, 0)
+    in1, in3, in2 = (circuit.get_node(name).index for name in ["1", "3", "2"])
+    # literals outside the fanin of the goal node are dropped
+    assert cache.add(goal, {literal(in1, 0), literal(in2, 1)})
+    assert not cache.add(goal, {literal(in1, 0), literal(in3, 1)})
+    assert cache.lookup([goal], {literal(in1, 0), literal(in3, 0)}) == {goal}
+    assert cache.lookup([goal], {literal(in1, 1)}) == frozenset()
+    with pytest.raises(ValueError):
+        NogoodCache(circuit, max_size=0)
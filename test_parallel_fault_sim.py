@@ -0,0 +1,54 @@
+import random
+import pytest
+from conftest import cube_detects, exhaustive_words, pattern_index
+from fault_list import FaultList
+from fault_sim import FaultSimulator
+from parallel_fault_sim import ParallelFaultSimulator, read_patterns
+
+
+def random_patterns(circuit, count, values=(0, 1), seed=0):
+    rng = random.Random(seed)
+    return [[rng.choice(values) for _ in circuit.inputs] for _ in range(count)]
+
+
+@pytest.mark.parametrize("word_size", [1, 5, 64])
+def test_full_patterns_match_oracle(small_circuit, word_size):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    patterns = random_patterns(circuit, 12)
+    report = ParallelFaultSimulator(circuit, word_size=word_size).grade(patterns, faults, drop=False)
+    assert report.detected == FaultSimulator(circuit).simulate(faults, patterns)
+    assert report.possibly_detected == {}
+    good, _ = exhaustive_words(circuit)
+    indices = [pattern_index(circuit, pattern) for pattern in patterns]
+    for fault in faults:
+        faulty, _ = exhaustive_words(circuit, fault)
+        outputs = [
+            node for node in circuit.outputs.values()
+            if any(((good[node.index] ^ faulty[node.index]) >> idx) & 1 for idx in indices)
+        ]
+        assert report.outputs.get(fault, []) == outputs
+        count = sum(
+            1 for idx in indices
+            if any(((good[node.index] ^ faulty[node.index]) >> idx) & 1 for node in circuit.outputs.values())
+        )
+        assert report.detection_counts.get(fault, 0) == count
+
+
+def test_patterns_with_x(small_circuit):
+    circuit = small_circuit
+    faults = FaultList(circuit, dominance=False).faults
+    patterns = random_patterns(circuit, 12, values=(0, 1, "X"), seed=1)
+    report = ParallelFaultSimulator(circuit).grade(patterns, faults)
+    for fault, pattern_idx in report.detected.items():
+        cube = {node: val for node, val in zip(circuit.inputs, patterns[pattern_idx]) if val != "X"}
+        assert cube_detects(circuit, fault, cube), fault
+    assert not set(report.detected) & set(report.possibly_detected)
+    assert report.coverage == len(report.detected) / len(faults)
+
+
+def test_read_patterns():
+    lines = ["# header", "01X", "", "x-1"]
+    assert read_patterns(lines) == [[0, 1, "X"], ["X", "X", 1]]
+    with pytest.raises(ValueError, match="Line 2"):
+        read_patterns(["01", "0a"])
@@ -0,0 +1,80 @@
+import pytest
+from circuit import first_gate
+from classic_podem import get_faults, run_all_nodes_podem
+from conftest import build_circuit, check_results, exhaustive_words, node_results
+from fault_sim import RandomPatternPhase
+from learning import StaticLearning
+from nogood import NogoodCache
+from parallel_podem import pack_circuit, run_parallel_podem, unpack_circuit
+from stats import COUNTERS, Stats
+
+
+def statuses(results):
+    return {fault: entry["status"] for fault, entry in results.items()}
+
+
+def test_pack_unpack(small_circuit):
+    circuit = small_circuit
+    rebuilt = unpack_circuit(pack_circuit(circuit))
+    assert [node.name for node in rebuilt.nodes] == [node.name for node in circuit.nodes]
+    assert [gate.name for gate in rebuilt.eval_order] == [gate.name for gate in circuit.eval_order]
+    assert list(rebuilt.core.outputs) == list(circuit.core.outputs)
+    assert exhaustive_words(rebuilt) == exhaustive_words(circuit)
+
+
+@pytest.mark.parametrize("name", ["c17", "random-reconvergent", "random-deep"])
+def test_matches_oracle(name):
+    circuit = build_circuit(name)
+    check_results(circuit, run_parallel_podem(circuit, processes=2, batch_size=4, fault_list=True))
+
+
+def test_random_phase():
+    circuit = build_circuit("random-wide")
+    res = run_parallel_podem(
+        circuit, processes=2, random_phase=RandomPatternPhase(batch_size=4), fault_list=True
+    )
+    check_results(circuit, res)
+
+
+def test_internal_nodes_by_default():
+    circuit = build_circuit("random-xor")
+    serial = run_all_nodes_podem(circuit)
+    parallel = run_parallel_podem(circuit, processes=2)
+    assert list(parallel) == list(serial)
+    check_results(circuit, node_results(parallel), get_faults(circuit))
+    for node, entries in serial.items():
+        assert {sa: entry["status"] for sa, entry in parallel[node].items()} == {
+            sa: entry["status"] for sa, entry in entries.items()
+        }
+
+
+def test_workers_get_the_search_options():
+    circuit = build_circuit("random-reconvergent")
+    circuit.learning = StaticLearning(circuit)
+    circuit.nogoods = NogoodCache(circuit)
+    circuit.multiple_backtrace = True
+    parallel = run_parallel_podem(circuit, processes=2, fault_list=True)
+    check_results(circuit, parallel)
+    assert statuses(parallel) == statuses(run_all_nodes_podem(circuit, fault_list=True))
+
+
+def test_workers_get_the_settings_and_send_back_stats():
+    def counters(stats):
+        return {
+            (record["fault"], record["stuck_at"], record["gate"], record["pin"]):
+                [record[name] for name in COUNTERS]
+            for record in stats.faults
+        }
+
+    circuit = build_circuit("random-reconvergent")
+    circuit.frontier_heuristic = first_gate
+    circuit.compiled = True
+    circuit.stats = Stats()
+    run_all_nodes_podem(circuit, fault_list=True)
+    serial = circuit.stats
+    circuit.stats = Stats()
+    run_parallel_podem(circuit, processes=2, batch_size=4, fault_list=True)
+    # the searches are deterministic, so the workers made the same decisions as the serial run
+    assert counters(circuit.stats) == counters(serial)
+    assert len(circuit.stats.faults) == len(serial.faults)
+    assert circuit.stats.decisions == serial.decisions
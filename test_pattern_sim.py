@@ -0,0 +1,32 @@
+import random
+from conftest import exhaustive_words
+from pattern_sim import PatternSimulator, pack_patterns, unpack_words
+
+
+def all_patterns(circuit):
+    num_inputs = len(circuit.inputs)
+    return [[(k >> pos) & 1 for pos in range(num_inputs)] for k in range(1 << num_inputs)]
+
+
+def test_simulate_words_matches_oracle(small_circuit):
+    circuit = small_circuit
+    patterns = all_patterns(circuit)
+    words = PatternSimulator(circuit).simulate_words(pack_patterns(patterns), len(patterns))
+    assert words == exhaustive_words(circuit)[0]
+
+
+def test_simulate_patterns_matches_propagate(small_circuit):
+    circuit = small_circuit
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in circuit.inputs] for _ in range(50)]
+    # a block size that does not divide the number of patterns
+    responses = PatternSimulator(circuit).simulate_patterns(patterns, block_size=16)
+    for pattern, response in zip(patterns, responses):
+        circuit.propagate(pattern, reset=True)
+        assert circuit.get_outputs() == response
+
+
+def test_pack_unpack_round_trip():
+    rng = random.Random(0)
+    patterns = [[rng.getrandbits(1) for _ in range(7)] for _ in range(70)]
+    assert unpack_words(pack_patterns(patterns), len(patterns)) == patterns
@@ -0,0 +1,139 @@
+import pytest
+from circuit import closest_to_po_gate, first_gate
+from classic_podem import ABORTED, DETECTED, UNTESTABLE, PodemLimits, run_podem
+from conftest import check_results, cube_detects, detecting_patterns, run_every_fault
+from fault_list import FaultList
+from learning import StaticLearning
+from netlist import NetlistBuilder, read_bench
+from nogood import NogoodCache
+
+# {mode: ({circuit attribute: value, or a class instantiated with the circuit}, run_podem options)}
+MODES = {
+    "event-driven": ({}, {}),
+    "full-propagation": ({}, dict(event_driven=False)),
+    "whole-circuit": ({}, dict(cone=False)),
+    "first-frontier-gate": ({"frontier_heuristic": first_gate}, {}),
+    "closest-frontier-gate": ({"frontier_heuristic": closest_to_po_gate}, {}),
+    "learning": ({"learning": StaticLearning}, {}),
+    "multiple-backtrace": ({"multiple_backtrace": True}, {}),
+    "multiple-backtrace-full-propagation": ({"multiple_backtrace": True}, dict(event_driven=False)),
+    "nogoods": ({"nogoods": NogoodCache}, {}),
+    "learning-nogoods-multiple-backtrace": (
+        {"learning": StaticLearning, "nogoods": NogoodCache, "multiple_backtrace": True}, {}
+    ),
+}
+
+# The recursive podem() before the iterative engine crashed on g1 stuck at 1 here: a backtrack set
+# g1 to 1 while g5 still had an X output, so the X-path check passed with an empty D-frontier and
+# objective() failed its assert.
+EMPTY_D_FRONTIER = """
+INPUT(i0)
+INPUT(i1)
+INPUT(i2)
+OUTPUT(g6)
+OUTPUT(g7)
+g0 = NAND(i0, i1)
+g1 = NAND(i1, i2)
+g2 = NAND(i2, i1)
+g3 = NAND(i2, i1)
+g4 = AND(g1, g2, g3)
+g5 = AND(g0, g1, i0)
+g6 = NOR(g4, g5)
+g7 = NOR(g5, i0)
+"""
+
+# a is a stem reached from g1 through g0 and from h, so objectives on both must conflict at a
+STEM_CONFLICT = """
+INPUT(a)
+INPUT(b)
+INPUT(c)
+OUTPUT(z)
+g0 = NAND(a, b)
+g1 = AND(g0, c)
+h = OR(a, c)
+z = AND(g1, h)
+"""
+
+
+@pytest.mark.parametrize("mode", list(MODES))
+def test_podem_matches_oracle(small_circuit, mode):
+    circuit = small_circuit
+    attributes, options = MODES[mode]
+    for name, value in attributes.items():
+        setattr(circuit, name, value(circuit) if isinstance(value, type) else value)
+    check_results(circuit, run_every_fault(circuit, **options))
+
+
+@pytest.mark.parametrize("event_driven", [True, False])
+def test_empty_d_frontier_backtracks(event_driven):
+    circuit = read_bench(EMPTY_D_FRONTIER.splitlines())
+    test_possible, stack = run_podem(circuit, circuit.get_node("g1"), 1, event_driven=event_driven)
+    assert not test_possible
+    assert stack.status == UNTESTABLE
+    check_results(circuit, run_every_fault(circuit, event_driven=event_driven))
+
+
+@pytest.mark.parametrize(
+    "limits", [PodemLimits(max_backtracks=0), PodemLimits(max_decisions=1), PodemLimits(time_limit=0)]
+)
+def test_limits_abort(small_circuit, limits):
+    circuit = small_circuit
+    for fault, entry in run_every_fault(circuit, limits=limits).items():
+        assert entry["status"] in [DETECTED, UNTESTABLE, ABORTED]
+        if entry["status"] == DETECTED:
+            assert cube_detects(circuit, fault, entry["assignments"])
+        elif entry["status"] == UNTESTABLE:
+            assert detecting_patterns(circuit, fault) == 0
+
+
+def test_deep_search_is_not_recursive():
+    builder = NetlistBuilder()
+    builder.add_input("a", 0)
+    builder.add_input("b", 0)
+    builder.add_gate("and", "n0", ["a", "b"], 0)
+    for idx in range(1, 3001):
+        builder.add_gate("buf", f"n{idx}", [f"n{idx - 1}"], idx)
+    circuit = builder.build()
+    test_possible, stack = run_podem(circuit, circuit.get_node("n0"), 0)
+    assert test_possible
+    assert stack.get_assignments() == {circuit.get_node("a"): 1, circuit.get_node("b"): 1}
+
+
+def test_multiple_backtrace_without_headlines(small_circuit, monkeypatch):
+    circuit = small_circuit
+    circuit.multiple_backtrace = True
+    # every decision falls back to objective and backtrace
+    monkeypatch.setattr(circuit, "backtrace_objectives", lambda objectives, verbose=False: [])
+    check_results(circuit, run_every_fault(circuit))
+
+
+def test_multiple_backtrace_headlines(small_circuit):
+    circuit = small_circuit
+    for fault in FaultList(circuit, dominance=False).targets:
+        if fault.gate is not None:
+            continue
+        circuit.reset()
+        circuit.propagate()
+        fault.node.make_faulty(stuck_at=fault.stuck_at, set=False)
+        objectives = circuit.get_objectives(fault.node, fault.stuck_at)
+        for node, val in circuit.backtrace_objectives(objectives):
+            assert node.state == "X"
+            assert val in [0, 1]
+        fault.node.remove_fault()
+
+
+def test_multiple_backtrace_demands():
+    circuit = read_bench(STEM_CONFLICT.splitlines())
+    circuit.reset()
+    node = circuit.get_node
+    demands, headlines, conflict = circuit.backtrace_demands([(node("g1"), 1)])
+    assert demands == {
+        node("g1").index: [0, 1], node("g0").index: [0, 1], node("c").index: [0, 1], node("a").index: [1, 0]
+    }
+    assert headlines == [(node("a"), 0), (node("c"), 1)]
+    assert conflict is None
+    # h wants a at 1 while g0 wants it at 0, PIs are only popped once every gate has been
+    demands, _, conflict = circuit.backtrace_demands([(node("g1"), 1), (node("h"), 1)])
+    assert demands[node("a").index] == [1, 1]
+    assert conflict == (node("a"), 0)
+    assert circuit.backtrace_objectives([(node("g1"), 1), (node("h"), 1)]) == [(node("a"), 0)]
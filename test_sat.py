@@ -0,0 +1,40 @@
+import random
+from itertools import product
+import pytest
+from sat import SAT, UNSAT, SatSolver, luby
+
+
+def brute_force(num_vars, clauses, assumptions=()):
+    for values in product([False, True], repeat=num_vars):
+        if any(values[abs(lit) - 1] != (lit > 0) for lit in assumptions):
+            continue
+        if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses):
+            return True
+    return False
+
+
+def test_luby():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_formulas(seed):
+    rng = random.Random(seed)
+    num_vars = rng.randint(3, 10)
+    clauses = [
+        [rng.choice([1, -1]) * rng.randint(1, num_vars) for _ in range(rng.randint(1, 3))]
+        for _ in range(rng.randint(num_vars, 5 * num_vars))
+    ]
+    assumptions = [rng.choice([1, -1]) * var for var in rng.sample(range(1, num_vars + 1), 2)]
+    for assumed in [(), assumptions]:
+        solver = SatSolver()
+        for _ in range(num_vars):
+            solver.new_var()
+        for clause in clauses:
+            solver.add_clause(clause)
+        result = solver.solve(assumed)
+        assert result == (SAT if brute_force(num_vars, clauses, assumed) else UNSAT)
+        if result == SAT:
+            model = solver.model()
+            assert all(model[abs(lit)] == (lit > 0) for lit in assumed)
+            assert all(any(model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
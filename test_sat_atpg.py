@@ -0,0 +1,56 @@
+import inspect
+import random
+import pytest
+from classic_podem import ABORTED, UNTESTABLE, PodemLimits, run_all_nodes_podem, run_podem
+from compaction import run_compacted_podem
+from conftest import check_results, cube_detects, detecting_patterns, run_every_fault
+from fault_list import FaultList, run_fault_list_podem
+from parallel_podem import run_parallel_podem
+from sat import SAT, UNSAT
+from sat_atpg import run_sat_atpg
+
+
+def test_sat_atpg_matches_oracle(small_circuit):
+    circuit = small_circuit
+    for fault in FaultList(circuit, dominance=False).faults:
+        result, assignments, _ = run_sat_atpg(
+            circuit, fault.node, fault.stuck_at, fault_gate=fault.gate, fault_pin=fault.pin
+        )
+        if detecting_patterns(circuit, fault):
+            assert result == SAT, fault
+            assert cube_detects(circuit, fault, assignments), fault
+        else:
+            assert result == UNSAT, fault
+
+
+def test_fixed_assignments(small_circuit):
+    circuit = small_circuit
+    rng = random.Random(0)
+    for fault in FaultList(circuit, dominance=False).targets:
+        fixed = {node: rng.getrandbits(1) for node in rng.sample(circuit.inputs, 2)}
+        result, assignments, _ = run_sat_atpg(
+            circuit, fault.node, fault.stuck_at, fault_gate=fault.gate, fault_pin=fault.pin,
+            fixed_assignments=fixed,
+        )
+        _, stack = run_podem(
+            circuit, fault.node, fault.stuck_at, fault_gate=fault.gate, fault_pin=fault.pin,
+            fixed_assignments=fixed,
+        )
+        assert (result == SAT) == (stack.status != UNTESTABLE), fault
+        if result == SAT:
+            assert cube_detects(circuit, fault, {**assignments, **fixed}), fault
+            assert all(assignments.get(node, val) == val for node, val in fixed.items())
+
+
+def test_sat_fallback(small_circuit):
+    circuit = small_circuit
+    results = run_every_fault(circuit, limits=PodemLimits(max_backtracks=0), sat_fallback=True)
+    assert not any(entry["status"] == ABORTED for entry in results.values())
+    check_results(circuit, results)
+
+
+@pytest.mark.parametrize(
+    "driver", [run_podem, run_all_nodes_podem, run_parallel_podem, run_fault_list_podem, run_compacted_podem]
+)
+def test_sat_fallback_is_off_by_default(driver):
+    assert inspect.signature(driver).parameters["sat_fallback"].default is False
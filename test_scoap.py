@@ -0,0 +1,66 @@
+from functools import lru_cache
+from itertools import product
+from classic_podem import get_faults, run_all_nodes_podem
+from conftest import check_results, node_results
+from netlist import NetlistBuilder
+from structure import UNREACHABLE
+
+
+def reference_observability(circuit):
+    """SCOAP CO from its definition, recursing from each node towards the POs."""
+
+    @lru_cache(maxsize=None)
+    def co(node):
+        costs = [0] if node.is_po() else []
+        for gate in node.gates:
+            output_co = co(gate.output)
+            if output_co == UNREACHABLE:
+                continue
+            others = list(gate.inputs)
+            others.remove(node)
+            if gate.type in ["and", "nand"]:
+                side = sum(inp.cc1 for inp in others)
+            elif gate.type in ["or", "nor"]:
+                side = sum(inp.cc0 for inp in others)
+            else:
+                side = sum(min(inp.cc0, inp.cc1) for inp in others)
+            costs.append(output_co + side + 1)
+        return min(costs, default=UNREACHABLE)
+
+    return {node: co(node) for node in circuit.nodes}
+
+
+def test_observability(small_circuit):
+    circuit = small_circuit
+    expected = reference_observability(circuit)
+    assert {node: node.co for node in circuit.nodes} == expected
+
+
+def test_wide_xor_controllability():
+    builder = NetlistBuilder()
+    for idx in range(5):
+        builder.add_input(f"i{idx}", 0)
+    builder.add_gate("and", "a", ["i0", "i1"], 0)
+    builder.add_gate("or", "b", ["i2", "i3", "i4"], 0)
+    builder.add_gate("xor", "x", ["a", "b", "i0", "i4"], 0)
+    builder.add_gate("xnor", "y", ["a", "b", "i1", "i2", "i3"], 0)
+    circuit = builder.build()
+    for name in ["x", "y"]:
+        gate = circuit.get_gate(name)
+        costs = {0: [], 1: []}
+        # every assignment of the inputs, the cheapest of each parity wins
+        for values in product([0, 1], repeat=len(gate.inputs)):
+            cost = sum(inp.cc1 if val else inp.cc0 for inp, val in zip(gate.inputs, values))
+            costs[(sum(values) + (gate.type == "xnor")) % 2].append(cost)
+        assert (gate.output.cc0, gate.output.cc1) == (min(costs[0]) + 1, min(costs[1]) + 1)
+
+
+def test_wide_xor_podem():
+    builder = NetlistBuilder()
+    for idx in range(6):
+        builder.add_input(f"i{idx}", 0)
+    builder.add_gate("nand", "a", ["i0", "i1"], 0)
+    builder.add_gate("xor", "p", ["a", "i1", "i2", "i3", "i4", "i5"], 0)
+    builder.add_gate("xnor", "q", ["p", "i0", "i3"], 0)
+    circuit = builder.build()
+    check_results(circuit, node_results(run_all_nodes_podem(circuit)), get_faults(circuit))
@@ -0,0 +1,38 @@
+import json
+from classic_podem import run_all_nodes_podem
+from conftest import build_circuit
+from fault_list import FaultList
+from stats import COUNTERS, PHASES, Stats
+
+
+def test_per_fault_records(tmp_path):
+    circuit = build_circuit("random-reconvergent")
+    circuit.stats = Stats()
+    res = run_all_nodes_podem(circuit, fault_list=True)
+    stats = circuit.stats
+    targets = FaultList(circuit, dominance=False).targets
+    assert [(record["fault"], record["stuck_at"]) for record in stats.faults] == [
+        (fault.node.name, fault.stuck_at) for fault in targets
+    ]
+    summary = stats.summary()
+    for name in COUNTERS:
+        assert summary[name] == sum(record[name] for record in stats.faults)
+    assert summary["statuses"] == {
+        status: sum(1 for fault in targets if res[fault]["status"] == status)
+        for status in {res[fault]["status"] for fault in targets}
+    }
+    assert summary["decisions"] > 0 and summary["gate_evaluations"] > 0
+    assert set(summary["times"]) == set(PHASES)
+
+    path = tmp_path / "stats.jsonl"
+    stats.write_json_lines(str(path))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == len(targets) + 1
+    assert lines[-1]["summary"]
+
+
+def test_off_by_default():
+    circuit = build_circuit("c17")
+    assert circuit.stats is None
+    run_all_nodes_podem(circuit)
+    assert circuit.stats is None
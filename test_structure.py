@@ -0,0 +1,45 @@
+from structure import UNREACHABLE
+
+
+def distances_to_outputs(circuit, node):
+    """Gates between a node and each PO it reaches, by breadth first search."""
+    distances = {node: 0}
+    frontier = [node]
+    while frontier:
+        next_frontier = []
+        for current in frontier:
+            for gate in current.gates:
+                if gate.output not in distances:
+                    distances[gate.output] = distances[current] + 1
+                    next_frontier.append(gate.output)
+        frontier = next_frontier
+    return {po: distances[po] for po in circuit.outputs.values() if po in distances}
+
+
+def test_po_reachability(small_circuit):
+    circuit = small_circuit
+    structure = circuit.structure
+    for node in circuit.nodes:
+        reached = distances_to_outputs(circuit, node)
+        expected = min(reached.values()) if reached else UNREACHABLE
+        assert structure.po_distance[node.index] == expected
+        assert structure.reachable_outputs(node.index) == [
+            po.index for po in circuit.outputs.values() if po in reached
+        ]
+        if node.gate_output is not None:
+            assert structure.reaches_output[node.gate_output.index] == bool(reached)
+
+
+def test_fanout_free(small_circuit):
+    circuit = small_circuit
+    for node in circuit.nodes:
+        stems = []
+        nodes = [node]
+        while nodes:
+            current = nodes.pop()
+            if current.gate_output is not None:
+                for inp in current.gate_output.inputs:
+                    stems.append(len(inp.gates) > 1)
+                    nodes.append(inp)
+        assert circuit.structure.fanout_free[node.index] == (not any(stems))
+